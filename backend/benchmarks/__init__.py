@@ -0,0 +1,7 @@
+"""Benchmarks for the bowtie data layer on synthetic diagrams, and for the app.
+
+Run from the ``backend`` folder::
+
+    python -m benchmarks.run --sizes 100 1000 10000
+    python -m benchmarks.app_timing   # the Streamlit app's startup and reruns
+"""
@@ -0,0 +1,130 @@
+"""Time the presentation's cold start and per-page rerun latency.
+
+Runs ``app.py`` headlessly with Streamlit's ``AppTest`` in a fresh process
+and reports:
+
+* ``startup``: the first script run, i.e. importing the app's modules,
+  starting the background warm-up and rendering the Introduction page
+  (Streamlit itself is already imported, as it is in a running server)
+* ``warm-up``: how long the background warm-up took to finish
+* per page: the first visit, which imports the page module and builds
+  anything the warm-up hasn't, and the median of ``--reruns`` further reruns
+
+Timings are wall-clock milliseconds. ``--max-startup-ms`` and
+``--max-rerun-ms`` turn the report into a check that exits with status 1
+when a budget is exceeded (or a page raises)::
+
+    python -m benchmarks.app_timing
+    python -m benchmarks.app_timing --workspace data/ --reruns 10 --max-startup-ms 2000 --max-rerun-ms 250
+"""
+
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+APP_PATH = Path(__file__).parent.parent / 'app.py'
+DEFAULT_RERUNS = 5
+RUN_TIMEOUT = 120
+WARMUP_TIMEOUT = 300
+
+
+def _timed_run(app):
+    start = time.perf_counter()
+    app.run()
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(reruns=DEFAULT_RERUNS):
+    """Return ``{'startup_ms', 'warmup_ms', 'pages': [...], 'errors': [...]}`` for one fresh app"""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(str(APP_PATH), default_timeout=RUN_TIMEOUT)
+    startup = _timed_run(app)
+    errors = [f'startup: {e.value}' for e in app.exception]
+
+    # The app's own modules are importable now that it has run once
+    import views
+    from views.common import get_warmup
+
+    warmup = get_warmup()
+    warmup.wait(WARMUP_TIMEOUT)
+    errors += [f'warm-up {step.name} ({step.diagram_id}): {step.error}' for step in warmup.errors()]
+
+    pages = []
+    for label in views.page_labels():
+        app.radio(key='nav_page').set_value(label)
+        first = _timed_run(app)
+        times = [_timed_run(app) for _ in range(reruns)]
+        errors += [f'{label}: {e.value}' for e in app.exception]
+        pages.append({
+            'page': label,
+            'first_ms': first,
+            'rerun_ms': statistics.median(times) if times else first,
+            'max_rerun_ms': max(times, default=first),
+        })
+    return {
+        'startup_ms': startup,
+        'warmup_ms': warmup.elapsed * 1000 if warmup.elapsed is not None else None,
+        'pages': pages,
+        'errors': errors,
+    }
+
+
+def print_results(results):
+    """Print startup and per-page timings as a table"""
+    print(f"{'startup':<28} {results['startup_ms']:>9.1f}ms")
+    if results['warmup_ms'] is not None:
+        print(f"{'warm-up (background)':<28} {results['warmup_ms']:>9.1f}ms")
+    print(f"{'page':<28} {'first':>11} {'rerun':>11} {'max':>11}")
+    for page in results['pages']:
+        print(f"{page['page']:<28} {page['first_ms']:>9.1f}ms {page['rerun_ms']:>9.1f}ms {page['max_rerun_ms']:>9.1f}ms")
+    for error in results['errors']:
+        print(f'error: {error}')
+
+
+def over_budget(results, max_startup_ms=None, max_rerun_ms=None):
+    """Return a message for every measurement over its budget"""
+    problems = []
+    if max_startup_ms is not None and results['startup_ms'] > max_startup_ms:
+        problems.append(f"startup took {results['startup_ms']:.0f}ms (budget {max_startup_ms:.0f}ms)")
+    if max_rerun_ms is not None:
+        problems += [
+            f"{page['page']} reruns took {page['rerun_ms']:.0f}ms (budget {max_rerun_ms:.0f}ms)"
+            for page in results['pages'] if page['rerun_ms'] > max_rerun_ms
+        ]
+    return problems
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Time the presentation cold start and page reruns')
+    parser.add_argument('--reruns', type=int, default=DEFAULT_RERUNS, help='reruns timed per page after its first visit')
+    parser.add_argument('--workspace', help='directory of diagrams to present (as BOWTIE_WORKSPACE)')
+    parser.add_argument('--max-startup-ms', type=float, help='fail if the first run takes longer')
+    parser.add_argument('--max-rerun-ms', type=float, help="fail if any page's median rerun takes longer")
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    if args.workspace:
+        os.environ['BOWTIE_WORKSPACE'] = args.workspace
+    # No live sync server: the check shouldn't depend on a free port
+    os.environ.setdefault('BOWTIE_SYNC_PORT', '0')
+
+    results = measure(args.reruns)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    problems = over_budget(results, args.max_startup_ms, args.max_rerun_ms)
+    for problem in problems:
+        print(f'over budget: {problem}')
+    sys.exit(1 if problems or results['errors'] else 0)
+
+
+if __name__ == '__main__':
+    main()
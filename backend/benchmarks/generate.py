@@ -0,0 +1,142 @@
+"""Synthetic bowtie diagrams shaped like ``data/demo_bowtie.json``.
+
+One hazard and one top event; every threat feeds a chain of prevention
+barriers into the top event and every consequence is reached through a chain
+of mitigation barriers. A share of the barriers carries degradation
+factor -> control pairs, as in the demo. Node ids, edge ids and the node
+fields follow the demo file, so the output passes :func:`bowtie.schema.schema_errors`
+and opens in the editor.
+"""
+
+import json
+import random
+
+DEFAULT_CHAIN_LENGTH = 3
+DEFAULT_DEGRADATION = 1
+DEFAULT_DEGRADED_SHARE = 0.25
+
+
+# (sourcePosition, targetPosition) per node type, as in the demo
+HANDLES = {
+    'hazard': ('bottom', 'top'),
+    'degradationFactor': ('top', 'bottom'),
+    'degradationControl': ('top', 'bottom'),
+}
+
+
+def _node(node_id, node_type, x, y, label, description, **data):
+    source_position, target_position = HANDLES.get(node_type, ('right', 'left'))
+    return {
+        'id': node_id,
+        'type': node_type,
+        'position': {'x': x, 'y': y},
+        'sourcePosition': source_position,
+        'targetPosition': target_position,
+        'data': {'label': label, 'description': description, **data},
+    }
+
+
+def _edge(source, target):
+    return {'id': f'edge-{source}-{target}', 'source': source, 'target': target, 'type': 'smoothstep'}
+
+
+def generate_bowtie(threats, consequences, chain_length=DEFAULT_CHAIN_LENGTH,
+                    degradation=DEFAULT_DEGRADATION, degraded_share=DEFAULT_DEGRADED_SHARE, seed=0):
+    """Return a ``{'nodes', 'edges'}`` document
+
+    ``degradation`` factor/control pairs are attached to each barrier picked
+    (with probability ``degraded_share``) to carry degradation.
+    """
+    rng = random.Random(seed)
+    nodes = [
+        _node('hazard-1', 'hazard', 800, 300, 'Synthetic hazard', 'Generated hazard'),
+        _node('topEvent-1', 'topEvent', 800, 500, 'Synthetic top event', 'Generated top event'),
+    ]
+    edges = [_edge('hazard-1', 'topEvent-1')]
+    factor_count = 0
+
+    def degrade(barrier_id, x, y):
+        nonlocal factor_count
+        if not degradation or rng.random() >= degraded_share:
+            return
+        for _ in range(degradation):
+            factor_count += 1
+            factor = f'degradation-factor-{factor_count}'
+            control = f'degradation-control-{factor_count}'
+            nodes.append(_node(factor, 'degradationFactor', x, y + 100, f'Degradation factor {factor_count}',
+                               'Condition that weakens the barrier'))
+            nodes.append(_node(control, 'degradationControl', x, y + 200, f'Degradation control {factor_count}',
+                               'Safeguard against the degradation factor'))
+            edges.append(_edge(factor, control))
+            edges.append(_edge(control, barrier_id))
+
+    for t in range(1, threats + 1):
+        y = t * 150
+        threat = f'threat-{t}'
+        nodes.append(_node(threat, 'threat', 0, y, f'Threat {t}', 'Generated threat', expanded=False))
+        previous = threat
+        for b in range(1, chain_length + 1):
+            barrier = f'prevention-barrier-{t}-{b}'
+            x = 150 * b
+            nodes.append(_node(barrier, 'barrier', x, y, f'Prevention barrier {t}.{b}', 'Generated prevention barrier',
+                               barrierType='prevention', status='normal'))
+            edges.append(_edge(previous, barrier))
+            degrade(barrier, x, y)
+            previous = barrier
+        edges.append(_edge(previous, 'topEvent-1'))
+
+    for c in range(1, consequences + 1):
+        y = c * 150
+        previous = 'topEvent-1'
+        for b in range(1, chain_length + 1):
+            barrier = f'mitigation-barrier-{c}-{b}'
+            x = 1000 + 150 * b
+            nodes.append(_node(barrier, 'barrier', x, y, f'Mitigation barrier {c}.{b}', 'Generated mitigation barrier',
+                               barrierType='mitigation', status='normal'))
+            edges.append(_edge(previous, barrier))
+            degrade(barrier, x, y)
+            previous = barrier
+        consequence = f'consequence-{c}'
+        nodes.append(_node(consequence, 'consequence', 1600, y, f'Consequence {c}', 'Generated consequence',
+                           expanded=False))
+        edges.append(_edge(previous, consequence))
+
+    return {'nodes': nodes, 'edges': edges}
+
+
+def generate_for_size(target_nodes, chain_length=DEFAULT_CHAIN_LENGTH, degradation=DEFAULT_DEGRADATION,
+                      degraded_share=DEFAULT_DEGRADED_SHARE, seed=0):
+    """Return a document of roughly ``target_nodes`` nodes, split evenly between both sides"""
+    per_source = 1 + chain_length * (1 + 2 * degradation * degraded_share)
+    sources = max(2, round((target_nodes - 2) / per_source))
+    return generate_bowtie(
+        threats=sources - sources // 2,
+        consequences=sources // 2,
+        chain_length=chain_length,
+        degradation=degradation,
+        degraded_share=degraded_share,
+        seed=seed,
+    )
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write a synthetic bowtie diagram')
+    parser.add_argument('nodes', type=int, help='approximate number of nodes')
+    parser.add_argument('target', help='JSON file to write')
+    parser.add_argument('--chain-length', type=int, default=DEFAULT_CHAIN_LENGTH)
+    parser.add_argument('--degradation', type=int, default=DEFAULT_DEGRADATION,
+                        help='degradation factor/control pairs per degraded barrier')
+    parser.add_argument('--degraded-share', type=float, default=DEFAULT_DEGRADED_SHARE)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    document = generate_for_size(args.nodes, args.chain_length, args.degradation, args.degraded_share, args.seed)
+    with open(args.target, 'w') as f:
+        json.dump(document, f)
+    print(f"Wrote {args.target}: {len(document['nodes'])} nodes, {len(document['edges'])} edges")
+
+
+if __name__ == '__main__':
+    main()
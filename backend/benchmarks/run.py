@@ -0,0 +1,206 @@
+"""Time the data layer on synthetic diagrams and store the results per commit.
+
+For each size a diagram is generated (see :mod:`benchmarks.generate`),
+written to a temporary file and pushed through the stages a Story page
+rerun goes through on a cold cache:
+
+* ``load``: parse the JSON file into the loader's frozen document
+* ``index``: build the :class:`BowtieGraph`
+* ``narrative``: the lookups ``get_narrative_data`` makes
+* ``chains``: resolve every prevention and mitigation chain
+* ``risk``: build the risk model and score the diagram's own probabilities
+
+Times are the best of ``--repeat`` runs; peak memory per stage comes from a
+separate ``tracemalloc`` run, since tracing slows everything down. Results
+are written to ``benchmarks/results/<commit>.json`` (``-dirty`` is appended
+for an uncommitted tree), and ``--compare REF`` prints the ratio against an
+earlier run::
+
+    python -m benchmarks.run --sizes 100 1000 10000 100000
+    python -m benchmarks.run --sizes 100 1000 10000 100000 --compare 1a2b3c4
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+from bowtie.chains import get_chains
+from bowtie.graph import BowtieGraph
+from bowtie.loader import BowtieCache
+from bowtie.risk import get_risk_model
+
+from .generate import generate_for_size
+
+RESULTS_DIR = Path(__file__).parent / 'results'
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+DEFAULT_REPEAT = 3
+STAGES = ('load', 'index', 'narrative', 'chains', 'risk')
+
+
+def _narrative(graph):
+    # Same lookups as get_narrative_data in app.py
+    return {
+        'hazard': graph.first('hazard'),
+        'top_event': graph.first('topEvent'),
+        'threats': graph.nodes_of_type('threat'),
+        'prevention_barriers': graph.barriers('prevention'),
+        'mitigation_barriers': graph.barriers('mitigation'),
+        'consequences': graph.nodes_of_type('consequence'),
+        'degradation_factors': graph.nodes_of_type('degradationFactor'),
+        'degradation_controls': graph.nodes_of_type('degradationControl'),
+    }
+
+
+def _chains(graph):
+    chains = get_chains(graph)
+    return chains.all_prevention(), chains.all_mitigation()
+
+
+def _risk(graph):
+    return get_risk_model(graph).evaluate()
+
+
+def _pipeline(path):
+    """Yield ``(stage, callable)`` pairs, each consuming the previous stage's output"""
+    state = {}
+    yield 'load', lambda: state.__setitem__('document', BowtieCache(maxsize=1).load(path))
+    yield 'index', lambda: state.__setitem__('graph', BowtieGraph.from_document(state['document']))
+    yield 'narrative', lambda: _narrative(state['graph'])
+    yield 'chains', lambda: _chains(state['graph'])
+    yield 'risk', lambda: _risk(state['graph'])
+
+
+def time_stages(path, repeat=DEFAULT_REPEAT):
+    """Return ``{stage: best seconds}`` over ``repeat`` cold runs"""
+    best = dict.fromkeys(STAGES, float('inf'))
+    for _ in range(repeat):
+        for stage, run in _pipeline(path):
+            start = time.perf_counter()
+            run()
+            best[stage] = min(best[stage], time.perf_counter() - start)
+    return best
+
+
+def memory_stages(path):
+    """Return ``{stage: peak bytes allocated during the stage}`` from one traced run"""
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for stage, run in _pipeline(path):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            run()
+            peaks[stage] = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def benchmark_size(size, repeat=DEFAULT_REPEAT, seed=0):
+    """Generate a diagram of about ``size`` nodes and benchmark every stage on it"""
+    document = generate_for_size(size, seed=seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, f'bowtie_{size}.json')
+        with open(path, 'w') as f:
+            json.dump(document, f)
+        file_size = os.path.getsize(path)
+        seconds = time_stages(path, repeat)
+        peaks = memory_stages(path)
+    return {
+        'size': size,
+        'nodes': len(document['nodes']),
+        'edges': len(document['edges']),
+        'file_bytes': file_size,
+        'stages': {stage: {'seconds': seconds[stage], 'peak_bytes': peaks[stage]} for stage in STAGES},
+    }
+
+
+def current_commit():
+    """Return the short HEAD hash, with ``-dirty`` for an uncommitted tree"""
+    def git(*args):
+        return subprocess.run(
+            ['git', *args], cwd=Path(__file__).parent, capture_output=True, text=True, check=True
+        ).stdout.strip()
+
+    try:
+        commit = git('rev-parse', '--short', 'HEAD')
+        dirty = git('status', '--porcelain', '--untracked-files=no')
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+    return f'{commit}-dirty' if dirty else commit
+
+
+def _format_bytes(n):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if abs(n) < 1024 or unit == 'GB':
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+
+
+def print_results(results, baseline=None):
+    """Print a table of stage times and peaks, with ratios against ``baseline`` if given"""
+    previous = {r['size']: r for r in baseline['results']} if baseline else {}
+    print(f"{'nodes':>9}  {'stage':<10} {'time':>10} {'peak':>10}" + ('  vs ' + baseline['commit'] if baseline else ''))
+    for result in results['results']:
+        before = previous.get(result['size'])
+        for stage in STAGES:
+            measured = result['stages'][stage]
+            line = (f"{result['nodes']:>9}  {stage:<10} {measured['seconds'] * 1000:>8.2f}ms "
+                    f"{_format_bytes(measured['peak_bytes']):>10}")
+            if before and before['stages'][stage]['seconds'] > 0:
+                line += f"  x{measured['seconds'] / before['stages'][stage]['seconds']:.2f}"
+            print(line)
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the bowtie data layer on synthetic diagrams')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES),
+                        help='approximate node counts to benchmark (up to 1000000)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='results file (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', metavar='REF', help='commit (or results file) to compare against')
+    args = parser.parse_args(argv)
+
+    commit = current_commit()
+    results = {
+        'commit': commit,
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': [],
+    }
+    for size in args.sizes:
+        print(f'Benchmarking ~{size} nodes...', file=sys.stderr)
+        results['results'].append(benchmark_size(size, args.repeat, args.seed))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f'{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.compare:
+        reference = Path(args.compare)
+        if not reference.exists():
+            reference = RESULTS_DIR / f'{args.compare}.json'
+        with open(reference, 'r') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    print(f'Saved {output}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,34 @@
+"""Backend data layer for the bowtie presentation.
+
+Names are re-exported lazily so ``python -m bowtie.<module>`` entry points
+don't import (and warn about) the module they are about to run.
+"""
+
+import importlib
+
+_EXPORTS = {
+    'BowtieCache': 'loader',
+    'BowtieGraph': 'graph',
+    'cache_stats': 'loader',
+    'load_bowtie': 'loader',
+    'load_graph': 'loader',
+    'open_snapshot': 'snapshot',
+    'partition': 'partition',
+    'export_snapshot': 'snapshot',
+    'format_likelihood': 'formatting',
+    'get_criticality': 'criticality',
+    'get_health': 'health',
+    'get_layout': 'layout',
+    'get_path_index': 'paths',
+    'thaw': 'loader',
+    'validate_graph': 'validate',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module 'bowtie' has no attribute {name!r}")
+    return getattr(importlib.import_module(f'.{module}', __name__), name)
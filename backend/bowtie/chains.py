@@ -0,0 +1,179 @@
+"""Prevention and mitigation barrier chain resolution.
+
+A threat's prevention chain is every prevention barrier on a path from the
+threat to a top event; a consequence's mitigation chain is every mitigation
+barrier on a path from a top event to the consequence. Chains may branch and
+merge, so they are returned as the set of barriers in flow (topological)
+order rather than as a single linked list.
+
+Shared work (which barriers can reach a top event, the topological order of
+each side) is computed once per graph in O(V+E). Each chain is then a walk
+over its own barriers only, so resolving every chain of a bowtie with
+disjoint chains is O(V+E) in total. Results are memoized on the graph, i.e.
+per graph version.
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+
+class Chain(NamedTuple):
+    """Barrier chain of one threat or consequence"""
+    source: str
+    barriers: tuple
+    top_events: tuple
+    branched: bool
+    complete: bool
+    # The source also connects straight to/from a top event, past every barrier
+    bypassed: bool = False
+
+
+def _reachable(graph, starts, step, allowed):
+    """Ids of ``allowed`` nodes reachable from ``starts`` following ``step``, in BFS order"""
+    seen = {}
+    queue = deque(starts)
+    while queue:
+        current = queue.popleft()
+        for nxt in step(current):
+            if nxt in allowed and nxt not in seen:
+                seen[nxt] = len(seen)
+                queue.append(nxt)
+    return seen
+
+
+def _topological_rank(graph, barrier_ids):
+    """Kahn's algorithm over the edges between ``barrier_ids``.
+
+    Barriers that sit on a cycle never reach in-degree zero; they all share
+    the last rank so chains still list them (in discovery order). Barriers
+    are seeded in id order so independent branches rank the same on every
+    run, whatever the set iteration order (PYTHONHASHSEED).
+    """
+    in_degree = dict.fromkeys(sorted(barrier_ids), 0)
+    for barrier_id in barrier_ids:
+        for nxt in graph.successors(barrier_id):
+            if nxt in in_degree:
+                in_degree[nxt] += 1
+
+    queue = deque(b for b, d in in_degree.items() if d == 0)
+    rank = {}
+    while queue:
+        current = queue.popleft()
+        rank[current] = len(rank)
+        for nxt in graph.successors(current):
+            if nxt in in_degree:
+                in_degree[nxt] -= 1
+                if in_degree[nxt] == 0:
+                    queue.append(nxt)
+
+    last = len(rank)
+    cyclic = [b for b in in_degree if b not in rank]
+    for barrier_id in cyclic:
+        rank[barrier_id] = last
+    return rank, frozenset(cyclic)
+
+
+class BarrierChains:
+    """Chain resolver for one graph; use :func:`get_chains` to share it"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._prevention_ids = frozenset(n.get('id') for n in graph.barriers('prevention'))
+        self._mitigation_ids = frozenset(n.get('id') for n in graph.barriers('mitigation'))
+        self._top_event_ids = frozenset(n.get('id') for n in graph.nodes_of_type('topEvent'))
+
+        # Prevention barriers that lead to a top event / mitigation barriers
+        # that are fed by one, each found with a single traversal
+        self._reaches_top = frozenset(_reachable(graph, self._top_event_ids, graph.predecessors, self._prevention_ids))
+        self._from_top = frozenset(_reachable(graph, self._top_event_ids, graph.successors, self._mitigation_ids))
+
+        self._prevention_rank, prevention_cycles = _topological_rank(graph, self._prevention_ids)
+        self._mitigation_rank, mitigation_cycles = _topological_rank(graph, self._mitigation_ids)
+        self.cyclic_barriers = prevention_cycles | mitigation_cycles
+
+        self._prevention = {}
+        self._mitigation = {}
+        self._sources = None
+
+    def _resolve(self, source_id, step, back, allowed, connected, rank):
+        graph = self.graph
+        order = _reachable(graph, (source_id,), step, allowed)
+        reached = order.keys()
+        complete = not connected.isdisjoint(reached)
+        if complete:
+            # Drop dead-end branches that never make it to/from the top event
+            reached = {b for b in reached if b in connected}
+        else:
+            reached = set(reached)
+
+        # A barrier that also exits straight to/from a top event is a fork too
+        top_event_ids = self._top_event_ids
+        branched = False
+        for barrier_id in reached:
+            if sum(1 for n in step(barrier_id) if n in reached or n in top_event_ids) > 1:
+                branched = True
+                break
+            if sum(1 for n in back(barrier_id) if n in reached) > 1:
+                branched = True
+                break
+        if not branched:
+            branched = sum(1 for n in step(source_id) if n in reached) > 1
+
+        top_events = set()
+        for node_id in reached | {source_id}:
+            top_events.update(n for n in step(node_id) if n in top_event_ids)
+        bypassed = any(n in top_event_ids for n in step(source_id))
+
+        ordered = sorted(reached, key=lambda b: (rank[b], order[b]))
+        return Chain(
+            source=source_id,
+            barriers=tuple(graph.node(b) for b in ordered),
+            top_events=tuple(sorted(top_events)),
+            branched=branched,
+            complete=complete or bool(top_events),
+            bypassed=bypassed,
+        )
+
+    def prevention(self, threat_id):
+        """Return the prevention :class:`Chain` from ``threat_id`` to the top event(s)"""
+        chain = self._prevention.get(threat_id)
+        if chain is None:
+            graph = self.graph
+            chain = self._resolve(threat_id, graph.successors, graph.predecessors,
+                                  self._prevention_ids, self._reaches_top, self._prevention_rank)
+            self._prevention[threat_id] = chain
+        return chain
+
+    def mitigation(self, consequence_id):
+        """Return the mitigation :class:`Chain` from the top event(s) to ``consequence_id``"""
+        chain = self._mitigation.get(consequence_id)
+        if chain is None:
+            graph = self.graph
+            chain = self._resolve(consequence_id, graph.predecessors, graph.successors,
+                                  self._mitigation_ids, self._from_top, self._mitigation_rank)
+            self._mitigation[consequence_id] = chain
+        return chain
+
+    def all_prevention(self):
+        """Return ``{threat_id: Chain}`` for every threat"""
+        return {t.get('id'): self.prevention(t.get('id')) for t in self.graph.nodes_of_type('threat')}
+
+    def all_mitigation(self):
+        """Return ``{consequence_id: Chain}`` for every consequence"""
+        return {c.get('id'): self.mitigation(c.get('id')) for c in self.graph.nodes_of_type('consequence')}
+
+    def sources_of(self, barrier_id):
+        """Return ``[('threat' | 'consequence', id), ...]`` whose chains include ``barrier_id``"""
+        if self._sources is None:
+            sources = {}
+            for kind, chains in (('threat', self.all_prevention()), ('consequence', self.all_mitigation())):
+                for source_id, chain in chains.items():
+                    for barrier in chain.barriers:
+                        sources.setdefault(barrier.get('id'), []).append((kind, source_id))
+            self._sources = sources
+        return self._sources.get(barrier_id, [])
+
+
+def get_chains(graph):
+    """Return the memoized :class:`BarrierChains` for ``graph``"""
+    return graph.cached('chains', BarrierChains)
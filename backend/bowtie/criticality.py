@@ -0,0 +1,239 @@
+"""Barrier criticality: how much worse things get if one or two barriers fail.
+
+For every barrier, and every pair of barriers, the analysis forces the
+barrier(s) to fail and measures consequence exposure, i.e. the expected
+number of consequences ``top * sum(mitigation_failure)`` (the top event
+likelihood when the diagram has no consequences). Barriers are ranked by the
+increase over the baseline.
+
+All candidates share one baseline (see :func:`bowtie.incremental.get_baseline`).
+Failing barrier ``x`` only changes the chains it sits on, so it is summarized
+by two numbers:
+
+* ``r[x]``: the factor by which ``prod(1 - threat_likelihood)`` changes,
+* ``m[x]``: the change in ``sum(mitigation_failure)``.
+
+For two barriers that share no chain these combine exactly as
+``r[a] * r[b]`` and ``m[a] + m[b]``, so the whole pair table is an outer
+product, evaluated with NumPy in row blocks that keep only their best
+candidates. Pairs that do share a chain (usually few) are evaluated exactly
+and patched in. Large diagrams spread the row blocks over a process pool.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import get_context
+from typing import NamedTuple
+
+import numpy as np
+
+from .incremental import get_baseline
+from .risk import FAILED_PROBABILITY, NORMAL_PROBABILITY
+
+DEFAULT_TOP_PAIRS = 50
+BLOCK_ROWS = 512
+# Below this many barriers the pair table is faster in-process than on a pool
+PARALLEL_MIN_BARRIERS = 4000
+
+
+class Criticality(NamedTuple):
+    barrier_ids: tuple
+    top_event_likelihood: float
+    exposure: float
+    increase: float
+    interaction: float = 0.0  # pairs: increase beyond the two single increases
+
+
+class CriticalityReport(NamedTuple):
+    default_probability: float
+    baseline_top_event: float
+    baseline_exposure: float
+    singles: tuple
+    pairs: tuple
+    pairs_evaluated: int
+    elapsed: float
+    workers: int
+
+
+class _Tables(NamedTuple):
+    """Per-barrier summaries and exact shared-chain pairs; picklable"""
+    not_top: float
+    mitigation_total: float
+    use_top: bool
+    r: np.ndarray
+    m: np.ndarray
+    shared_i: np.ndarray
+    shared_j: np.ndarray
+    shared_r: np.ndarray
+    shared_m: np.ndarray
+
+
+def _changes(baseline, probabilities, failed):
+    """Return ``(r, m)`` for forcing the barrier indexes in ``failed`` to fail"""
+    kernel = baseline.model.kernel
+    saved = probabilities[failed].copy()
+    probabilities[failed] = FAILED_PROBABILITY
+    try:
+        r = 1.0
+        if baseline.not_top.value > 0.0:
+            # Otherwise some threat already reaches the top event for certain and r is moot
+            for row in {row for i in failed for row in baseline.prevention_rows[i]}:
+                new = kernel.threat_likelihood[row] * kernel.prevention.row_failure(row, probabilities)
+                r *= (1.0 - new) / (1.0 - baseline.threat[row])
+        mitigation_rows = {row for i in failed for row in baseline.mitigation_rows[i]}
+        m = sum(kernel.mitigation.row_failure(row, probabilities) - baseline.mitigation[row]
+                for row in mitigation_rows)
+    finally:
+        probabilities[failed] = saved
+    return r, m
+
+
+def _exposure(tables, r, m):
+    top = 1.0 - tables.not_top * r
+    return top, top if tables.use_top else top * (tables.mitigation_total + m)
+
+
+def _build_tables(baseline):
+    model = baseline.model
+    count = len(model.barrier_ids)
+    probabilities = baseline.probabilities.copy()
+    r = np.ones(count)
+    m = np.zeros(count)
+    for i in range(count):
+        r[i], m[i] = _changes(baseline, probabilities, [i])
+
+    # Pairs on a common chain don't combine independently; evaluate them exactly
+    shared = set()
+    for rows in (model.kernel.prevention.members, model.kernel.mitigation.members):
+        for members in rows:
+            members = sorted(set(members.tolist()))
+            shared.update((a, b) for k, a in enumerate(members) for b in members[k + 1:])
+    shared = sorted(shared)
+    exact = [_changes(baseline, probabilities, list(pair)) for pair in shared]
+    return _Tables(
+        not_top=baseline.not_top.value,
+        mitigation_total=baseline.mitigation_total,
+        use_top=not model.consequence_ids,
+        r=r,
+        m=m,
+        shared_i=np.array([a for a, _ in shared], dtype=np.intp),
+        shared_j=np.array([b for _, b in shared], dtype=np.intp),
+        shared_r=np.array([x for x, _ in exact]),
+        shared_m=np.array([y for _, y in exact]),
+    )
+
+
+def _pair_block(tables, start, stop, keep):
+    """Return the ``keep`` best pairs ``(i, j, top, exposure)`` with ``start <= i < stop``, ``i < j``"""
+    # Columns from ``start`` on; the diagonal and below are masked out further down
+    r = tables.r[start:stop, None] * tables.r[None, start:]
+    m = tables.m[start:stop, None] + tables.m[None, start:]
+    inside = (tables.shared_i >= start) & (tables.shared_i < stop)
+    rows = tables.shared_i[inside] - start
+    cols = tables.shared_j[inside] - start
+    r[rows, cols] = tables.shared_r[inside]
+    m[rows, cols] = tables.shared_m[inside]
+    top, exposure = _exposure(tables, r, m)
+    exposure[np.tril_indices(stop - start, m=exposure.shape[1])] = -np.inf
+
+    flat = exposure.ravel()
+    if keep < flat.size:
+        best = np.argpartition(flat, -keep)[-keep:]
+    else:
+        best = np.arange(flat.size)
+    best = best[np.isfinite(flat[best])]
+    i, j = np.unravel_index(best, exposure.shape)
+    return [(int(a) + start, int(b) + start, float(top[a, b]), float(exposure[a, b])) for a, b in zip(i, j)]
+
+
+def analyze(graph, default_probability=NORMAL_PROBABILITY, pairs=True, top_pairs=DEFAULT_TOP_PAIRS,
+            workers=None):
+    """Rank every barrier, and the ``top_pairs`` worst barrier pairs, by exposure increase"""
+    started = time.perf_counter()
+    baseline = get_baseline(graph, default_probability)
+    model = baseline.model
+    ids = model.barrier_ids
+    count = len(ids)
+
+    tables = _build_tables(baseline)
+    base_top, base_exposure = map(float, _exposure(tables, 1.0, 0.0))
+    tops, exposures = _exposure(tables, tables.r, tables.m)
+    singles = [
+        Criticality((ids[i],), float(tops[i]), float(exposures[i]), float(exposures[i]) - base_exposure)
+        for i in range(count)
+    ]
+    ranked_singles = tuple(sorted(singles, key=lambda c: -c.increase))
+
+    ranked_pairs = ()
+    used = 1
+    pairs_evaluated = count * (count - 1) // 2 if pairs else 0
+    if pairs and top_pairs > 0 and count > 1:
+        starts = list(range(0, count, BLOCK_ROWS))
+        stops = starts[1:] + [count]
+        block = partial(_pair_block, tables, keep=top_pairs)
+        if count >= PARALLEL_MIN_BARRIERS:
+            used = max(1, min(workers or os.cpu_count() or 1, len(starts)))
+        if used == 1:
+            found = [pair for a, b in zip(starts, stops) for pair in block(a, b)]
+        else:
+            # spawn rather than fork: the Streamlit server is multi-threaded
+            with ProcessPoolExecutor(used, mp_context=get_context('spawn')) as pool:
+                found = [pair for part in pool.map(block, starts, stops) for pair in part]
+        found.sort(key=lambda pair: -pair[3])
+        ranked_pairs = tuple(
+            Criticality(
+                (ids[i], ids[j]), top, exposure, exposure - base_exposure,
+                interaction=exposure - base_exposure - singles[i].increase - singles[j].increase,
+            )
+            for i, j, top, exposure in found[:top_pairs]
+        )
+
+    return CriticalityReport(
+        default_probability=default_probability,
+        baseline_top_event=base_top,
+        baseline_exposure=base_exposure,
+        singles=ranked_singles,
+        pairs=ranked_pairs,
+        pairs_evaluated=pairs_evaluated,
+        elapsed=time.perf_counter() - started,
+        workers=used,
+    )
+
+
+def get_criticality(graph, default_probability=NORMAL_PROBABILITY, pairs=True, top_pairs=DEFAULT_TOP_PAIRS):
+    """Return the memoized :func:`analyze` result for ``graph``"""
+    return graph.cached_lru('criticality', (default_probability, pairs, top_pairs),
+                            lambda g: analyze(g, default_probability, pairs, top_pairs))
+
+
+def main(argv=None):
+    import argparse
+
+    from .loader import load_graph
+
+    parser = argparse.ArgumentParser(description='Rank the barriers of a bowtie diagram by criticality')
+    parser.add_argument('source', help='bowtie diagram (*.json or *.btsnap)')
+    parser.add_argument('--default-probability', type=float, default=0.1,
+                        help='failure probability of barriers that do not set their own')
+    parser.add_argument('--top', type=int, default=20, help='rows to print per ranking')
+    parser.add_argument('--no-pairs', action='store_true', help='rank single barriers only')
+    parser.add_argument('--workers', type=int, default=None, help='processes for large diagrams (default: one per CPU)')
+    args = parser.parse_args(argv)
+
+    report = analyze(load_graph(args.source), args.default_probability, not args.no_pairs, args.top, args.workers)
+    print(f'Baseline exposure {report.baseline_exposure:.4g} (top event {report.baseline_top_event:.4g})')
+    print('Single barriers:')
+    for c in report.singles[:args.top]:
+        print(f'  +{c.increase:.4g}  {c.barrier_ids[0]}')
+    if report.pairs:
+        print('Barrier pairs:')
+        for c in report.pairs:
+            print(f'  +{c.increase:.4g}  {" + ".join(c.barrier_ids)}  (interaction {c.interaction:+.4g})')
+    print(f'{len(report.singles)} barriers, {report.pairs_evaluated} pairs in {report.elapsed:.2f}s '
+          f'on {report.workers} process(es)')
+
+
+if __name__ == '__main__':
+    main()
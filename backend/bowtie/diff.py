@@ -0,0 +1,209 @@
+"""Structural diff between two revisions of a bowtie diagram.
+
+Nodes are matched in three near-linear passes, each only over what is
+still unmatched:
+
+1. by id;
+2. by identical normalized label within the same node type (hash lookup);
+3. by label token similarity (Jaccard) within the same node type, with
+   candidates drawn from an inverted token index instead of comparing every
+   pair. Very common tokens are skipped for candidate generation so a
+   10k-node diagram never degrades into a quadratic scan.
+
+Edges are compared after translating old endpoints through the node
+matching; an edge id present in both revisions with different endpoints is
+reported as re-routed. Chain lengths come from :mod:`bowtie.chains` on both
+sides.
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+from .chains import get_chains
+from .search import tokenize
+
+SIMILARITY_THRESHOLD = 0.5
+MAX_CANDIDATE_POSTINGS = 50
+COMPARED_FIELDS = ('label', 'description', 'barrierType', 'status', 'failureProbability', 'likelihood')
+
+
+class NodeChange(NamedTuple):
+    node_id: str
+    old_id: str
+    node_type: str
+    fields: dict  # field -> (old, new)
+
+
+class ChainLengthChange(NamedTuple):
+    kind: str        # 'threat' or 'consequence'
+    node_id: str
+    label: str
+    old_length: int  # None when the threat/consequence was added
+    new_length: int  # None when it was removed
+
+
+class BowtieDiff(NamedTuple):
+    added: list
+    removed: list
+    changed: list
+    matched_by_label: list   # (old_id, new_id, similarity)
+    status_flips: list       # (node_id, old_status, new_status)
+    edges_added: list        # (source, target) in new ids
+    edges_removed: list      # (source, target) in new ids where matched, else old ids
+    edges_rerouted: list     # (edge_id, (old source, old target), (new source, new target))
+    chain_lengths: list
+
+    @property
+    def is_empty(self):
+        return not any((self.added, self.removed, self.changed, self.edges_added,
+                        self.edges_removed, self.edges_rerouted))
+
+
+def _label(node):
+    return (node.get('data') or {}).get('label') or ''
+
+
+def _normalized(label):
+    return ' '.join(tokenize(label))
+
+
+def _match_nodes(old, new):
+    """Return ``{old_id: (new_id, similarity)}``"""
+    matches = {}
+    for node in old.nodes:
+        node_id = node.get('id')
+        if node_id in new and node_id not in matches:
+            matches[node_id] = (node_id, 1.0)
+
+    matched_new = {new_id for new_id, _ in matches.values()}
+    unmatched_old = [n for n in old.nodes if n.get('id') not in matches]
+    unmatched_new = [n for n in new.nodes if n.get('id') not in matched_new]
+    if not unmatched_old or not unmatched_new:
+        return matches
+
+    # Exact label within the same type
+    by_label = {}
+    for node in unmatched_new:
+        by_label.setdefault((node.get('type'), _normalized(_label(node))), deque()).append(node.get('id'))
+    remaining_old = []
+    for node in unmatched_old:
+        bucket = by_label.get((node.get('type'), _normalized(_label(node))))
+        if bucket:
+            # Duplicates pair up in document order
+            new_id = bucket.popleft()
+            matches[node.get('id')] = (new_id, 1.0)
+            matched_new.add(new_id)
+        else:
+            remaining_old.append(node)
+
+    # Token similarity within the same type, candidates via an inverted index
+    tokens = {}
+    postings = {}
+    for node in unmatched_new:
+        new_id = node.get('id')
+        if new_id in matched_new:
+            continue
+        node_tokens = frozenset(tokenize(_label(node)))
+        tokens[new_id] = node_tokens
+        for token in node_tokens:
+            postings.setdefault((node.get('type'), token), []).append(new_id)
+
+    for node in remaining_old:
+        old_tokens = frozenset(tokenize(_label(node)))
+        candidates = set()
+        for token in old_tokens:
+            posting = postings.get((node.get('type'), token), ())
+            if len(posting) <= MAX_CANDIDATE_POSTINGS:
+                candidates.update(posting)
+        best, best_score = None, SIMILARITY_THRESHOLD
+        for new_id in candidates:
+            if new_id in matched_new:
+                continue
+            union = len(old_tokens | tokens[new_id])
+            score = len(old_tokens & tokens[new_id]) / union if union else 0.0
+            if score > best_score or (score == best_score and best is not None and new_id < best):
+                best, best_score = new_id, score
+        if best is not None:
+            matches[node.get('id')] = (best, best_score)
+            matched_new.add(best)
+    return matches
+
+
+def _chain_lengths(old, new, id_map):
+    changes = []
+    old_chains = get_chains(old)
+    new_chains = get_chains(new)
+    new_to_old = {new_id: old_id for old_id, new_id in id_map.items()}
+    for kind, resolve_old, resolve_new, node_type in (
+        ('threat', old_chains.prevention, new_chains.prevention, 'threat'),
+        ('consequence', old_chains.mitigation, new_chains.mitigation, 'consequence'),
+    ):
+        for node in new.nodes_of_type(node_type):
+            new_id = node.get('id')
+            old_id = new_to_old.get(new_id)
+            new_length = len(resolve_new(new_id).barriers)
+            old_length = len(resolve_old(old_id).barriers) if old_id is not None else None
+            if old_length != new_length:
+                changes.append(ChainLengthChange(kind, new_id, _label(node), old_length, new_length))
+        for node in old.nodes_of_type(node_type):
+            if node.get('id') not in id_map:
+                changes.append(ChainLengthChange(kind, node.get('id'), _label(node),
+                                                 len(resolve_old(node.get('id')).barriers), None))
+    return changes
+
+
+def diff_graphs(old, new):
+    """Compare two :class:`BowtieGraph` revisions and return a :class:`BowtieDiff`"""
+    matches = _match_nodes(old, new)
+    id_map = {old_id: new_id for old_id, (new_id, _) in matches.items()}
+    matched_new = set(id_map.values())
+
+    added = [n for n in new.nodes if n.get('id') not in matched_new]
+    removed = [n for n in old.nodes if n.get('id') not in id_map]
+    changed, matched_by_label, status_flips = [], [], []
+    for old_id, (new_id, similarity) in matches.items():
+        if old_id != new_id:
+            matched_by_label.append((old_id, new_id, similarity))
+        old_node, new_node = old.node(old_id), new.node(new_id)
+        old_data, new_data = old_node.get('data') or {}, new_node.get('data') or {}
+        fields = {f: (old_data.get(f), new_data.get(f)) for f in COMPARED_FIELDS
+                  if old_data.get(f) != new_data.get(f)}
+        if old_node.get('type') != new_node.get('type'):
+            fields['type'] = (old_node.get('type'), new_node.get('type'))
+        if fields:
+            changed.append(NodeChange(new_id, old_id, new_node.get('type'), fields))
+        if 'status' in fields:
+            status_flips.append((new_id, *fields['status']))
+
+    old_edges = {}
+    for edge in old.edges:
+        key = (id_map.get(edge.get('source'), edge.get('source')), id_map.get(edge.get('target'), edge.get('target')))
+        old_edges.setdefault(key, edge.get('id'))
+    new_edges = {}
+    for edge in new.edges:
+        new_edges.setdefault((edge.get('source'), edge.get('target')), edge.get('id'))
+
+    added_keys = [k for k in new_edges if k not in old_edges]
+    removed_keys = [k for k in old_edges if k not in new_edges]
+    removed_by_id = {old_edges[k]: k for k in removed_keys if old_edges[k] is not None}
+    edges_rerouted, edges_added = [], []
+    for key in added_keys:
+        edge_id = new_edges[key]
+        if edge_id is not None and edge_id in removed_by_id:
+            edges_rerouted.append((edge_id, removed_by_id.pop(edge_id), key))
+        else:
+            edges_added.append(key)
+    rerouted_old = {old_key for _, old_key, _ in edges_rerouted}
+    edges_removed = [k for k in removed_keys if k not in rerouted_old]
+
+    return BowtieDiff(
+        added=added,
+        removed=removed,
+        changed=changed,
+        matched_by_label=matched_by_label,
+        status_flips=status_flips,
+        edges_added=edges_added,
+        edges_removed=edges_removed,
+        edges_rerouted=edges_rerouted,
+        chain_lengths=_chain_lengths(old, new, id_map),
+    )
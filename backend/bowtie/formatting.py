@@ -0,0 +1,8 @@
+"""Display formatting shared by the presentation pages and the audit reports"""
+
+
+def format_likelihood(probability):
+    """Format a probability, switching to scientific notation when it is tiny"""
+    if 0 < probability < 0.0001:
+        return f'{probability:.1e}'
+    return f'{probability:.2%}'
@@ -0,0 +1,194 @@
+"""Indexed, read-only view of a bowtie diagram.
+
+``BowtieGraph`` is built in a single pass over the node and edge lists and
+keeps an id -> node map, per-type buckets and forward/reverse adjacency, so
+pages can answer lookups in O(1) or O(degree) instead of rescanning ``nodes``
+and ``edges``. Derived structures (chains, indexes, rollups) are memoized on
+the graph through :meth:`BowtieGraph.cached`, which ties their lifetime to
+the graph version they were computed from. Results that also depend on a
+parameter (a what-if default probability, say) go through
+:meth:`BowtieGraph.cached_lru`, which keeps only the most recently used
+few per graph.
+"""
+
+import itertools
+import sys
+import threading
+from collections import OrderedDict
+
+from .profiling import count, span
+
+NODE_TYPES = (
+    'hazard',
+    'topEvent',
+    'threat',
+    'barrier',
+    'consequence',
+    'degradationFactor',
+    'degradationControl',
+)
+BARRIER_TYPES = ('prevention', 'mitigation')
+# String fields that repeat across nodes, edges and diagrams (an edge's source
+# is some node's id). Readers intern them so every copy is one shared object.
+INTERNED_FIELDS = frozenset((
+    'id', 'type', 'source', 'target', 'sourceHandle', 'targetHandle',
+    'barrierType', 'status', 'sourcePosition', 'targetPosition',
+))
+
+# Parameter values kept per name and graph by BowtieGraph.cached_lru
+VARIANT_CACHE_SIZE = 4
+
+_EMPTY = ()
+_anonymous_versions = itertools.count(1)
+
+
+def intern_field(key, value):
+    """Return ``value``, interned if ``key`` is one of ``INTERNED_FIELDS`` and it is a string"""
+    return sys.intern(value) if key in INTERNED_FIELDS and type(value) is str else value
+
+
+class GraphBuilder:
+    """Incrementally collects nodes and edges, then freezes them into a graph.
+
+    Used directly by the streaming loader so the index is built while the
+    file is being read rather than in a second pass.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.edges = []
+        self._by_id = {}
+        self._by_type = {node_type: [] for node_type in NODE_TYPES}
+        self._by_barrier_type = {barrier_type: [] for barrier_type in BARRIER_TYPES}
+        self._successors = {}
+        self._predecessors = {}
+
+    def add_node(self, node):
+        self.nodes.append(node)
+        node_id = node.get('id')
+        if node_id in self._by_id:
+            return
+        self._by_id[node_id] = node
+        node_type = node.get('type')
+        self._by_type.setdefault(node_type, []).append(node)
+        if node_type == 'barrier':
+            barrier_type = (node.get('data') or {}).get('barrierType')
+            self._by_barrier_type.setdefault(barrier_type, []).append(node)
+
+    def add_edge(self, edge):
+        self.edges.append(edge)
+        source = edge.get('source')
+        target = edge.get('target')
+        self._successors.setdefault(source, []).append(target)
+        self._predecessors.setdefault(target, []).append(source)
+
+    def build(self, version=None):
+        """Return the finished :class:`BowtieGraph`"""
+        graph = BowtieGraph.__new__(BowtieGraph)
+        self._populate(graph, version)
+        return graph
+
+    def _populate(self, graph, version):
+        graph.version = version if version is not None else ('anonymous', next(_anonymous_versions))
+        graph.nodes = tuple(self.nodes)
+        graph.edges = tuple(self.edges)
+        graph._by_id = self._by_id
+        graph._by_type = {k: tuple(v) for k, v in self._by_type.items()}
+        graph._by_barrier_type = {k: tuple(v) for k, v in self._by_barrier_type.items()}
+        graph._successors = {k: tuple(v) for k, v in self._successors.items()}
+        graph._predecessors = {k: tuple(v) for k, v in self._predecessors.items()}
+        graph._memo = {}
+        graph._memo_lock = threading.RLock()
+
+
+class BowtieGraph:
+    """Single-pass index over a bowtie document's nodes and edges"""
+
+    def __init__(self, nodes, edges, version=None):
+        builder = GraphBuilder()
+        for node in nodes:
+            builder.add_node(node)
+        for edge in edges:
+            builder.add_edge(edge)
+        builder._populate(self, version)
+
+    @classmethod
+    def from_document(cls, document, version=None):
+        """Build a graph from a ``{'nodes': [...], 'edges': [...]}`` document"""
+        return cls(document.get('nodes', _EMPTY), document.get('edges', _EMPTY), version=version)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __contains__(self, node_id):
+        return node_id in self._by_id
+
+    def node(self, node_id):
+        """Return the node with ``node_id``, or None"""
+        return self._by_id.get(node_id)
+
+    def node_type(self, node_id):
+        """Return the type of ``node_id``, or None if it doesn't exist"""
+        node = self._by_id.get(node_id)
+        return node.get('type') if node is not None else None
+
+    def nodes_of_type(self, node_type):
+        """Return every node of ``node_type`` in document order"""
+        return self._by_type.get(node_type, _EMPTY)
+
+    def barriers(self, barrier_type):
+        """Return the 'prevention' or 'mitigation' barriers in document order"""
+        return self._by_barrier_type.get(barrier_type, _EMPTY)
+
+    def successors(self, node_id):
+        """Return the ids ``node_id`` has edges to"""
+        return self._successors.get(node_id, _EMPTY)
+
+    def predecessors(self, node_id):
+        """Return the ids that have edges to ``node_id``"""
+        return self._predecessors.get(node_id, _EMPTY)
+
+    def first(self, node_type):
+        """Return the first node of ``node_type``, or None"""
+        nodes = self._by_type.get(node_type, _EMPTY)
+        return nodes[0] if nodes else None
+
+    def counts(self):
+        """Return node counts per type plus barrier counts per side"""
+        counts = {node_type: len(nodes) for node_type, nodes in self._by_type.items()}
+        for barrier_type in BARRIER_TYPES:
+            counts[barrier_type + 'Barrier'] = len(self._by_barrier_type.get(barrier_type, _EMPTY))
+        counts['edges'] = len(self.edges)
+        return counts
+
+    def cached(self, name, builder):
+        """Return ``builder(self)``, computed once per graph and memoized under ``name``"""
+        try:
+            value = self._memo[name]
+        except KeyError:
+            pass
+        else:
+            count(f'graph.{name}.hit')
+            return value
+        with self._memo_lock:
+            if name not in self._memo:
+                count(f'graph.{name}.miss')
+                with span(f'build {name}'):
+                    self._memo[name] = builder(self)
+            return self._memo[name]
+
+    def cached_lru(self, name, key, builder, maxsize=VARIANT_CACHE_SIZE):
+        """Return ``builder(self)`` memoized under ``name`` and ``key``, keeping the last ``maxsize`` keys"""
+        variants = self.cached(name, lambda g: OrderedDict())
+        with self._memo_lock:
+            if key in variants:
+                count(f'graph.{name}.hit')
+                variants.move_to_end(key)
+                return variants[key]
+            count(f'graph.{name}.miss')
+            with span(f'build {name}'):
+                value = builder(self)
+            variants[key] = value
+            while len(variants) > maxsize:
+                variants.popitem(last=False)
+            return value
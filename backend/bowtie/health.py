@@ -0,0 +1,278 @@
+"""Barrier health rollups from degradation factors and their controls.
+
+Degradation factors weaken barriers, and degradation controls keep factors
+in check. Both are drawn as edges into the barrier: ``factor -> barrier``,
+or ``factor -> control -> barrier`` when a control covers the factor.
+:func:`get_health` works out, for every barrier at once:
+
+* the factors degrading it and, per factor, the controls covering it,
+* which factors are *uncovered*, i.e. reach the barrier along some path
+  that passes through no control,
+* a health score in [0, 1]: 0 for a failed barrier, otherwise
+  ``COVERED_FACTOR_WEIGHT`` per covered factor times
+  ``UNCOVERED_FACTOR_WEIGHT`` per uncovered one.
+
+The factors upstream of each degradation node are worked out once, in one
+memoized depth-first pass backwards through degradation nodes only, and a
+barrier merges the results of its direct predecessors. A factor or control
+shared by many barriers is therefore traced once rather than once per
+barrier. (Degradation nodes on a cycle fall back to a breadth-first trace
+for the barriers they reach.) Scores are then rolled
+up to every threat's and consequence's chain (``effective_barriers`` is the
+sum of barrier health, so a chain of three barriers with one unprotected
+weakness counts as 2.5). Barriers and chains are ranked weakest first, and
+the whole rollup is memoized on the graph.
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+from .chains import get_chains
+
+COVERED_FACTOR_WEIGHT = 0.9
+UNCOVERED_FACTOR_WEIGHT = 0.5
+
+
+class FactorLink(NamedTuple):
+    factor_id: str
+    control_ids: tuple
+    covered: bool
+
+
+class BarrierHealth(NamedTuple):
+    barrier_id: str
+    barrier_type: str
+    failed: bool
+    factors: tuple
+    uncovered: tuple
+    health: float
+
+
+class ChainHealth(NamedTuple):
+    source_id: str
+    side: str
+    barrier_ids: tuple
+    effective_barriers: float
+    weakest_barrier_id: str
+    weakest_health: float
+    uncovered_factors: int
+    complete: bool
+
+
+def _trace(graph, barrier_id, factor_ids, control_ids):
+    """Return ``{factor_id: (control_ids, covered)}`` for the factors acting on a barrier"""
+    # States are (node, whether a control lies between it and the barrier)
+    seen = set()
+    queue = deque()
+    for pred in graph.predecessors(barrier_id):
+        if pred in factor_ids or pred in control_ids:
+            state = (pred, pred in control_ids)
+            seen.add(state)
+            queue.append(state)
+
+    factors = {}
+    while queue:
+        node_id, behind_control = queue.popleft()
+        if node_id in factor_ids:
+            controls, covered = factors.get(node_id, ({}, True))
+            for nxt in graph.successors(node_id):
+                if (nxt, True) in seen and nxt in control_ids:
+                    controls[nxt] = None
+            factors[node_id] = (controls, covered and behind_control)
+        for pred in graph.predecessors(node_id):
+            if pred not in factor_ids and pred not in control_ids:
+                continue
+            state = (pred, behind_control or pred in control_ids)
+            if state not in seen:
+                seen.add(state)
+                queue.append(state)
+    return {f: (tuple(controls), covered) for f, (controls, covered) in factors.items()}
+
+
+class _Cycle(Exception):
+    pass
+
+
+def _merge(into, links):
+    # A factor is covered only if it is covered along every route
+    for factor_id, (controls, covered) in links.items():
+        seen_controls, seen_covered = into.get(factor_id, ({}, True))
+        into[factor_id] = ({**seen_controls, **controls}, seen_covered and covered)
+
+
+class _Upstream:
+    """``{factor_id: (controls, covered)}`` per degradation node, each computed once
+
+    ``covered`` says whether every route from the factor to the node passes
+    a control (the node itself included); ``controls`` are the controls
+    directly after the factor on those routes.
+    """
+
+    def __init__(self, graph, factor_ids, control_ids):
+        self.graph = graph
+        self.factor_ids = factor_ids
+        self.control_ids = control_ids
+        self._links = {}
+
+    def _degradation_predecessors(self, node_id):
+        return [p for p in self.graph.predecessors(node_id) if p in self.factor_ids or p in self.control_ids]
+
+    def links(self, node_id):
+        """Return the factor links of degradation node ``node_id``; raise :class:`_Cycle` on a cycle"""
+        if node_id in self._links:
+            return self._links[node_id]
+        # Iterative post-order walk, so long control chains can't exhaust the stack
+        stack, active = [(node_id, False)], set()
+        while stack:
+            current, expanded = stack.pop()
+            if current in self._links:
+                continue
+            preds = self._degradation_predecessors(current)
+            if not expanded:
+                active.add(current)
+                stack.append((current, True))
+                for pred in preds:
+                    if pred in active:
+                        raise _Cycle(pred)
+                    if pred not in self._links:
+                        stack.append((pred, False))
+                continue
+            active.discard(current)
+            merged = {}
+            for pred in preds:
+                _merge(merged, self._links[pred])
+            if current in self.control_ids:
+                merged = {
+                    f: ({**controls, current: None} if f in preds else controls, True)
+                    for f, (controls, _) in merged.items()
+                }
+            else:
+                merged[current] = (merged.get(current, ({}, False))[0], False)
+            self._links[current] = merged
+        return self._links[node_id]
+
+    def barrier_links(self, barrier_id):
+        """Return ``{factor_id: (control_ids, covered)}`` for the factors acting on a barrier"""
+        preds = self._degradation_predecessors(barrier_id)
+        if not preds:
+            return {}
+        try:
+            merged = {}
+            for pred in preds:
+                _merge(merged, self.links(pred))
+        except _Cycle:
+            return _trace(self.graph, barrier_id, self.factor_ids, self.control_ids)
+        return {f: (tuple(controls), covered) for f, (controls, covered) in merged.items()}
+
+
+def _barrier_health(upstream, barrier):
+    barrier_id = barrier.get('id')
+    data = barrier.get('data') or {}
+    failed = data.get('status') == 'failed'
+    factors = tuple(
+        FactorLink(factor_id, controls, covered)
+        for factor_id, (controls, covered) in upstream.barrier_links(barrier_id).items()
+    )
+    health = 0.0 if failed else 1.0
+    for factor in factors:
+        health *= COVERED_FACTOR_WEIGHT if factor.covered else UNCOVERED_FACTOR_WEIGHT
+    uncovered = tuple(f.factor_id for f in factors if not f.covered)
+    return BarrierHealth(barrier_id, data.get('barrierType'), failed, factors, uncovered, health)
+
+
+def _chain_health(rollup, chain, side):
+    members = [rollup[b.get('id')] for b in chain.barriers]
+    weakest = min(members, key=lambda m: m.health, default=None)
+    return ChainHealth(
+        source_id=chain.source,
+        side=side,
+        barrier_ids=tuple(m.barrier_id for m in members),
+        effective_barriers=sum(m.health for m in members),
+        weakest_barrier_id=weakest.barrier_id if weakest else None,
+        weakest_health=weakest.health if weakest else None,
+        uncovered_factors=len({f for m in members for f in m.uncovered}),
+        complete=chain.complete,
+    )
+
+
+class HealthRollup:
+    """Barrier and chain health for one graph; use :func:`get_health` to share it"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        factor_ids = frozenset(n.get('id') for n in graph.nodes_of_type('degradationFactor'))
+        control_ids = frozenset(n.get('id') for n in graph.nodes_of_type('degradationControl'))
+        upstream = _Upstream(graph, factor_ids, control_ids)
+        self.barriers = {
+            barrier.get('id'): _barrier_health(upstream, barrier)
+            for barrier in graph.nodes_of_type('barrier')
+        }
+
+        # factor -> barriers it degrades, for tracing the other way round
+        degrades = {}
+        for health in self.barriers.values():
+            for factor in health.factors:
+                degrades.setdefault(factor.factor_id, []).append(health.barrier_id)
+        self.degrades = {f: tuple(b) for f, b in degrades.items()}
+
+        chains = get_chains(graph)
+        self.chains = {}
+        for threat in graph.nodes_of_type('threat'):
+            chain = chains.prevention(threat.get('id'))
+            self.chains[chain.source] = _chain_health(self.barriers, chain, 'prevention')
+        for consequence in graph.nodes_of_type('consequence'):
+            chain = chains.mitigation(consequence.get('id'))
+            self.chains[chain.source] = _chain_health(self.barriers, chain, 'mitigation')
+
+        uncovered = {}
+        for health in self.barriers.values():
+            for factor_id in health.uncovered:
+                uncovered.setdefault(factor_id, []).append(health.barrier_id)
+        self._uncovered = {f: tuple(b) for f, b in uncovered.items()}
+
+        self.ranked_barriers = tuple(sorted(
+            self.barriers.values(), key=lambda h: (h.health, -len(h.uncovered), -len(h.factors))
+        ))
+        self.ranked_chains = tuple(sorted(
+            self.chains.values(), key=lambda c: (c.effective_barriers, -c.uncovered_factors)
+        ))
+
+    def barrier(self, barrier_id):
+        """Return the :class:`BarrierHealth` of ``barrier_id``, or None"""
+        return self.barriers.get(barrier_id)
+
+    def chain(self, source_id):
+        """Return the :class:`ChainHealth` of a threat's or consequence's chain, or None"""
+        return self.chains.get(source_id)
+
+    def weakest_barriers(self, limit=None, degraded_only=False):
+        """Return barriers weakest first, optionally only those that are failed or degraded"""
+        ranked = self.ranked_barriers
+        if degraded_only:
+            ranked = tuple(h for h in ranked if h.health < 1.0)
+        return ranked[:limit] if limit is not None else ranked
+
+    def weakest_chains(self, limit=None):
+        """Return chains with the fewest effective barriers first"""
+        return self.ranked_chains[:limit] if limit is not None else self.ranked_chains
+
+    def uncovered_factors(self):
+        """Return ``{factor_id: barrier ids it reaches uncovered}``"""
+        return self._uncovered
+
+    def summary(self):
+        """Return headline counts and the mean barrier health"""
+        barriers = self.barriers.values()
+        return {
+            'barriers': len(self.barriers),
+            'degraded': sum(1 for h in barriers if h.factors),
+            'failed': sum(1 for h in barriers if h.failed),
+            'factors': len(self.degrades),
+            'uncovered_factors': len(self._uncovered),
+            'mean_health': sum(h.health for h in barriers) / len(self.barriers) if self.barriers else 1.0,
+        }
+
+
+def get_health(graph):
+    """Return the memoized :class:`HealthRollup` for ``graph``"""
+    return graph.cached('health', HealthRollup)
@@ -0,0 +1,203 @@
+"""Incremental what-if evaluation for single barrier changes.
+
+A :class:`WhatIfSession` evaluates the diagram once, then keeps every
+chain's breach probability and the aggregate metrics. Each barrier knows the
+chains it belongs to, so changing one barrier's status or probability only
+re-evaluates those chains and patches the aggregates:
+
+* the top event likelihood ``1 - prod(1 - L_t)`` is kept as a log-sum over
+  the non-zero factors plus a count of zero factors, so replacing one
+  threat's term is O(1);
+* consequence likelihoods are ``top * mitigation_failure[c]`` and are
+  derived on read, so a prevention change never touches mitigation chains.
+
+A toggle therefore costs O(affected chain lengths) instead of O(graph).
+
+Everything derived from the graph alone (the first evaluation, the
+barrier -> chain index) lives in a :class:`WhatIfBaseline` shared by all
+sessions on the same graph and default probability. A session starts out
+holding only references to the baseline's read-only arrays and copies them
+on its first change, so viewers who never touch a barrier cost a few
+hundred bytes each however large the diagram is. Baselines are shared
+within one process only; every server process builds its own.
+"""
+
+import math
+
+from .risk import FAILED_PROBABILITY, NORMAL_PROBABILITY, get_risk_model
+
+
+class _Product:
+    """Running product of values in [0, 1] with O(1) single-term updates"""
+
+    def __init__(self, values):
+        self.zeros = 0
+        self.log_sum = 0.0
+        for value in values:
+            self._add(value, 1)
+
+    def _add(self, value, sign):
+        if value <= 0.0:
+            self.zeros += sign
+        else:
+            self.log_sum += sign * math.log(value)
+
+    def replace(self, old, new):
+        self._add(old, -1)
+        self._add(new, 1)
+
+    @property
+    def value(self):
+        return 0.0 if self.zeros else math.exp(self.log_sum)
+
+    def copy(self):
+        product = _Product(())
+        product.zeros, product.log_sum = self.zeros, self.log_sum
+        return product
+
+
+def _read_only(array):
+    array.flags.writeable = False
+    return array
+
+
+class WhatIfBaseline:
+    """First evaluation and chain index for one graph, shared by every session on it"""
+
+    def __init__(self, graph, default_probability):
+        model = get_risk_model(graph)
+        self.model = model
+        self.default_probability = default_probability
+        self.probabilities = _read_only(model.default_probabilities(default_probability))
+
+        kernel = model.kernel
+        result = kernel.evaluate(self.probabilities)
+        self.threat = _read_only(result.threat_likelihood[0].copy())
+        self.mitigation = _read_only(result.mitigation_failure[0].copy())
+        self.not_top = _Product(1.0 - self.threat)
+        self.mitigation_total = float(self.mitigation.sum())
+
+        # barrier index -> chain rows on each side
+        prevention_rows = [[] for _ in model.barrier_ids]
+        mitigation_rows = [[] for _ in model.barrier_ids]
+        for row, members in enumerate(kernel.prevention.members):
+            for barrier in members:
+                prevention_rows[barrier].append(row)
+        for row, members in enumerate(kernel.mitigation.members):
+            for barrier in members:
+                mitigation_rows[barrier].append(row)
+        self.prevention_rows = tuple(map(tuple, prevention_rows))
+        self.mitigation_rows = tuple(map(tuple, mitigation_rows))
+        self.threat_rows = {t: i for i, t in enumerate(model.threat_ids)}
+
+
+def get_baseline(graph, default_probability=NORMAL_PROBABILITY):
+    """Return the memoized :class:`WhatIfBaseline` for ``graph``"""
+    return graph.cached_lru('whatif_baseline', default_probability,
+                            lambda g: WhatIfBaseline(g, default_probability))
+
+
+class WhatIfSession:
+    """Per-user barrier overrides over a shared, read-only graph"""
+
+    def __init__(self, graph, default_probability=NORMAL_PROBABILITY):
+        baseline = get_baseline(graph, default_probability)
+        self.graph = graph
+        self.model = baseline.model
+        self.default_probability = default_probability
+        self._base = baseline
+        # Shared with the baseline until the first change (see _own)
+        self.probabilities = baseline.probabilities
+        self._threat = baseline.threat
+        self._mitigation = baseline.mitigation
+        self._not_top = baseline.not_top.copy()
+        self.mitigation_total = baseline.mitigation_total
+        # barrier index -> probability, for barriers that differ from the baseline
+        self.overrides = {}
+        self.last_recomputed = 0
+
+    def _own(self):
+        """Copy the shared arrays before this session's first change"""
+        if self.probabilities is self._base.probabilities:
+            self.probabilities = self.probabilities.copy()
+            self._threat = self._threat.copy()
+            self._mitigation = self._mitigation.copy()
+
+    def _release(self):
+        """Go back to sharing the baseline once no overrides are left"""
+        base = self._base
+        self.probabilities, self._threat, self._mitigation = base.probabilities, base.threat, base.mitigation
+        self._not_top = base.not_top.copy()
+        self.mitigation_total = base.mitigation_total
+
+    @property
+    def top_event_likelihood(self):
+        return 1.0 - self._not_top.value
+
+    def threat_likelihood(self, threat_id):
+        return float(self._threat[self._base.threat_rows[threat_id]])
+
+    def consequence_likelihoods(self):
+        """Return ``{consequence_id: likelihood}``"""
+        top = self.top_event_likelihood
+        return {c: top * float(m) for c, m in zip(self.model.consequence_ids, self._mitigation)}
+
+    @property
+    def expected_consequences(self):
+        """Sum of consequence likelihoods (expected number of consequences)"""
+        return self.top_event_likelihood * self.mitigation_total
+
+    def failed_barriers(self):
+        """Barrier ids currently overridden to fail"""
+        ids = self.model.barrier_ids
+        return {ids[i] for i, p in self.overrides.items() if p >= FAILED_PROBABILITY}
+
+    def set_probability(self, barrier_id, probability):
+        """Change one barrier's failure probability; return the chain ids re-evaluated"""
+        index = self.model.index[barrier_id]
+        if self.probabilities[index] == probability:
+            self.last_recomputed = 0
+            return []
+        if probability == self._base.probabilities[index]:
+            del self.overrides[index]
+        else:
+            self.overrides[index] = probability
+        self._own()
+        self.probabilities[index] = probability
+
+        kernel = self.model.kernel
+        touched = []
+        for row in self._base.prevention_rows[index]:
+            old = self._threat[row]
+            new = kernel.threat_likelihood[row] * kernel.prevention.row_failure(row, self.probabilities)
+            self._threat[row] = new
+            self._not_top.replace(1.0 - old, 1.0 - new)
+            touched.append(self.model.threat_ids[row])
+        for row in self._base.mitigation_rows[index]:
+            old = self._mitigation[row]
+            new = kernel.mitigation.row_failure(row, self.probabilities)
+            self._mitigation[row] = new
+            self.mitigation_total += new - old
+            touched.append(self.model.consequence_ids[row])
+        if not self.overrides:
+            self._release()
+        self.last_recomputed = len(touched)
+        return touched
+
+    def set_failed(self, barrier_id, failed=True):
+        """Toggle a barrier between failed and its baseline probability"""
+        index = self.model.index[barrier_id]
+        probability = FAILED_PROBABILITY if failed else self._base.probabilities[index]
+        return self.set_probability(barrier_id, probability)
+
+    def apply_failed(self, failed_ids):
+        """Make exactly ``failed_ids`` overridden to fail, toggling only the difference"""
+        failed_ids = set(failed_ids)
+        current = self.failed_barriers()
+        touched = []
+        for barrier_id in current - failed_ids:
+            touched += self.set_failed(barrier_id, False)
+        for barrier_id in failed_ids - current:
+            touched += self.set_failed(barrier_id, True)
+        self.last_recomputed = len(touched)
+        return touched
@@ -0,0 +1,264 @@
+"""Bowtie placement computed on the server.
+
+The editor can lay a diagram out itself (``bowtieLayout.js`` / ELK), but on
+large diagrams that blocks the browser on every load. :func:`compute_layout`
+produces the same bowtie arrangement in Python: top event in the centre,
+hazard above it, threats in a column on the left with their prevention
+barriers in a row towards the top event, consequences on the right with
+their mitigation barriers, and degradation controls/factors stepped down
+below the barrier they act on. Spacing constants mirror ``bowtieLayout.js``;
+the outer columns move out when a barrier chain would not fit.
+
+Positions only depend on the diagram's structure (node ids and types,
+barrier sides, edges, and degradation labels, which set the stacking
+order), so they are cached by a hash of that structure: once in-process in
+a small LRU shared by every session, and optionally on disk under
+``BOWTIE_LAYOUT_CACHE``. Relabelling a barrier or changing its status reuses
+the cached layout. To write a laid-out copy of a diagram::
+
+    python -m bowtie.layout data/demo_bowtie.json laid_out.json
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .chains import get_chains
+from .paths import get_path_index
+
+# Mirrors NODE_DIMENSIONS (components/NodeTypes.jsx) and bowtieLayout.js
+NODE_SIZE = (140, 80)
+TOP_EVENT_SIZE = (120, 120)
+LAYER_SPACING = 400
+CENTER_X = 800
+CENTER_Y = 500
+HAZARD_OFFSET_Y = -200
+BARRIER_GAP = 20
+MIN_PATH_GAP = 100
+DEGRADATION_OFFSET = 60
+DEGRADATION_GAP = 30
+DEGRADATION_SPACING = 40
+
+LAYOUT_CACHE_SIZE = 64
+LAYOUT_CACHE_DIR = os.environ.get('BOWTIE_LAYOUT_CACHE')
+
+
+def structure_hash(graph):
+    """Return a hex digest of the parts of ``graph`` that affect its layout"""
+    def build(graph):
+        digest = hashlib.sha256()
+        for node in sorted(graph.nodes, key=lambda n: str(n.get('id'))):
+            data = node.get('data') or {}
+            label = data.get('label', '') if node.get('type') in ('degradationFactor', 'degradationControl') else ''
+            digest.update(json.dumps(
+                [node.get('id'), node.get('type'), data.get('barrierType'), label]
+            ).encode())
+        for edge in sorted((str(e.get('source')), str(e.get('target'))) for e in graph.edges):
+            digest.update(json.dumps(edge).encode())
+        return digest.hexdigest()
+
+    return graph.cached('structure_hash', build)
+
+
+def _degradation_extent(count):
+    # Height of a staircase of ``count`` degradation nodes below a barrier
+    if not count:
+        return 0
+    return DEGRADATION_OFFSET + (count - 1) * DEGRADATION_OFFSET + NODE_SIZE[1]
+
+
+def _stack(sources, chain_of, degradation):
+    """Return centre y per source, stacking paths down and centring on CENTER_Y"""
+    centres = {}
+    current = 0
+    for source in sources:
+        extent = max((_degradation_extent(len(degradation(b))) for b in chain_of(source)), default=0)
+        height = NODE_SIZE[1] + (extent + DEGRADATION_SPACING if extent else 0) + 50
+        centres[source] = current + height / 2
+        current = centres[source] + height / 2 + extent + MIN_PATH_GAP
+    offset = CENTER_Y - (current - MIN_PATH_GAP) / 2
+    return {source: y + offset for source, y in centres.items()}
+
+
+def compute_layout(graph):
+    """Return ``{node_id: (x, y)}`` for every node the bowtie arrangement places
+
+    Nodes outside it (extra top events, nodes on no chain) are left out, so
+    callers keep their existing positions.
+    """
+    chains = get_chains(graph)
+    paths = get_path_index(graph)
+    width, height = NODE_SIZE
+    positions = {}
+
+    top = graph.first('topEvent')
+    if top is None:
+        return positions
+    positions[top['id']] = (CENTER_X - TOP_EVENT_SIZE[0] / 2, CENTER_Y - TOP_EVENT_SIZE[1] / 2)
+
+    def degradation(barrier):
+        nodes = [graph.node(n) for n in paths.degradation_of(barrier.get('id'))]
+        nodes.sort(key=lambda n: (n.get('type') != 'degradationFactor', (n.get('data') or {}).get('label', '')))
+        return nodes
+
+    def place_chain(barriers, start_x, centre_y):
+        for i, barrier in enumerate(barriers):
+            if barrier['id'] in positions:
+                continue  # shared barrier: the first chain through it wins
+            x = start_x + BARRIER_GAP + i * (width + BARRIER_GAP)
+            positions[barrier['id']] = (x, centre_y - height / 2)
+            steps = degradation(barrier)
+            row_width = len(steps) * width + max(len(steps) - 1, 0) * DEGRADATION_GAP
+            row_x = x + width / 2 - row_width / 2
+            for j, node in enumerate(steps):
+                positions.setdefault(node['id'], (
+                    row_x + j * (width + DEGRADATION_GAP),
+                    centre_y + height / 2 + DEGRADATION_OFFSET + j * DEGRADATION_OFFSET,
+                ))
+
+    # Outer columns sit LAYER_SPACING * 2 from the centre, pushed further out
+    # when a chain of barriers would not fit between them and the top event
+    step = width + BARRIER_GAP
+    threats = [n['id'] for n in graph.nodes_of_type('threat')]
+    longest = max((len(chains.prevention(t).barriers) for t in threats), default=0)
+    threat_x = min(
+        CENTER_X - LAYER_SPACING * 2 - width / 2,
+        CENTER_X - TOP_EVENT_SIZE[0] / 2 - longest * step - width - BARRIER_GAP,
+    )
+    threat_y = _stack(threats, lambda t: chains.prevention(t).barriers, degradation)
+    for threat in threats:
+        positions[threat] = (threat_x, threat_y[threat] - height / 2)
+        place_chain(chains.prevention(threat).barriers, threat_x + width, threat_y[threat])
+
+    consequences = [n['id'] for n in graph.nodes_of_type('consequence')]
+    top_right = CENTER_X + TOP_EVENT_SIZE[0] / 2
+    longest = max((len(chains.mitigation(c).barriers) for c in consequences), default=0)
+    consequence_x = max(CENTER_X + LAYER_SPACING * 2 - width / 2, top_right + longest * step + BARRIER_GAP)
+    consequence_y = _stack(consequences, lambda c: chains.mitigation(c).barriers, degradation)
+    for consequence in consequences:
+        positions[consequence] = (consequence_x, consequence_y[consequence] - height / 2)
+        place_chain(chains.mitigation(consequence).barriers, top_right, consequence_y[consequence])
+
+    # The hazard goes above the top event, and above anything already placed
+    # in that column
+    hazard = graph.first('hazard')
+    if hazard is not None:
+        x = CENTER_X - width / 2
+        y = CENTER_Y + HAZARD_OFFSET_Y - height / 2
+        below = [py for px, py in positions.values() if abs(px - x) < width]
+        positions[hazard['id']] = (x, min([y] + [py - height - BARRIER_GAP for py in below]))
+
+    return positions
+
+
+class LayoutCache:
+    """LRU of computed layouts keyed by structure hash, optionally backed by a directory"""
+
+    def __init__(self, maxsize=LAYOUT_CACHE_SIZE, directory=None):
+        self.maxsize = maxsize
+        self.directory = Path(directory) if directory else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _read(self, key):
+        if self.directory is None:
+            return None
+        try:
+            with open(self.directory / f'{key}.json', 'r') as f:
+                return {node_id: tuple(xy) for node_id, xy in json.load(f).items()}
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, key, positions):
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            target = self.directory / f'{key}.json'
+            tmp = target.with_suffix('.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(positions, f, separators=(',', ':'))
+            os.replace(tmp, target)
+        except OSError:
+            pass  # the disk cache is best effort
+
+    def get(self, graph):
+        """Return the layout for ``graph``, computing it once per distinct structure"""
+        key = structure_hash(graph)
+        with self._lock:
+            positions = self._entries.get(key)
+            if positions is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return positions
+            self.misses += 1
+
+        positions = self._read(key)
+        if positions is None:
+            positions = compute_layout(graph)
+            self._write(key, positions)
+
+        with self._lock:
+            self._entries[key] = positions
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return positions
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+_default_cache = LayoutCache(directory=LAYOUT_CACHE_DIR)
+
+
+def get_layout(graph, cache=None):
+    """Return ``{node_id: (x, y)}`` for ``graph`` through the shared layout cache"""
+    if cache is None:
+        return graph.cached('layout', _default_cache.get)
+    return cache.get(graph)
+
+
+def laid_out_document(graph, positions=None):
+    """Return a plain ``{'nodes', 'edges'}`` document with computed positions applied"""
+    from .loader import thaw
+
+    if positions is None:
+        positions = get_layout(graph)
+    nodes = []
+    for node in graph.nodes:
+        node = thaw(node)
+        xy = positions.get(node.get('id'))
+        if xy is not None:
+            node['position'] = {'x': round(xy[0], 2), 'y': round(xy[1], 2)}
+        nodes.append(node)
+    return {'nodes': nodes, 'edges': [thaw(e) for e in graph.edges]}
+
+
+def main(argv=None):
+    import argparse
+
+    from .loader import load_graph
+
+    parser = argparse.ArgumentParser(description='Write a copy of a bowtie diagram with computed node positions')
+    parser.add_argument('source', help='bowtie diagram (*.json or *.btsnap)')
+    parser.add_argument('target', help='JSON file to write')
+    args = parser.parse_args(argv)
+
+    graph = load_graph(args.source)
+    document = laid_out_document(graph)
+    with open(args.target, 'w') as f:
+        json.dump(document, f, indent=2)
+    placed = len(get_layout(graph))
+    print(f'Wrote {args.target}: {placed} of {len(graph)} nodes positioned')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Process-wide cache for bowtie diagram files.
+
+Streamlit re-executes the whole script on every widget interaction, so the
+loader keeps parsed diagrams in memory and only goes back to disk when the
+file's mtime or size changes. Cached documents are handed out as read-only
+views (mappings and tuples) so every session can share the same objects
+without deep-copying them. The indexed :class:`BowtieGraph` for a document
+is cached alongside it, so it is built once per file version. Files of at
+least ``STREAMING_THRESHOLD`` bytes are indexed with the streaming reader in
+:mod:`bowtie.stream` when only the graph is requested, and binary snapshots
+(``*.btsnap``, see :mod:`bowtie.snapshot`) are read through a memory map.
+
+String fields that repeat (ids, types, edge endpoints, barrier types) are
+interned while reading, so an edge's ``source`` is the very string object of
+the node it points at, and diagrams in the same process share them too.
+Each process still holds its own copy of every diagram it loads: a
+snapshot's memory map is only open while the graph is being built from it.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from types import MappingProxyType
+
+from .graph import BowtieGraph, intern_field
+from .profiling import count, span
+from .snapshot import SNAPSHOT_SUFFIX, open_snapshot
+from .stream import stream_graph
+
+DEFAULT_CACHE_SIZE = 16
+STREAMING_THRESHOLD = 8 * 1024 * 1024
+
+
+def _freeze_value(value):
+    if isinstance(value, list):
+        return tuple(_freeze_value(v) for v in value)
+    return value
+
+
+def _freeze_object(obj):
+    # json object_hook: objects are frozen bottom-up while parsing, so only
+    # list values still need converting here
+    return MappingProxyType({k: _freeze_value(intern_field(k, v)) for k, v in obj.items()})
+
+
+def thaw(value):
+    """Return a plain, mutable (and JSON-serialisable) copy of a frozen value"""
+    if isinstance(value, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [thaw(v) for v in value]
+    return value
+
+
+def file_signature(path):
+    """Return the (path, mtime_ns, size) key used to detect file changes"""
+    stat = Path(path).stat()
+    return (str(path), stat.st_mtime_ns, stat.st_size)
+
+
+class BowtieCache:
+    """Bounded LRU cache of parsed bowtie documents keyed by path and mtime/size"""
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE, streaming_threshold=STREAMING_THRESHOLD):
+        self.maxsize = maxsize
+        self.streaming_threshold = streaming_threshold
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _entry(self, path):
+        # Entries are filled lazily outside the lock so a large file doesn't
+        # block other sessions; racing sessions may both parse it, harmlessly
+        path = Path(path).resolve()
+        signature = file_signature(path)
+
+        with self._lock:
+            entry = self._entries.get(signature[0])
+            if entry is not None and entry['signature'] == signature:
+                self._entries.move_to_end(signature[0])
+                self.hits += 1
+                count('loader.hit')
+                return entry
+            self.misses += 1
+            count('loader.miss')
+
+            # Keyed by path alone: a newer version replaces the stale one
+            entry = {'signature': signature, 'document': None, 'graph': None}
+            self._entries[signature[0]] = entry
+            self._entries.move_to_end(signature[0])
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    @staticmethod
+    def _document(entry):
+        document = entry['document']
+        if document is None:
+            path = entry['signature'][0]
+            with span('load document'):
+                if path.endswith(SNAPSHOT_SUFFIX):
+                    with open_snapshot(path) as snapshot:
+                        document = MappingProxyType({
+                            'nodes': tuple(snapshot.iter_nodes()),
+                            'edges': tuple(snapshot.iter_edges()),
+                        })
+                else:
+                    with open(path, 'r') as f:
+                        document = json.load(f, object_hook=_freeze_object)
+            entry['document'] = document
+        return document
+
+    def load(self, path):
+        """Return the frozen document at ``path``, parsing it only if it changed"""
+        return self._document(self._entry(path))
+
+    def load_graph(self, path):
+        """Return the indexed graph for ``path``, building it once per file version"""
+        entry = self._entry(path)
+        graph = entry['graph']
+        if graph is None:
+            signature = entry['signature']
+            with span('load graph'):
+                if entry['document'] is None and signature[0].endswith(SNAPSHOT_SUFFIX):
+                    with open_snapshot(signature[0]) as snapshot:
+                        graph = snapshot.to_graph(version=signature)
+                elif entry['document'] is None and signature[2] >= self.streaming_threshold:
+                    graph = stream_graph(signature[0], version=signature)
+                else:
+                    graph = BowtieGraph.from_document(self._document(entry), version=signature)
+            entry['graph'] = graph
+        return graph
+
+    def invalidate(self, path):
+        """Drop the cached entry for ``path`` if there is one"""
+        with self._lock:
+            self._entries.pop(str(Path(path).resolve()), None)
+
+    def clear(self):
+        """Drop every cached entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+            }
+
+
+_default_cache = BowtieCache()
+
+
+def load_bowtie(path, cache=None):
+    """Load a bowtie document through the shared process-wide cache"""
+    return (cache or _default_cache).load(path)
+
+
+def load_graph(path, cache=None):
+    """Load the indexed graph for a bowtie file through the shared cache"""
+    return (cache or _default_cache).load_graph(path)
+
+
+def cache_stats():
+    """Return the counters of the shared process-wide cache"""
+    return _default_cache.stats()
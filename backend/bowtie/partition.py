@@ -0,0 +1,165 @@
+"""Splitting a combined diagram into one sub-bowtie per top event.
+
+Enterprise files put several bowties (each with its own top event, and
+possibly its own hazard) into one diagram. :func:`partition` labels every
+node with the set of top events it belongs to, held as a bitmask, and
+propagates the labels in a single worklist sweep per direction:
+
+* backwards from each top event: hazards, threats, prevention barriers and
+  the degradation nodes acting on them,
+* forwards from each top event: mitigation barriers and consequences,
+* backwards from those mitigation barriers into degradation nodes only.
+
+Propagation stops at other top events. A node shared by two bowties (a
+common threat, say) appears in both; a node reaching no top event appears in
+none, and :func:`unassigned` lists those so callers can report them. Each
+part becomes a
+:class:`BowtieGraph` with its own version, so chains, risk models and the
+rest are cached per part. A diagram with a single top event is its own
+only part, so existing caches are reused unchanged.
+"""
+
+from collections import deque
+from typing import NamedTuple
+
+from .chains import get_chains
+from .graph import GraphBuilder
+from .risk import get_risk_model
+
+DEGRADATION_TYPES = ('degradationFactor', 'degradationControl')
+# Failure probability for barriers that don't set one, as on the what-if panel
+METRICS_DEFAULT_PROBABILITY = 0.1
+
+
+class SubBowtie(NamedTuple):
+    top_event_id: str
+    label: str
+    graph: object
+
+
+class SubBowtieMetrics(NamedTuple):
+    top_event_id: str
+    label: str
+    counts: dict
+    incomplete_chains: int
+    top_event_likelihood: float
+    consequence_likelihood: dict
+
+
+def _propagate(graph, masks, seeds, step, enter):
+    """Push each seed's mask along ``step`` into nodes accepted by ``enter``"""
+    queue = deque(seeds)
+    while queue:
+        current = queue.popleft()
+        mask = masks[current]
+        for nxt in step(current):
+            if not enter(nxt):
+                continue
+            merged = masks.get(nxt, 0) | mask
+            if merged != masks.get(nxt, 0):
+                masks[nxt] = merged
+                queue.append(nxt)
+
+
+def _masks(graph):
+    """Return ``{node_id: mask}`` over the top events (bit ``i`` for the ``i``-th); unlisted nodes have none"""
+    top_ids = [n.get('id') for n in graph.nodes_of_type('topEvent')]
+    top_set = frozenset(top_ids)
+    upstream = {top: 1 << i for i, top in enumerate(top_ids)}
+    downstream = dict(upstream)
+
+    def not_top(node_id):
+        return node_id in graph and node_id not in top_set
+
+    _propagate(graph, upstream, top_ids, graph.predecessors, not_top)
+    _propagate(graph, downstream, top_ids, graph.successors, not_top)
+    # Degradation nodes acting on mitigation barriers
+    degradation = {n: m for n, m in downstream.items() if n not in top_set}
+    _propagate(graph, degradation, list(degradation), graph.predecessors,
+               lambda n: n in graph and graph.node_type(n) in DEGRADATION_TYPES)
+
+    masks = upstream
+    for table in (downstream, degradation):
+        for node_id, mask in table.items():
+            masks[node_id] = masks.get(node_id, 0) | mask
+    return masks
+
+
+def _partition(graph):
+    top_events = graph.nodes_of_type('topEvent')
+    if len(top_events) <= 1:
+        label = (top_events[0].get('data') or {}).get('label', 'Top Event') if top_events else 'Diagram'
+        top_id = top_events[0].get('id') if top_events else None
+        return (SubBowtie(top_id, label, graph),)
+
+    top_ids = [n.get('id') for n in top_events]
+    masks = graph.cached('partition_masks', _masks)
+    builders = [GraphBuilder() for _ in top_ids]
+    for node in graph.nodes:
+        mask = masks.get(node.get('id'), 0)
+        while mask:
+            low = mask & -mask
+            builders[low.bit_length() - 1].add_node(node)
+            mask ^= low
+    for edge in graph.edges:
+        mask = masks.get(edge.get('source'), 0) & masks.get(edge.get('target'), 0)
+        while mask:
+            low = mask & -mask
+            builders[low.bit_length() - 1].add_edge(edge)
+            mask ^= low
+
+    return tuple(
+        SubBowtie(top, (node.get('data') or {}).get('label', top), builder.build(version=(graph.version, 'top', top)))
+        for top, node, builder in zip(top_ids, top_events, builders)
+    )
+
+
+def partition(graph):
+    """Return one :class:`SubBowtie` per top event of ``graph`` (memoized)"""
+    return graph.cached('partition', _partition)
+
+
+def unassigned(graph):
+    """Return the ids of nodes that :func:`partition` puts in no part (memoized)
+
+    Only diagrams with several top events drop anything: a single part is the
+    whole diagram.
+    """
+    def build(graph):
+        if len(graph.nodes_of_type('topEvent')) <= 1:
+            return ()
+        masks = graph.cached('partition_masks', _masks)
+        return tuple(dict.fromkeys(n.get('id') for n in graph.nodes if not masks.get(n.get('id'))))
+
+    return graph.cached('partition_unassigned', build)
+
+
+def _metrics(part, default_probability):
+    graph = part.graph
+    chains = get_chains(graph)
+    incomplete = sum(
+        1 for chain in [*chains.all_prevention().values(), *chains.all_mitigation().values()]
+        if not chain.complete
+    )
+    model = get_risk_model(graph)
+    result = model.evaluate(model.default_probabilities(default_probability))
+    return SubBowtieMetrics(
+        top_event_id=part.top_event_id,
+        label=part.label,
+        counts=graph.counts(),
+        incomplete_chains=incomplete,
+        top_event_likelihood=float(result.top_event_likelihood[0]),
+        consequence_likelihood=dict(zip(model.consequence_ids, map(float, result.consequence_likelihood[0]))),
+    )
+
+
+def partition_metrics(graph, default_probability=METRICS_DEFAULT_PROBABILITY):
+    """Return :class:`SubBowtieMetrics` for every part of ``graph``
+
+    Computed in-process, part by part: the work is pure Python (a thread
+    pool would only contend for the GIL), and each part's chains and risk
+    model are memoized on its graph, so the pages reuse them afterwards. The
+    combined result is memoized on ``graph`` too.
+    """
+    return graph.cached_lru('partition_metrics', default_probability,
+                            lambda g: tuple(_metrics(part, default_probability) for part in partition(g)))
@@ -0,0 +1,183 @@
+"""Precomputed highlight paths for Focus Mode.
+
+The editor's ``getNodePath`` rescans every edge on each BFS step of each
+hover. :class:`PathIndex` instead resolves every chain once (through
+:mod:`bowtie.chains`) into *segments*:
+
+* threat -> prevention barriers -> top event(s), and
+* top event(s) -> mitigation barriers -> consequence,
+
+each including the degradation controls and factors attached to its
+barriers. Nodes are interned to integer positions and every node maps to the
+segments it appears in, so a highlight lookup just concatenates a few
+segments: O(path length). Highlight rules follow ``getNodePath``: a threat
+or consequence lights its own segment, a barrier lights its own segment(s)
+plus every segment on the other side of its top event, the top event lights
+only itself.
+
+:meth:`PathIndex.to_payload` gives a compact JSON form: each node's own
+segments, plus the segments of every top event per side, so a barrier's
+cross-top-event highlight is assembled by the client instead of being
+spelled out for every barrier. The sync server
+sends it with every snapshot (see :mod:`bowtie.sync`), where the editor's
+``getIndexedPath`` replaces ``getNodePath``; export one with::
+
+    python -m bowtie.paths data/demo_bowtie.json paths.json
+"""
+
+from collections import deque
+
+from .chains import get_chains
+
+DEGRADATION_TYPES = ('degradationFactor', 'degradationControl')
+
+
+class PathIndex:
+    """Segment-based reachability index for one graph; use :func:`get_path_index`"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        chains = get_chains(graph)
+        self.ids = [n.get('id') for n in graph.nodes]
+        position = {}
+        for i, node_id in enumerate(self.ids):
+            position.setdefault(node_id, i)
+        self._position = position
+
+        self.segments = []
+        self._node_segments = {}
+        # top event id -> segment ids on the prevention / mitigation side
+        self._prevention_by_top = {}
+        self._mitigation_by_top = {}
+        self._degradation = {}
+
+        for threat in graph.nodes_of_type('threat'):
+            chain = chains.prevention(threat.get('id'))
+            members = [chain.source] + [b.get('id') for b in chain.barriers] + list(chain.top_events)
+            segment = self._add_segment(members, chain.barriers)
+            for top in chain.top_events:
+                self._prevention_by_top.setdefault(top, []).append(segment)
+        for consequence in graph.nodes_of_type('consequence'):
+            chain = chains.mitigation(consequence.get('id'))
+            members = list(chain.top_events) + [b.get('id') for b in chain.barriers] + [chain.source]
+            segment = self._add_segment(members, chain.barriers)
+            for top in chain.top_events:
+                self._mitigation_by_top.setdefault(top, []).append(segment)
+
+    def degradation_of(self, barrier_id):
+        """Return the degradation control/factor ids attached upstream of ``barrier_id``"""
+        cached = self._degradation.get(barrier_id)
+        if cached is not None:
+            return cached
+        graph = self.graph
+        found = {}
+        queue = deque([barrier_id])
+        while queue:
+            current = queue.popleft()
+            for prev in graph.predecessors(current):
+                if prev not in found and graph.node_type(prev) in DEGRADATION_TYPES:
+                    found[prev] = None
+                    queue.append(prev)
+        result = tuple(found)
+        self._degradation[barrier_id] = result
+        return result
+
+    def _add_segment(self, members, barriers):
+        segment_id = len(self.segments)
+        for barrier in barriers:
+            members.extend(self.degradation_of(barrier.get('id')))
+        positions = tuple(dict.fromkeys(self._position[m] for m in members if m in self._position))
+        self.segments.append(positions)
+        for p in positions:
+            self._node_segments.setdefault(self.ids[p], []).append(segment_id)
+        return segment_id
+
+    def segments_of(self, node_id):
+        """Return the segment ids ``node_id`` appears in"""
+        return self._node_segments.get(node_id, [])
+
+    def _highlight_segments(self, node_id):
+        node_type = self.graph.node_type(node_id)
+        own = self.segments_of(node_id)
+        if node_type != 'barrier':
+            return own
+        barrier_type = (self.graph.node(node_id).get('data') or {}).get('barrierType')
+        opposite = self._mitigation_by_top if barrier_type == 'prevention' else self._prevention_by_top
+        result = list(own)
+        for segment in own:
+            for p in self.segments[segment]:
+                result.extend(opposite.get(self.ids[p], ()))
+        return list(dict.fromkeys(result))
+
+    def path(self, node_id):
+        """Return the ids to highlight when ``node_id`` is hovered"""
+        node_type = self.graph.node_type(node_id)
+        if node_type is None:
+            return [node_id]
+        if node_type == 'topEvent':
+            return [node_id]
+        if node_type == 'hazard':
+            return [node_id, *self.graph.successors(node_id)]
+        seen = {node_id: None}
+        for segment in self._highlight_segments(node_id):
+            for p in self.segments[segment]:
+                seen[self.ids[p]] = None
+        return list(seen)
+
+    def to_payload(self):
+        """Return the index as JSON-friendly lists of interned node positions
+
+        ``own`` maps a node to its segments, ``prevention`` and ``mitigation``
+        map a top event to the segments on that side, and ``opposite`` names
+        the side whose segments a barrier adds for every top event on its
+        own segments (see :meth:`path`). The size is linear in the segments,
+        never barriers x chains.
+        """
+        own, opposite = {}, {}
+        for node_id in self._position:
+            node_type = self.graph.node_type(node_id)
+            if node_type not in ('threat', 'consequence', 'barrier') + DEGRADATION_TYPES:
+                continue
+            own[node_id] = self.segments_of(node_id)
+            if node_type == 'barrier':
+                barrier_type = (self.graph.node(node_id).get('data') or {}).get('barrierType')
+                opposite[node_id] = 'mitigation' if barrier_type == 'prevention' else 'prevention'
+        return {
+            'ids': self.ids,
+            'segments': [list(s) for s in self.segments],
+            'own': own,
+            'prevention': self._prevention_by_top,
+            'mitigation': self._mitigation_by_top,
+            'opposite': opposite,
+        }
+
+
+def get_path_index(graph):
+    """Return the memoized :class:`PathIndex` for ``graph``"""
+    return graph.cached('paths', PathIndex)
+
+
+def get_path_payload(graph):
+    """Return the memoized :meth:`PathIndex.to_payload` for ``graph``"""
+    return graph.cached('paths_payload', lambda g: get_path_index(g).to_payload())
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    from .loader import load_graph
+
+    parser = argparse.ArgumentParser(description='Export the Focus Mode path index of a bowtie diagram')
+    parser.add_argument('source', help='bowtie diagram (*.json or *.btsnap)')
+    parser.add_argument('target', help='JSON file to write')
+    args = parser.parse_args(argv)
+
+    index = get_path_index(load_graph(args.source))
+    with open(args.target, 'w') as f:
+        json.dump(index.to_payload(), f, separators=(',', ':'))
+    print(f'Wrote {args.target}: {len(index.segments)} segments over {len(index.ids)} nodes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Per-rerun timing spans and counters.
+
+The presentation starts a :class:`Profiler` at the top of each script run
+(only in developer mode) and finishes it at the bottom. Code anywhere in the
+call stack reports into the active profiler through the module functions
+:func:`span`, :func:`stage` and :func:`count`; with no profiler active they
+are no-ops, so the data layer can stay instrumented at no real cost.
+Streamlit runs every session's script in its own thread, so the active
+profiler is thread-local.
+
+A profiler can also capture a ``cProfile`` trace of the run. Finished runs
+are returned as plain dicts and, when ``BOWTIE_PROFILE_LOG`` names a file,
+appended to it as JSON lines.
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import NamedTuple
+
+PROFILE_LOG = os.environ.get('BOWTIE_PROFILE_LOG')
+PROFILE_STATS_LIMIT = 25
+
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class Span(NamedTuple):
+    name: str
+    start_ms: float
+    duration_ms: float
+    depth: int
+
+
+class Profiler:
+    """Collects spans, counters and optionally a cProfile trace for one run"""
+
+    def __init__(self, label='rerun', capture=False):
+        self.label = label
+        self.spans = []
+        self.counters = {}
+        self._depth = 0
+        self._stage = None
+        self._origin = time.perf_counter()
+        self._profile = cProfile.Profile() if capture else None
+        self.record = None
+
+    def _now(self):
+        return (time.perf_counter() - self._origin) * 1000
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as ``name``, nested under any open span"""
+        start = self._now()
+        # Spans nest under the open stage as well as under each other
+        depth = self._depth + (self._stage is not None)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.spans.append(Span(name, start, self._now() - start, depth))
+
+    def stage(self, name):
+        """Close the current top-level stage (if any) and open ``name``"""
+        now = self._now()
+        if self._stage is not None:
+            stage_name, start = self._stage
+            self.spans.append(Span(stage_name, start, now - start, 0))
+        self._stage = (name, now) if name else None
+
+    def count(self, name, n=1):
+        """Add ``n`` to counter ``name``"""
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def gauge(self, name, value):
+        """Set counter ``name`` to ``value``"""
+        self.counters[name] = value
+
+    def finish(self, log_path=None):
+        """Stop profiling and return the run as a JSON-friendly dict"""
+        self.stage(None)
+        if self._profile is not None:
+            self._profile.disable()
+        if getattr(_local, 'profiler', None) is self:
+            _local.profiler = None
+        spans = sorted(self.spans, key=lambda s: (s.start_ms, s.depth))
+        self.record = {
+            'label': self.label,
+            'timestamp': time.time(),
+            'total_ms': round(self._now(), 3),
+            'spans': [
+                {'name': s.name, 'start_ms': round(s.start_ms, 3),
+                 'duration_ms': round(s.duration_ms, 3), 'depth': s.depth}
+                for s in spans
+            ],
+            'counters': dict(self.counters),
+        }
+        log_path = log_path or PROFILE_LOG
+        if log_path:
+            write_log(self.record, log_path)
+        return self.record
+
+    def profile_text(self, limit=PROFILE_STATS_LIMIT):
+        """Return the top ``limit`` functions by cumulative time, if a trace was captured"""
+        if self._profile is None:
+            return None
+        out = io.StringIO()
+        pstats.Stats(self._profile, stream=out).sort_stats('cumulative').print_stats(limit)
+        return out.getvalue()
+
+
+def start(label='rerun', enabled=True, capture=False):
+    """Make a new profiler active for this thread, or clear it when not ``enabled``"""
+    profiler = Profiler(label, capture) if enabled else None
+    _local.profiler = profiler
+    if profiler is not None and profiler._profile is not None:
+        profiler._profile.enable()
+    return profiler
+
+
+def current():
+    """Return this thread's active profiler, or None"""
+    return getattr(_local, 'profiler', None)
+
+
+def span(name):
+    """Context manager timing ``name`` on the active profiler (no-op without one)"""
+    profiler = current()
+    return profiler.span(name) if profiler is not None else nullcontext()
+
+
+def stage(name):
+    """Switch the active profiler to stage ``name`` (no-op without one)"""
+    profiler = current()
+    if profiler is not None:
+        profiler.stage(name)
+
+
+def count(name, n=1):
+    """Bump counter ``name`` on the active profiler (no-op without one)"""
+    profiler = current()
+    if profiler is not None:
+        profiler.count(name, n)
+
+
+def write_log(record, path):
+    """Append ``record`` to the JSON lines file at ``path``"""
+    line = json.dumps(record, separators=(',', ':'))
+    with _log_lock, open(path, 'a') as f:
+        f.write(line + '\n')
@@ -0,0 +1,66 @@
+"""Memoized HTML fragments for the presentation pages.
+
+Streamlit reruns the whole script on every interaction, so the node cards on
+the Story page are formatted again each time even though the diagram rarely
+changes. :func:`render_html` fills a template once per key and serves the
+cached string afterwards. The caller supplies the key, typically
+``(graph.version, node_id)``: graph versions change whenever the diagram
+does, so a lookup costs one tuple hash instead of hashing the fields on
+every rerun, and cards are shared across sessions viewing the same version.
+The LRU bound keeps memory flat as versions come and go.
+
+Field values are diagram text and are HTML-escaped before they are filled
+in; templates are trusted markup.
+"""
+
+import threading
+from collections import OrderedDict
+from html import escape
+
+FRAGMENT_CACHE_SIZE = 512
+
+
+class FragmentCache:
+    """Bounded LRU of rendered HTML fragments keyed by template and caller-supplied key"""
+
+    def __init__(self, maxsize=FRAGMENT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, template, key, fields):
+        """Return ``template`` filled with the escaped ``fields``, formatting it once per ``(template, key)``"""
+        key = (template, key)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return html
+            self.misses += 1
+        html = template.format(**{name: escape(str(value)) for name, value in fields.items()})
+        with self._lock:
+            self._entries[key] = html
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return html
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'maxsize': self.maxsize}
+
+
+_default_cache = FragmentCache()
+
+
+def render_html(template, key, **fields):
+    """Render ``template`` through the shared fragment cache; ``key`` must change whenever ``fields`` do"""
+    return _default_cache.render(template, key, fields)
+
+
+def fragment_stats():
+    """Return the counters of the shared fragment cache"""
+    return _default_cache.stats()
@@ -0,0 +1,311 @@
+"""Audit reports for bowtie diagrams, one self-contained HTML (or PDF) per diagram.
+
+A report walks every sub-bowtie (see :mod:`bowtie.partition`) and lists its
+hazard and top event, headline metrics, structural problems, and every
+threat and consequence with its full barrier chain, barrier status and
+health, and the degradation factors acting on each barrier with the controls
+covering them. It reuses the same memoized chains, health rollup and risk
+model as the presentation.
+
+HTML is produced as a stream of chunks (:func:`iter_report_html`) and
+written out as it is generated. PDF output is optional and needs
+``weasyprint``.
+
+Batch runs go over files and directories on a process pool. Each report is
+named after its diagram's path relative to the common directory of the
+batch, suffix included (``site-a/plant.json`` becomes
+``site-a/plant.json.html``), so diagrams sharing a name never overwrite
+each other's report. A ``.bowtie-reports.json`` manifest in the output
+directory records each diagram's content hash, so unchanged diagrams are
+skipped on the next run::
+
+    python -m bowtie.report data/ --output reports/
+    python -m bowtie.report data/ --output reports/ --pdf --workers 4
+"""
+
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html import escape
+from multiprocessing import get_context
+from pathlib import Path
+from typing import NamedTuple
+
+from .chains import get_chains
+from .health import get_health
+from .loader import load_graph
+from .formatting import format_likelihood
+from .partition import METRICS_DEFAULT_PROBABILITY, partition, partition_metrics, unassigned
+from .validate import diagram_files, validate_graph
+
+# Bump when the report layout changes so every diagram is regenerated
+REPORT_VERSION = 2
+REPORT_MANIFEST = '.bowtie-reports.json'
+HASH_CHUNK = 1024 * 1024
+
+STYLE = """
+body { font-family: -apple-system, 'Segoe UI', Roboto, sans-serif; margin: 2rem; color: #1f2937; }
+h1 { border-bottom: 3px solid #1f2937; padding-bottom: .5rem; }
+h2 { margin-top: 2.5rem; border-bottom: 1px solid #d1d5db; }
+.card { padding: 1rem 1.25rem; border-radius: 8px; margin: 1rem 0; page-break-inside: avoid; }
+.hazard { background: #fef3c7; border-left: 5px solid #f59e0b; }
+.top-event, .consequence { background: #fee2e2; border-left: 5px solid #ef4444; }
+.threat { background: #dbeafe; border-left: 5px solid #3b82f6; }
+.issues { background: #fff7ed; border-left: 5px solid #fb923c; }
+table { border-collapse: collapse; width: 100%; margin: .5rem 0; }
+th, td { border: 1px solid #d1d5db; padding: .35rem .6rem; text-align: left; vertical-align: top; }
+th { background: #f3f4f6; }
+.failed { color: #b91c1c; font-weight: 600; }
+.muted { color: #6b7280; }
+"""
+
+
+class ReportResult(NamedTuple):
+    path: str
+    content_hash: str
+    outputs: tuple
+    skipped: bool
+    error: str = None
+
+
+def content_hash(path):
+    """Return the sha256 of a file's bytes, salted with the report version"""
+    digest = hashlib.sha256(f'report-v{REPORT_VERSION}'.encode())
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _text(node, field, default=''):
+    return escape(str((node.get('data') or {}).get(field, default)))
+
+
+def _card(kind, title, node):
+    return (f'<div class="card {kind}"><strong>{title}</strong>'
+            f'<h3>{_text(node, "label", node.get("id"))}</h3><p>{_text(node, "description")}</p></div>\n')
+
+
+def _factor(graph, factor):
+    label = _text(graph.node(factor.factor_id), 'label', factor.factor_id)
+    if not factor.covered:
+        return f'<span class="failed">{label} (uncovered)</span>'
+    controls = ', '.join(_text(graph.node(c), 'label', c) for c in factor.control_ids)
+    return f'{label} <span class="muted">controlled by {controls}</span>'
+
+
+def _chain_table(graph, chain, health):
+    if not chain.barriers:
+        return '<p class="muted">No barriers.</p>\n'
+    rows = []
+    for i, barrier in enumerate(chain.barriers, 1):
+        status = (barrier.get('data') or {}).get('status', 'normal')
+        barrier_health = health.barrier(barrier.get('id'))
+        factors = [_factor(graph, factor) for factor in barrier_health.factors]
+        rows.append(
+            f'<tr><td>{i}</td><td>{_text(barrier, "label", barrier.get("id"))}</td>'
+            f'<td>{_text(barrier, "description")}</td>'
+            f'<td class="{"failed" if status == "failed" else ""}">{escape(str(status))}</td>'
+            f'<td>{barrier_health.health:.0%}</td>'
+            f'<td>{"<br>".join(factors) or "&ndash;"}</td></tr>'
+        )
+    notes = []
+    if chain.branched:
+        notes.append('This chain branches; barriers are listed in flow order.')
+    if not chain.complete:
+        notes.append('This chain is not connected to the top event.')
+    return (
+        ''.join(f'<p class="muted">{note}</p>' for note in notes)
+        + '<table><tr><th>#</th><th>Barrier</th><th>Description</th><th>Status</th><th>Health</th>'
+        + '<th>Degradation factors</th></tr>\n' + '\n'.join(rows) + '</table>\n'
+    )
+
+
+def iter_report_html(graph, title, default_probability=METRICS_DEFAULT_PROBABILITY):
+    """Yield the report for ``graph`` as HTML chunks, one section at a time"""
+    yield (f'<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>{escape(title)}</title>'
+           f'<style>{STYLE}</style></head><body>\n<h1>{escape(title)}</h1>\n'
+           f'<p class="muted">Generated {time.strftime("%Y-%m-%d %H:%M")} &middot; '
+           f'{len(graph)} nodes, {len(graph.edges)} edges</p>\n')
+
+    report = validate_graph(graph)
+    if report.issues:
+        items = ''.join(
+            f'<li><strong>{issue.severity.title()}</strong> <code>{issue.code}</code>: {escape(issue.message)}</li>'
+            for issue in report.issues
+        )
+        yield f'<div class="card issues"><strong>Structural checks</strong><ul>{items}</ul></div>\n'
+
+    parts = partition(graph)
+    all_metrics = partition_metrics(graph, default_probability)
+    for part, metrics in zip(parts, all_metrics):
+        sub = part.graph
+        chains = get_chains(sub)
+        health = get_health(sub)
+        if len(parts) > 1:
+            yield f'<h2>Bowtie: {escape(part.label)}</h2>\n'
+
+        for hazard in sub.nodes_of_type('hazard'):
+            yield _card('hazard', 'Hazard', hazard)
+        top = sub.node(part.top_event_id) if part.top_event_id else None
+        if top is not None:
+            yield _card('top-event', 'Top event', top)
+
+        counts = metrics.counts
+        yield (
+            '<table><tr><th>Threats</th><th>Prevention barriers</th><th>Consequences</th>'
+            '<th>Mitigation barriers</th><th>Degradation factors</th><th>Incomplete chains</th>'
+            '<th>Top event likelihood</th></tr>'
+            f'<tr><td>{counts["threat"]}</td><td>{counts["preventionBarrier"]}</td>'
+            f'<td>{counts["consequence"]}</td><td>{counts["mitigationBarrier"]}</td>'
+            f'<td>{counts["degradationFactor"]}</td><td>{metrics.incomplete_chains}</td>'
+            f'<td>{format_likelihood(metrics.top_event_likelihood)}</td></tr></table>\n'
+            f'<p class="muted">Likelihoods assume a {default_probability:.0%} failure probability '
+            f'for barriers that don\'t set their own.</p>\n'
+        )
+
+        yield '<h2>Threats and prevention barriers</h2>\n'
+        for threat in sub.nodes_of_type('threat'):
+            yield _card('threat', 'Threat', threat)
+            yield _chain_table(sub, chains.prevention(threat.get('id')), health)
+
+        yield '<h2>Consequences and mitigation barriers</h2>\n'
+        for consequence in sub.nodes_of_type('consequence'):
+            likelihood = metrics.consequence_likelihood.get(consequence.get('id'), 0.0)
+            yield _card('consequence', f'Consequence &middot; likelihood {format_likelihood(likelihood)}', consequence)
+            yield _chain_table(sub, chains.mitigation(consequence.get('id')), health)
+
+    left_out = unassigned(graph)
+    if left_out:
+        labels = ', '.join(escape(str((graph.node(n).get('data') or {}).get('label', n))) for n in left_out)
+        yield (f'<div class="card issues"><strong>Not part of any bowtie</strong>'
+               f'<p>{len(left_out)} node(s) reach no top event: {labels}</p></div>\n')
+
+    yield '</body></html>\n'
+
+
+def write_report(graph, target, title, pdf=False):
+    """Write the HTML report for ``graph`` to ``target`` (and a PDF next to it); return the paths"""
+    target = Path(target)
+    tmp = target.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        for chunk in iter_report_html(graph, title):
+            f.write(chunk)
+    os.replace(tmp, target)
+    outputs = [str(target)]
+    if pdf:
+        try:
+            from weasyprint import HTML
+        except ImportError:
+            raise RuntimeError('PDF reports need weasyprint (pip install weasyprint)') from None
+        pdf_target = target.with_suffix('.pdf')
+        HTML(filename=str(target)).write_pdf(str(pdf_target))
+        outputs.append(str(pdf_target))
+    return tuple(outputs)
+
+
+def report_name(path, root):
+    """Return the report path for diagram ``path``, relative to the output directory"""
+    relative = Path(path).resolve().relative_to(root)
+    return relative.with_name(relative.name + '.html')
+
+
+def report_file(path, output_dir, pdf=False, known_hash=None, name=None):
+    """Generate the report for one diagram file unless its content hash is ``known_hash``
+
+    ``name`` is the report path within ``output_dir`` (see :func:`report_name`);
+    it defaults to the diagram's file name.
+    """
+    path = Path(path)
+    try:
+        digest = content_hash(path)
+        target = Path(output_dir) / (name or f'{path.name}.html')
+        target.parent.mkdir(parents=True, exist_ok=True)
+        expected = (target, target.with_suffix('.pdf')) if pdf else (target,)
+        if digest == known_hash and all(p.exists() for p in expected):
+            return ReportResult(str(path), digest, tuple(map(str, expected)), skipped=True)
+        outputs = write_report(load_graph(path), target, path.stem, pdf)
+        return ReportResult(str(path), digest, outputs, skipped=False)
+    except (OSError, ValueError, RuntimeError, TypeError, AttributeError, KeyError) as e:
+        # A malformed diagram is one failed report, not a failed batch
+        return ReportResult(str(path), None, (), skipped=False, error=f'{type(e).__name__}: {e}')
+
+
+def _read_manifest(output_dir):
+    try:
+        with open(Path(output_dir) / REPORT_MANIFEST, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _write_manifest(output_dir, manifest):
+    target = Path(output_dir) / REPORT_MANIFEST
+    tmp = target.with_suffix('.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, target)
+
+
+def generate_reports(paths, output_dir, pdf=False, workers=None, force=False):
+    """Report on every diagram under ``paths``, yielding a :class:`ReportResult` as each finishes"""
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {} if force else _read_manifest(output_dir)
+    files = diagram_files(paths)
+    root = Path(os.path.commonpath([f.resolve().parent for f in files])) if files else None
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files) or 1))
+
+    def record(result):
+        if result.error is None:
+            manifest[str(Path(result.path).resolve())] = result.content_hash
+        return result
+
+    try:
+        if workers == 1:
+            for f in files:
+                yield record(report_file(f, output_dir, pdf, manifest.get(str(f.resolve())), report_name(f, root)))
+        else:
+            with ProcessPoolExecutor(workers, mp_context=get_context('spawn')) as pool:
+                futures = [
+                    pool.submit(report_file, f, output_dir, pdf, manifest.get(str(f.resolve())), report_name(f, root))
+                    for f in files
+                ]
+                for future in as_completed(futures):
+                    yield record(future.result())
+    finally:
+        _write_manifest(output_dir, manifest)
+
+
+def main(argv=None):
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Generate audit reports for bowtie diagrams')
+    parser.add_argument('paths', nargs='+', help='diagram files or directories of diagrams')
+    parser.add_argument('--output', '-o', default='reports', help='directory to write reports to')
+    parser.add_argument('--pdf', action='store_true', help='also write PDFs (needs weasyprint)')
+    parser.add_argument('--workers', type=int, default=None, help='processes to use (default: one per CPU)')
+    parser.add_argument('--force', action='store_true', help='regenerate reports for unchanged diagrams too')
+    args = parser.parse_args(argv)
+
+    written = skipped = failed = 0
+    for result in generate_reports(args.paths, args.output, args.pdf, args.workers, args.force):
+        if result.error:
+            failed += 1
+            print(f'{result.path}: failed: {result.error}', flush=True)
+        elif result.skipped:
+            skipped += 1
+            print(f'{result.path}: unchanged', flush=True)
+        else:
+            written += 1
+            print(f'{result.path}: {", ".join(result.outputs)}', flush=True)
+    print(f'{written} written, {skipped} unchanged, {failed} failed')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
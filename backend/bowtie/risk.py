@@ -0,0 +1,208 @@
+"""Barrier-failure risk propagation over the bowtie chains.
+
+Every barrier gets a failure probability: ``data.failureProbability`` when
+the diagram provides one, otherwise the ``data.status`` flag as a degenerate
+case (``failed`` -> 1, ``normal`` -> the chosen default, 0 unless stated).
+Threats start with probability ``data.likelihood`` (1 if absent).
+
+* A threat reaches the top event if every barrier on some route of its
+  prevention chain fails. Straight chains are a product of failure
+  probabilities; branched chains are propagated node by node in flow order
+  with a noisy-OR at merges (exact for trees, independent-routes
+  approximation where routes share barriers). A direct edge between the
+  threat and the top event is a route with no barriers on it, so such a
+  threat always reaches the top event.
+* The top event likelihood combines threats with a noisy-OR.
+* A consequence's likelihood is the top event likelihood times the
+  probability that its mitigation chain fails, computed the same way (a
+  direct top event -> consequence edge likewise means certain failure).
+
+:class:`RiskModel` compiles a graph into index arrays (its picklable
+:class:`RiskKernel`) once; ``evaluate``
+then takes a ``(K, B)`` matrix of barrier failure probabilities and scores
+all K what-if configurations with a handful of vectorized NumPy operations.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+from .chains import get_chains
+
+FAILED_PROBABILITY = 1.0
+NORMAL_PROBABILITY = 0.0
+
+
+def failure_probability(barrier, default=NORMAL_PROBABILITY):
+    """Return a barrier's failure probability from its data"""
+    data = barrier.get('data') or {}
+    probability = data.get('failureProbability')
+    if probability is not None:
+        return float(probability)
+    return FAILED_PROBABILITY if data.get('status') == 'failed' else default
+
+
+class RiskResult(NamedTuple):
+    """Likelihoods for K configurations (rows)"""
+    threat_likelihood: np.ndarray       # (K, threats)
+    top_event_likelihood: np.ndarray    # (K,)
+    mitigation_failure: np.ndarray      # (K, consequences)
+    consequence_likelihood: np.ndarray  # (K, consequences)
+
+
+class _Side:
+    """Compiled chains of one side of the bowtie"""
+
+    def __init__(self, graph, index, chains, is_entry, is_exit):
+        self.size = len(chains)
+        self.complete = np.array([c.complete for c in chains], dtype=bool)
+        # Chains with an unguarded route around all their barriers always fail
+        self.bypassed = np.array([c.bypassed for c in chains], dtype=bool)
+
+        # Barrier indexes of every chain, for dependency tracking
+        self.members = [np.array([index[b.get('id')] for b in c.barriers], dtype=np.intp) for c in chains]
+
+        # Straight chains: one flat index array sliced by reduceat offsets
+        series_rows, starts, flat = [], [], []
+        self.branched = {}
+        for row, chain in enumerate(chains):
+            ids = [b.get('id') for b in chain.barriers]
+            if not chain.branched:
+                if ids:
+                    series_rows.append(row)
+                    starts.append(len(flat))
+                    flat.extend(index[b] for b in ids)
+                continue
+            # Branched chains keep, per barrier in flow order, the positions
+            # of its in-chain predecessors and whether the chain enters there
+            position = {b: i for i, b in enumerate(ids)}
+            steps = []
+            for b in ids:
+                upstream = graph.predecessors(b)
+                preds = np.array([position[u] for u in upstream if u in position], dtype=np.intp)
+                entry = any(is_entry(chain, u) for u in upstream)
+                steps.append((index[b], preds, entry))
+            exits = np.array([position[b] for b in ids if is_exit(chain, b)], dtype=np.intp)
+            self.branched[row] = (steps, exits)
+
+        self.series_rows = np.array(series_rows, dtype=np.intp)
+        self.series_starts = np.array(starts, dtype=np.intp)
+        self.series_flat = np.array(flat, dtype=np.intp)
+
+    def failure(self, probabilities):
+        """Probability that each chain is breached, shape (K, chains)"""
+        k = probabilities.shape[0]
+        out = np.ones((k, self.size))
+        if self.series_flat.size:
+            out[:, self.series_rows] = np.multiply.reduceat(
+                probabilities[:, self.series_flat], self.series_starts, axis=1)
+        for row, (steps, exits) in self.branched.items():
+            out[:, row] = _branched_failure(steps, exits, probabilities)
+        out[:, self.bypassed] = 1.0
+        out[:, ~self.complete] = 0.0
+        return out
+
+    def row_failure(self, row, probabilities):
+        """Probability that chain ``row`` is breached, for one (B,) configuration"""
+        if not self.complete[row]:
+            return 0.0
+        if self.bypassed[row]:
+            return 1.0
+        if row in self.branched:
+            steps, exits = self.branched[row]
+            return float(_branched_failure(steps, exits, probabilities[None, :])[0])
+        return float(np.prod(probabilities[self.members[row]]))
+
+
+def _branched_failure(steps, exits, probabilities):
+    reach = np.zeros((probabilities.shape[0], len(steps)))
+    for i, (barrier, preds, entry) in enumerate(steps):
+        if entry:
+            arrive = 1.0
+        elif preds.size:
+            arrive = 1.0 - np.prod(1.0 - reach[:, preds], axis=1)
+        else:
+            continue
+        reach[:, i] = probabilities[:, barrier] * arrive
+    return 1.0 - np.prod(1.0 - reach[:, exits], axis=1)
+
+
+class RiskKernel:
+    """The graph-free, picklable part of a :class:`RiskModel`.
+
+    Holds only index arrays, so it can be shipped to worker processes.
+    """
+
+    def __init__(self, prevention, mitigation, threat_likelihood):
+        self.prevention = prevention
+        self.mitigation = mitigation
+        self.threat_likelihood = threat_likelihood
+
+    def evaluate(self, probabilities):
+        """Score a (B,) or (K, B) array of barrier failure probabilities"""
+        probabilities = np.atleast_2d(np.asarray(probabilities, dtype=float))
+        threat = self.threat_likelihood * self.prevention.failure(probabilities)
+        top = 1.0 - np.prod(1.0 - threat, axis=1)
+        mitigation = self.mitigation.failure(probabilities)
+        return RiskResult(
+            threat_likelihood=threat,
+            top_event_likelihood=top,
+            mitigation_failure=mitigation,
+            consequence_likelihood=top[:, None] * mitigation,
+        )
+
+
+class RiskModel:
+    """Array-backed risk model for one graph; use :func:`get_risk_model` to share it"""
+
+    def __init__(self, graph):
+        self.graph = graph
+        chains = get_chains(graph)
+        barriers = graph.barriers('prevention') + graph.barriers('mitigation')
+        self.barrier_ids = tuple(b.get('id') for b in barriers)
+        self.index = {b: i for i, b in enumerate(self.barrier_ids)}
+        self.threat_ids = tuple(t.get('id') for t in graph.nodes_of_type('threat'))
+        self.consequence_ids = tuple(c.get('id') for c in graph.nodes_of_type('consequence'))
+        self.threat_likelihood = np.array(
+            [float((graph.node(t).get('data') or {}).get('likelihood', 1.0)) for t in self.threat_ids])
+
+        prevention = [chains.prevention(t) for t in self.threat_ids]
+        mitigation = [chains.mitigation(c) for c in self.consequence_ids]
+        top_events = frozenset(n.get('id') for n in graph.nodes_of_type('topEvent'))
+        self.kernel = RiskKernel(
+            prevention=_Side(
+                graph, self.index, prevention,
+                is_entry=lambda chain, node_id: node_id == chain.source,
+                is_exit=lambda chain, b: any(n in top_events for n in graph.successors(b)),
+            ),
+            mitigation=_Side(
+                graph, self.index, mitigation,
+                is_entry=lambda chain, node_id: node_id in top_events,
+                is_exit=lambda chain, b: chain.source in graph.successors(b),
+            ),
+            threat_likelihood=self.threat_likelihood,
+        )
+
+    def default_probabilities(self, default=NORMAL_PROBABILITY):
+        """Return the diagram's own barrier failure probabilities, shape (B,)"""
+        graph = self.graph
+        return np.array([failure_probability(graph.node(b), default) for b in self.barrier_ids])
+
+    def configurations(self, failed_sets, base=None):
+        """Build a (K, B) matrix from ``base`` with each set of barrier ids forced to fail"""
+        base = self.default_probabilities() if base is None else np.asarray(base, dtype=float)
+        matrix = np.repeat(base[None, :], len(failed_sets), axis=0)
+        for row, failed in enumerate(failed_sets):
+            matrix[row, [self.index[b] for b in failed]] = FAILED_PROBABILITY
+        return matrix
+
+    def evaluate(self, probabilities=None):
+        """Score one (B,) or many (K, B) barrier failure probability configurations"""
+        if probabilities is None:
+            probabilities = self.default_probabilities()
+        return self.kernel.evaluate(probabilities)
+
+
+def get_risk_model(graph):
+    """Return the memoized :class:`RiskModel` for ``graph``"""
+    return graph.cached('risk', RiskModel)
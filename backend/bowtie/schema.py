@@ -0,0 +1,62 @@
+"""Schema checks mirroring ``frontend/src/utils/dataModel.js``"""
+
+from collections.abc import Mapping
+
+from .graph import BARRIER_TYPES, NODE_TYPES
+
+BARRIER_STATUSES = ('normal', 'failed')
+
+
+def schema_errors(document):
+    """Return a list of messages for everything ``validateBowtieSchema`` would reject"""
+    if not hasattr(document, 'get'):
+        return ['Document is not an object']
+    nodes = document.get('nodes')
+    edges = document.get('edges')
+    if not isinstance(nodes, (list, tuple)) or not isinstance(edges, (list, tuple)):
+        return ["Document needs 'nodes' and 'edges' arrays"]
+
+    errors = []
+    node_ids = set()
+    for i, node in enumerate(nodes):
+        if not isinstance(node, Mapping):
+            errors.append(f"Node {i} is not an object")
+            continue
+        node_id = node.get('id')
+        if not node_id or not node.get('type') or not node.get('position') or not node.get('data'):
+            errors.append(f"Node {i} ({node_id}) is missing id, type, position or data")
+            continue
+        if not isinstance(node_id, str):
+            errors.append(f"Node {i} has a non-string id")
+            continue
+        node_ids.add(node_id)
+        if node['type'] not in NODE_TYPES:
+            errors.append(f"Node {node_id} has unknown type {node['type']!r}")
+        position, data = node['position'], node['data']
+        if not isinstance(position, Mapping) or not isinstance(data, Mapping):
+            errors.append(f"Node {node_id} has a position or data that is not an object")
+            continue
+        if not all(isinstance(position.get(axis), (int, float)) for axis in ('x', 'y')):
+            errors.append(f"Node {node_id} has a non-numeric position")
+        if not data.get('label'):
+            errors.append(f"Node {node_id} has no label")
+        if 'status' in data and data['status'] not in BARRIER_STATUSES:
+            errors.append(f"Node {node_id} has unknown status {data['status']!r}")
+        if 'barrierType' in data and data['barrierType'] not in BARRIER_TYPES:
+            errors.append(f"Node {node_id} has unknown barrierType {data['barrierType']!r}")
+
+    for i, edge in enumerate(edges):
+        if not isinstance(edge, Mapping):
+            errors.append(f"Edge {i} is not an object")
+            continue
+        edge_id = edge.get('id')
+        if not edge_id or not edge.get('source') or not edge.get('target'):
+            errors.append(f"Edge {i} ({edge_id}) is missing id, source or target")
+            continue
+        if not isinstance(edge['source'], str) or not isinstance(edge['target'], str):
+            errors.append(f"Edge {i} ({edge_id}) has a non-string source or target")
+            continue
+        for end in ('source', 'target'):
+            if edge[end] not in node_ids:
+                errors.append(f"Edge {edge_id} {end} {edge[end]!r} does not exist")
+    return errors
@@ -0,0 +1,273 @@
+"""Full-text search over node labels and descriptions.
+
+:class:`SearchIndex` is an inverted index from lower-cased alphanumeric
+tokens to the nodes containing them, weighted so label matches rank above
+description matches and rare terms above common ones (tf-idf). Indexes keep
+raw term frequencies and weigh terms at query time, against the index itself
+or against a :class:`SearchCorpus` of several indexes. Every query
+token is treated as a prefix: the sorted term list is bisected to find all
+expansions, and exact term matches score higher than prefix matches. Hits
+hold only ids and display text, so an index stays valid (and cheap to keep)
+after its graph has been evicted from a cache.
+
+Indexes are built once per graph version (:func:`get_search_index`). In a
+workspace (:func:`search_workspace`) each file's index is built from the
+streaming reader or the snapshot's columns, without building its graph, and
+persisted under ``.bowtie-search/`` next to the manifest; it is reused while
+the file's mtime and size are unchanged. Document frequencies are summed over
+the whole workspace, so scores from different diagrams are comparable.
+"""
+
+import bisect
+import json
+import math
+import os
+import re
+import threading
+from pathlib import Path
+from typing import NamedTuple
+
+from .chains import get_chains
+from .snapshot import SNAPSHOT_SUFFIX, open_snapshot
+from .stream import iter_items
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+LABEL_WEIGHT = 3.0
+DESCRIPTION_WEIGHT = 1.0
+PREFIX_PENALTY = 0.5
+DEFAULT_LIMIT = 20
+INDEX_DIRECTORY = '.bowtie-search'
+# Bump when the persisted index layout changes
+INDEX_FORMAT = 2
+
+
+def tokenize(text):
+    """Split text into lower-cased alphanumeric tokens"""
+    return TOKEN_RE.findall(text.lower()) if text else []
+
+
+class SearchHit(NamedTuple):
+    node_id: str
+    node_type: str
+    label: str
+    description: str
+    score: float
+    diagram_id: str = None
+
+
+class SearchIndex:
+    """Inverted index over one graph's labels and descriptions"""
+
+    def __init__(self, graph=None):
+        self._nodes = {}
+        self._postings = {}
+        self._terms = []
+        if graph is not None:
+            self._build(graph.nodes)
+
+    @classmethod
+    def from_nodes(cls, nodes):
+        """Build an index from an iterable of node mappings"""
+        index = cls()
+        index._build(nodes)
+        return index
+
+    @classmethod
+    def from_payload(cls, payload):
+        """Rebuild an index from :meth:`payload` output"""
+        index = cls()
+        index._nodes = {node_id: tuple(node) for node_id, node in payload['nodes'].items()}
+        index._postings = payload['postings']
+        index._terms = sorted(index._postings)
+        return index
+
+    def payload(self):
+        """Return the index as JSON-serializable data"""
+        return {'nodes': self._nodes, 'postings': self._postings}
+
+    @property
+    def size(self):
+        """Number of indexed nodes"""
+        return len(self._nodes)
+
+    def document_frequency(self, term):
+        """Number of indexed nodes containing ``term``"""
+        return len(self._postings.get(term, ()))
+
+    def _build(self, nodes):
+        postings = {}
+        for node in nodes:
+            node_id = node.get('id')
+            if node_id in self._nodes:
+                continue
+            data = node.get('data') or {}
+            label = data.get('label') or ''
+            description = data.get('description') or ''
+            self._nodes[node_id] = (node.get('type'), label, description)
+            for weight, text in ((LABEL_WEIGHT, label), (DESCRIPTION_WEIGHT, description)):
+                for token in tokenize(text):
+                    bucket = postings.setdefault(token, {})
+                    bucket[node_id] = bucket.get(node_id, 0.0) + weight
+        self._postings = postings
+        self._terms = sorted(self._postings)
+
+    def _expand(self, token):
+        start = bisect.bisect_left(self._terms, token)
+        end = bisect.bisect_left(self._terms, token + '\uffff', start)
+        return self._terms[start:end]
+
+    def search(self, query, limit=DEFAULT_LIMIT, diagram_id=None, corpus=None):
+        """Return the best :class:`SearchHit` list for ``query`` (all tokens must match)
+
+        Terms are weighted by their document frequency in ``corpus`` (by
+        default this index alone).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        corpus = corpus if corpus is not None else self
+        total = max(corpus.size, 1)
+
+        scores = None
+        for token in dict.fromkeys(tokens):
+            token_scores = {}
+            for term in self._expand(token):
+                weight = math.log(1.0 + total / corpus.document_frequency(term))
+                if term != token:
+                    weight *= PREFIX_PENALTY
+                for node_id, tf in self._postings[term].items():
+                    score = tf * weight
+                    if score > token_scores.get(node_id, 0.0):
+                        token_scores[node_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {n: s + token_scores[n] for n, s in scores.items() if n in token_scores}
+            if not scores:
+                return []
+
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [SearchHit(node_id, *self._nodes[node_id], score=score, diagram_id=diagram_id)
+                for node_id, score in best]
+
+
+class SearchCorpus:
+    """Node counts and document frequencies summed over several indexes"""
+
+    def __init__(self, indexes):
+        self.indexes = tuple(indexes)
+        self.size = sum(index.size for index in self.indexes)
+        self._frequencies = {}
+
+    def document_frequency(self, term):
+        frequency = self._frequencies.get(term)
+        if frequency is None:
+            frequency = self._frequencies[term] = sum(index.document_frequency(term) for index in self.indexes)
+        return frequency
+
+
+def get_search_index(graph):
+    """Return the memoized :class:`SearchIndex` for ``graph``"""
+    return graph.cached('search', SearchIndex)
+
+
+_workspace_indexes = {}
+_workspace_lock = threading.Lock()
+
+
+def _file_index(path):
+    """Index a diagram file's nodes without building its graph"""
+    if path.endswith(SNAPSHOT_SUFFIX):
+        with open_snapshot(path) as snapshot:
+            return SearchIndex.from_nodes(snapshot.iter_nodes())
+    with open(path, 'r') as f:
+        return SearchIndex.from_nodes(item for _, item in iter_items(f, arrays=('nodes',)))
+
+
+def _read_index(index_path, version):
+    try:
+        with open(index_path, 'r') as f:
+            raw = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if raw.get('version') != version:
+        return None
+    try:
+        return SearchIndex.from_payload(raw)
+    except (KeyError, TypeError, AttributeError):
+        return None
+
+
+def _write_index(index_path, version, index):
+    tmp = index_path.with_name(index_path.name + '.tmp')
+    try:
+        index_path.parent.mkdir(exist_ok=True)
+        with open(tmp, 'w') as f:
+            json.dump({'version': version, **index.payload()}, f)
+        os.replace(tmp, index_path)
+    except OSError:
+        # A read-only workspace still works, it just re-indexes on restart
+        pass
+
+
+def workspace_index(workspace, entry):
+    """Return the :class:`SearchIndex` for a manifest entry, reusing it while the file is unchanged"""
+    version = [INDEX_FORMAT, entry.mtime_ns, entry.size]
+    key = (entry.path, entry.mtime_ns, entry.size)
+    with _workspace_lock:
+        index = _workspace_indexes.get(entry.path)
+    if index is not None and index[0] == key:
+        return index[1]
+
+    index_path = Path(workspace.directory) / INDEX_DIRECTORY / f'{entry.diagram_id}.json'
+    found = _read_index(index_path, version)
+    if found is None:
+        found = _file_index(entry.path)
+        _write_index(index_path, version, found)
+    with _workspace_lock:
+        _workspace_indexes[entry.path] = (key, found)
+    return found
+
+
+def search_workspace(workspace, query, limit=DEFAULT_LIMIT):
+    """Search every diagram of a workspace through its per-file indexes"""
+    indexes = []
+    for entry in workspace.entries():
+        try:
+            indexes.append((entry.diagram_id, workspace_index(workspace, entry)))
+        except (OSError, ValueError, KeyError, IndexError):
+            # Unreadable since the last scan; the next scan drops or re-summarizes it
+            continue
+    corpus = SearchCorpus(index for _, index in indexes)
+    hits = []
+    for diagram_id, index in indexes:
+        hits.extend(index.search(query, limit, diagram_id=diagram_id, corpus=corpus))
+    hits.sort(key=lambda hit: -hit.score)
+    return hits[:limit]
+
+
+def anchor(graph, node_id):
+    """Return the ``('threat' | 'consequence', id)`` whose story shows ``node_id``, or None.
+
+    Barriers map to the first chain containing them; degradation nodes to
+    the barrier they affect.
+    """
+    node_type = graph.node_type(node_id)
+    if node_type in ('threat', 'consequence'):
+        return node_type, node_id
+    if node_type in ('degradationFactor', 'degradationControl'):
+        # Follow factor -> control -> barrier downstream to the first barrier
+        stack, seen = [node_id], {node_id}
+        while stack:
+            current = stack.pop()
+            for nxt in graph.successors(current):
+                if graph.node_type(nxt) == 'barrier':
+                    return anchor(graph, nxt)
+                if nxt not in seen:
+                    seen.add(nxt)
+                    stack.append(nxt)
+        return None
+    if node_type == 'barrier':
+        sources = get_chains(graph).sources_of(node_id)
+        return sources[0] if sources else None
+    return None
@@ -0,0 +1,184 @@
+"""Monte Carlo simulation of threat -> consequence runs.
+
+Each trial first samples which degradation factors are active, then samples
+every barrier's failure. A barrier starts from its own failure probability
+(see :func:`bowtie.risk.failure_probability`); each active factor that
+degrades it raises that to ``1 - (1 - p) * (1 - impact * residual)``, where
+``residual`` is the product of ``1 - effectiveness`` over the degradation
+controls between the factor and the barrier. Barriers sharing a factor
+therefore fail together, and controls weaken that correlation.
+
+Degradation parameters come from node data, with defaults below:
+
+* ``degradationFactor``: ``likelihood`` (chance it is active), ``impact``
+* ``degradationControl``: ``effectiveness``
+
+Given a trial's sampled barrier outcomes, the risk kernel gives the exact
+conditional probability of the top event and of each consequence; those are
+averaged (a lower-variance estimator than counting hits). Trials are split
+into fixed-size shards, each with its own child of one ``SeedSequence``, so
+results depend only on the seed and trial count, never on the number of
+workers. Shards run on a process pool.
+"""
+
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import NamedTuple
+
+import numpy as np
+
+from .risk import NORMAL_PROBABILITY, get_risk_model
+
+DEFAULT_FACTOR_LIKELIHOOD = 0.1
+DEFAULT_FACTOR_IMPACT = 0.5
+DEFAULT_CONTROL_EFFECTIVENESS = 0.5
+SHARD_SIZE = 20000
+CONFIDENCE_Z = 1.959963984540054  # 95% two-sided
+
+
+def _data_float(node, key, default):
+    value = (node.get('data') or {}).get(key)
+    return default if value is None else float(value)
+
+
+class Estimate(NamedTuple):
+    """Mean with a normal-approximation 95% confidence interval"""
+    mean: float
+    low: float
+    high: float
+
+
+class SimulationResult(NamedTuple):
+    trials: int
+    top_event: Estimate
+    threats: dict          # threat id -> Estimate
+    consequences: dict     # consequence id -> Estimate
+    convergence: list      # (trials so far, top event mean, CI half-width) per shard
+    elapsed: float
+    workers: int
+
+
+class _Plan:
+    """Everything a worker needs to run shards; picklable"""
+
+    def __init__(self, kernel, base, factor_likelihood, pairs):
+        self.kernel = kernel
+        self.base = base
+        self.factor_likelihood = factor_likelihood
+        # Degraded (factor, barrier) pairs, grouped by barrier: most pairs
+        # don't exist, so only these are summed (as in the risk kernel's chains)
+        pairs = sorted(pairs)
+        self.pair_factor = np.array([f for _, f, _ in pairs], dtype=np.intp)
+        # log(1 - impact * residual) of each pair
+        self.pair_log_survival = np.array([v for _, _, v in pairs])
+        barriers = [b for b, _, _ in pairs]
+        starts = [i for i, b in enumerate(barriers) if i == 0 or b != barriers[i - 1]]
+        self.degraded = np.array([barriers[i] for i in starts], dtype=np.intp)
+        self.degraded_starts = np.array(starts, dtype=np.intp)
+
+    def run_shard(self, seed, trials):
+        """Return per-output sums and sums of squares for ``trials`` trials"""
+        rng = np.random.default_rng(seed)
+        active = rng.random((trials, self.factor_likelihood.size)) < self.factor_likelihood
+        # Barriers with p = 1 give log(0) = -inf, i.e. keep = 0: they always fail
+        with np.errstate(divide='ignore'):
+            log_keep = np.tile(np.log1p(-np.minimum(self.base, 1.0)), (trials, 1))
+        if self.degraded.size:
+            log_keep[:, self.degraded] += np.add.reduceat(
+                np.where(active[:, self.pair_factor], self.pair_log_survival, 0.0), self.degraded_starts, axis=1)
+        failed = rng.random((trials, self.base.size)) >= np.exp(log_keep)
+
+        result = self.kernel.evaluate(failed.astype(float))
+        outputs = np.column_stack([
+            result.top_event_likelihood,
+            result.threat_likelihood,
+            result.consequence_likelihood,
+        ])
+        return outputs.sum(axis=0), np.square(outputs).sum(axis=0)
+
+
+def _run_shard(plan, seed, trials):
+    return plan.run_shard(seed, trials)
+
+
+def build_plan(graph, default_probability=NORMAL_PROBABILITY):
+    """Compile the barrier, degradation factor and control parameters of ``graph``"""
+    model = get_risk_model(graph)
+    factors = graph.nodes_of_type('degradationFactor')
+    pairs = []
+
+    for row, factor in enumerate(factors):
+        impact = _data_float(factor, 'impact', DEFAULT_FACTOR_IMPACT)
+        # Walk factor -> control(s) -> barrier, keeping the strongest cover
+        residual = {}
+        stack = [(factor.get('id'), 1.0)]
+        seen = set()
+        while stack:
+            node_id, remaining = stack.pop()
+            for nxt in graph.successors(node_id):
+                nxt_type = graph.node_type(nxt)
+                if nxt_type == 'barrier' and nxt in model.index:
+                    residual[nxt] = min(residual.get(nxt, 1.0), remaining)
+                elif nxt_type == 'degradationControl' and nxt not in seen:
+                    seen.add(nxt)
+                    effectiveness = _data_float(graph.node(nxt), 'effectiveness', DEFAULT_CONTROL_EFFECTIVENESS)
+                    stack.append((nxt, remaining * (1.0 - effectiveness)))
+        for barrier_id, remaining in residual.items():
+            pairs.append((model.index[barrier_id], row, math.log1p(-min(impact * remaining, 1.0))))
+
+    likelihood = np.array([_data_float(f, 'likelihood', DEFAULT_FACTOR_LIKELIHOOD) for f in factors])
+    return _Plan(model.kernel, model.default_probabilities(default_probability), likelihood, pairs)
+
+
+def _estimate(total, squares, n):
+    mean = float(total / n)
+    variance = max(squares / n - mean * mean, 0.0)
+    half = CONFIDENCE_Z * math.sqrt(variance / n) if n > 1 else math.inf
+    return Estimate(mean, max(mean - half, 0.0), min(mean + half, 1.0)), half
+
+
+def simulate(graph, trials, seed=0, workers=None, default_probability=NORMAL_PROBABILITY,
+             shard_size=SHARD_SIZE):
+    """Run ``trials`` Monte Carlo trials over ``graph`` and summarize them"""
+    started = time.perf_counter()
+    model = get_risk_model(graph)
+    plan = build_plan(graph, default_probability)
+
+    sizes = [shard_size] * (trials // shard_size)
+    if trials % shard_size:
+        sizes.append(trials % shard_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(sizes)))
+
+    if workers == 1:
+        shards = [plan.run_shard(s, n) for s, n in zip(seeds, sizes)]
+    else:
+        # spawn rather than fork: the Streamlit server is multi-threaded
+        with ProcessPoolExecutor(workers, mp_context=get_context('spawn')) as pool:
+            shards = list(pool.map(_run_shard, [plan] * len(sizes), seeds, sizes))
+
+    total = np.zeros(1 + len(model.threat_ids) + len(model.consequence_ids))
+    squares = np.zeros_like(total)
+    done = 0
+    convergence = []
+    for size, (shard_total, shard_squares) in zip(sizes, shards):
+        total += shard_total
+        squares += shard_squares
+        done += size
+        estimate, half = _estimate(total[0], squares[0], done)
+        convergence.append((done, estimate.mean, half))
+
+    estimates = [_estimate(t, q, done)[0] for t, q in zip(total, squares)] if done else []
+    threat_end = 1 + len(model.threat_ids)
+    return SimulationResult(
+        trials=done,
+        top_event=estimates[0] if estimates else Estimate(0.0, 0.0, 0.0),
+        threats=dict(zip(model.threat_ids, estimates[1:threat_end])),
+        consequences=dict(zip(model.consequence_ids, estimates[threat_end:])),
+        convergence=convergence,
+        elapsed=time.perf_counter() - started,
+        workers=workers,
+    )
@@ -0,0 +1,323 @@
+"""Compact columnar binary snapshots of bowtie diagrams.
+
+A snapshot stores interned strings in one table (offsets + UTF-8 blob) and
+every node/edge attribute as a fixed-width column, each 8-byte aligned::
+
+    header       magic, format version, node/edge/string counts, blob size
+    str_offsets  uint32[strings + 1]
+    str_blob     utf-8 bytes
+    node_id      uint32[nodes]   string index
+    node_label   uint32[nodes]   string index
+    node_desc    uint32[nodes]   string index
+    node_type    uint8[nodes]    index into NODE_TYPES
+    barrier_type uint8[nodes]    0 = none, else 1 + index into BARRIER_TYPES
+    status       uint8[nodes]    0 = none, else 1 + index into BARRIER_STATUSES
+    failure_prob float64[nodes]  data.failureProbability, NaN if absent
+    likelihood   float64[nodes]  data.likelihood, NaN if absent
+    edge_id      uint32[edges]   string index
+    edge_source  uint32[edges]   string index of the source node id
+    edge_target  uint32[edges]   string index of the target node id
+
+:func:`open_snapshot` memory-maps the file read-only, so opening it and
+counting nodes (:meth:`Snapshot.type_counts`) cost the same for any diagram
+size and decode no strings. Building a graph (:meth:`Snapshot.to_graph`)
+still turns every node and edge into Python objects, so it is linear in the
+diagram: it skips JSON parsing, decodes each distinct string once and
+closes the map afterwards. The file is checked for truncation and
+out-of-range indices when it is opened, so a corrupt snapshot raises
+ValueError rather than failing halfway through a load.
+
+Convert an existing JSON diagram with::
+
+    python -m bowtie.snapshot data/demo_bowtie.json data/demo_bowtie.btsnap
+"""
+
+import math
+import mmap
+import struct
+import sys
+from array import array
+from types import MappingProxyType
+
+from .graph import BARRIER_TYPES, NODE_TYPES, GraphBuilder
+from .schema import BARRIER_STATUSES, schema_errors
+
+SNAPSHOT_SUFFIX = '.btsnap'
+MAGIC = b'BTSNAP\x00\x01'
+FORMAT_VERSION = 2
+
+_HEADER = struct.Struct('<8sIIIII4x')
+_NO_STRING = 0  # string 0 is always ''
+_ITEM_SIZE = {'I': 4, 'B': 1, 'd': 8}
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+class _StringTable:
+    def __init__(self):
+        self.index = {'': _NO_STRING}
+        self.strings = ['']
+
+    def intern(self, value):
+        if value is None:
+            return _NO_STRING
+        value = str(value)
+        idx = self.index.get(value)
+        if idx is None:
+            idx = self.index[value] = len(self.strings)
+            self.strings.append(value)
+        return idx
+
+
+def _code(value, choices):
+    return choices.index(value) + 1 if value in choices else 0
+
+
+def _number(value):
+    return math.nan if value is None else float(value)
+
+
+def _column(typecode, values):
+    column = array(typecode, values)
+    if sys.byteorder != 'little':
+        column.byteswap()
+    return column.tobytes()
+
+
+def export_snapshot(document, path):
+    """Write ``document`` (a bowtie dict or :class:`BowtieGraph`) as a snapshot"""
+    nodes = document.nodes if hasattr(document, 'nodes') else document.get('nodes', ())
+    edges = document.edges if hasattr(document, 'edges') else document.get('edges', ())
+
+    strings = _StringTable()
+    node_id, node_label, node_desc = [], [], []
+    node_type, barrier_type, status = [], [], []
+    failure_prob, likelihood = [], []
+    for node in nodes:
+        data = node.get('data') or {}
+        node_id.append(strings.intern(node.get('id')))
+        node_label.append(strings.intern(data.get('label')))
+        node_desc.append(strings.intern(data.get('description')))
+        node_type.append(NODE_TYPES.index(node.get('type')))
+        barrier_type.append(_code(data.get('barrierType'), BARRIER_TYPES))
+        status.append(_code(data.get('status'), BARRIER_STATUSES))
+        failure_prob.append(_number(data.get('failureProbability')))
+        likelihood.append(_number(data.get('likelihood')))
+
+    edge_id, edge_source, edge_target = [], [], []
+    for edge in edges:
+        edge_id.append(strings.intern(edge.get('id')))
+        edge_source.append(strings.intern(edge.get('source')))
+        edge_target.append(strings.intern(edge.get('target')))
+
+    encoded = [s.encode('utf-8') for s in strings.strings]
+    offsets = [0]
+    for raw in encoded:
+        offsets.append(offsets[-1] + len(raw))
+    blob = b''.join(encoded)
+
+    sections = [
+        _column('I', offsets),
+        blob,
+        _column('I', node_id),
+        _column('I', node_label),
+        _column('I', node_desc),
+        _column('B', node_type),
+        _column('B', barrier_type),
+        _column('B', status),
+        _column('d', failure_prob),
+        _column('d', likelihood),
+        _column('I', edge_id),
+        _column('I', edge_source),
+        _column('I', edge_target),
+    ]
+    header = _HEADER.pack(MAGIC, FORMAT_VERSION, len(node_id), len(edge_id), len(encoded), len(blob))
+
+    with open(path, 'wb') as f:
+        f.write(header)
+        offset = len(header)
+        for section in sections:
+            padding = _align(offset) - offset
+            f.write(b'\0' * padding)
+            f.write(section)
+            offset += padding + len(section)
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError(f'{self.path} is empty') from None
+        view = memoryview(self._mmap)
+        self._columns = [view]
+        try:
+            self._read_columns(view)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_columns(self, view):
+        if len(view) < _HEADER.size:
+            raise ValueError(f'{self.path} is not a version {FORMAT_VERSION} bowtie snapshot')
+        magic, version, n_nodes, n_edges, n_strings, blob_size = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f'{self.path} is not a version {FORMAT_VERSION} bowtie snapshot')
+        self.node_count = n_nodes
+        self.edge_count = n_edges
+
+        offset = _HEADER.size
+        for typecode, length in (
+            ('I', n_strings + 1), ('B', blob_size),
+            ('I', n_nodes), ('I', n_nodes), ('I', n_nodes),
+            ('B', n_nodes), ('B', n_nodes), ('B', n_nodes),
+            ('d', n_nodes), ('d', n_nodes),
+            ('I', n_edges), ('I', n_edges), ('I', n_edges),
+        ):
+            offset = _align(offset)
+            size = length * _ITEM_SIZE[typecode]
+            if offset + size > len(view):
+                raise ValueError(f'{self.path} is truncated')
+            column = view[offset:offset + size]
+            if typecode != 'B':
+                column = column.cast(typecode) if sys.byteorder == 'little' else _swapped(column, typecode)
+            self._columns.append(column)
+            offset += size
+
+        (self._str_offsets, self._blob,
+         self.node_id, self.node_label, self.node_desc,
+         self.node_type, self.barrier_type, self.status,
+         self.failure_probability, self.likelihood,
+         self.edge_id, self.edge_source, self.edge_target) = self._columns[1:]
+        self._strings = None
+        self._check(n_strings, blob_size)
+
+    def _check(self, n_strings, blob_size):
+        # One pass over each column; cheap next to decoding, and it keeps corrupt files out of the caches
+        offsets = self._str_offsets
+        if offsets[0] != 0 or offsets[n_strings] != blob_size or any(a > b for a, b in zip(offsets, offsets[1:])):
+            raise ValueError(f'{self.path} has a corrupt string table')
+        limits = (
+            (n_strings, (self.node_id, self.node_label, self.node_desc, self.edge_id, self.edge_source, self.edge_target)),
+            (len(NODE_TYPES), (self.node_type,)),
+            (len(BARRIER_TYPES) + 1, (self.barrier_type,)),
+            (len(BARRIER_STATUSES) + 1, (self.status,)),
+        )
+        for limit, columns in limits:
+            if any(len(column) and max(column) >= limit for column in columns):
+                raise ValueError(f'{self.path} has out-of-range indices')
+
+    def string(self, idx):
+        """Decode string ``idx`` from the string table"""
+        if self._strings is not None:
+            return self._strings[idx]
+        return bytes(self._blob[self._str_offsets[idx]:self._str_offsets[idx + 1]]).decode('utf-8')
+
+    def strings(self):
+        """Decode the whole string table once and return it as a list"""
+        if self._strings is None:
+            blob, offsets = bytes(self._blob), self._str_offsets
+            self._strings = [blob[offsets[i]:offsets[i + 1]].decode('utf-8') for i in range(len(offsets) - 1)]
+        return self._strings
+
+    def type_counts(self):
+        """Return node counts per type without decoding any strings"""
+        counts = dict.fromkeys(NODE_TYPES, 0)
+        for code in self.node_type:
+            counts[NODE_TYPES[code]] += 1
+        return counts
+
+    def iter_nodes(self):
+        """Yield slim, read-only node mappings"""
+        string = self.strings().__getitem__
+        for i in range(self.node_count):
+            data = {'label': string(self.node_label[i])}
+            if self.node_desc[i] != _NO_STRING:
+                data['description'] = string(self.node_desc[i])
+            if self.barrier_type[i]:
+                data['barrierType'] = BARRIER_TYPES[self.barrier_type[i] - 1]
+            if self.status[i]:
+                data['status'] = BARRIER_STATUSES[self.status[i] - 1]
+            if not math.isnan(self.failure_probability[i]):
+                data['failureProbability'] = self.failure_probability[i]
+            if not math.isnan(self.likelihood[i]):
+                data['likelihood'] = self.likelihood[i]
+            yield MappingProxyType({
+                'id': sys.intern(string(self.node_id[i])),
+                'type': NODE_TYPES[self.node_type[i]],
+                'data': MappingProxyType(data),
+            })
+
+    def iter_edges(self):
+        """Yield read-only edge mappings"""
+        string = self.strings().__getitem__
+        for i in range(self.edge_count):
+            yield MappingProxyType({
+                'id': string(self.edge_id[i]),
+                'source': sys.intern(string(self.edge_source[i])),
+                'target': sys.intern(string(self.edge_target[i])),
+            })
+
+    def to_graph(self, version=None):
+        """Build a :class:`BowtieGraph` from the snapshot"""
+        builder = GraphBuilder()
+        for node in self.iter_nodes():
+            builder.add_node(node)
+        for edge in self.iter_edges():
+            builder.add_edge(edge)
+        return builder.build(version)
+
+    def close(self):
+        # Release every view (the whole-file one last) before the map itself can be closed
+        for column in reversed(self._columns):
+            column.release()
+        self._strings = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _swapped(column, typecode):
+    # Big-endian hosts can't cast the little-endian columns in place
+    values = array(typecode)
+    values.frombytes(column)
+    values.byteswap()
+    return memoryview(values)
+
+
+def open_snapshot(path):
+    """Memory-map the snapshot at ``path``"""
+    return Snapshot(path)
+
+
+def main(argv=None):
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Convert a bowtie JSON diagram into a binary snapshot')
+    parser.add_argument('source', help='bowtie JSON file (the schema dataModel.js validates)')
+    parser.add_argument('target', help=f'snapshot file to write (conventionally *{SNAPSHOT_SUFFIX})')
+    args = parser.parse_args(argv)
+
+    with open(args.source, 'r') as f:
+        document = json.load(f)
+    errors = schema_errors(document)
+    if errors:
+        parser.exit(1, '\n'.join(f'{args.source}: {e}' for e in errors) + '\n')
+    export_snapshot(document, args.target)
+    with open_snapshot(args.target) as snapshot:
+        print(f'Wrote {args.target}: {snapshot.node_count} nodes, {snapshot.edge_count} edges')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Incremental ingestion of large bowtie JSON files.
+
+``json.load`` materializes the whole document, including the UI-only layout
+fields (``position``, ``sourcePosition``, ``targetPosition``, ``expanded``)
+that the backend never reads. This module walks the top-level object with a
+bounded read buffer, decodes the ``nodes`` and ``edges`` arrays one item at a
+time, keeps only the fields listed below and feeds them straight into a
+:class:`GraphBuilder`. Peak memory is the slimmed graph plus one item.
+"""
+
+import json
+import re
+from types import MappingProxyType
+
+from .graph import GraphBuilder, intern_field
+
+CHUNK_SIZE = 1 << 16
+
+NODE_FIELDS = ('id', 'type')
+DATA_FIELDS = ('label', 'description', 'barrierType', 'status', 'failureProbability', 'likelihood')
+EDGE_FIELDS = ('id', 'source', 'target')
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Character cursor over a text file that only buffers what it needs"""
+
+    def __init__(self, fp, chunk_size=CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size):
+        if self.pos > self.chunk_size:
+            # Discard consumed text so the buffer stays bounded
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            self.pos = _WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if self.eof:
+                raise ValueError('Unexpected end of bowtie JSON')
+            self._fill(self.chunk_size)
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f'Expected {char!r} at offset {self.pos}, found {found!r}')
+        self.pos += 1
+
+    def value(self):
+        """Decode the next JSON value, reading more input until it is complete"""
+        self.peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            else:
+                # A value ending exactly at the buffer edge may be a truncated
+                # number; valid JSON always has a delimiter after it
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            self._fill(size)
+            size *= 2
+
+
+def _slim_node(node):
+    if not isinstance(node, dict):
+        raise ValueError(f'nodes must be objects, not {type(node).__name__}')
+    data = node.get('data') or {}
+    if not isinstance(data, dict):
+        raise ValueError(f"node {node.get('id')!r} has data that is not an object")
+    slim = {k: intern_field(k, node[k]) for k in NODE_FIELDS if k in node}
+    slim['data'] = MappingProxyType({k: intern_field(k, data[k]) for k in DATA_FIELDS if k in data})
+    return MappingProxyType(slim)
+
+
+def _slim_edge(edge):
+    if not isinstance(edge, dict):
+        raise ValueError(f'edges must be objects, not {type(edge).__name__}')
+    return MappingProxyType({k: intern_field(k, edge[k]) for k in EDGE_FIELDS if k in edge})
+
+
+def iter_items(fp, arrays=('nodes', 'edges'), chunk_size=CHUNK_SIZE):
+    """Yield ``(key, item)`` for each element of the top-level ``arrays``.
+
+    Other top-level members are decoded and skipped.
+    """
+    reader = _Reader(fp, chunk_size)
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key in arrays and reader.peek() == '[':
+            reader.expect('[')
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield key, reader.value()
+                    if reader.peek() == ',':
+                        reader.pos += 1
+                        continue
+                    reader.expect(']')
+                    break
+        else:
+            reader.value()
+        if reader.peek() == ',':
+            reader.pos += 1
+            continue
+        reader.expect('}')
+        return
+
+
+def stream_graph(path, version=None, chunk_size=CHUNK_SIZE):
+    """Build a :class:`BowtieGraph` from ``path`` without loading the whole document"""
+    builder = GraphBuilder()
+    with open(path, 'r') as f:
+        for key, item in iter_items(f, chunk_size=chunk_size):
+            if key == 'nodes':
+                builder.add_node(_slim_node(item))
+            else:
+                builder.add_edge(_slim_edge(item))
+    return builder.build(version)
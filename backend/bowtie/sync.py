@@ -0,0 +1,589 @@
+"""Live sync of diagram edits between the React editor and the presentation.
+
+Editors and viewers connect over a websocket to ``/sync/<diagram_id>``. A
+new connection gets one ``snapshot`` of the diagram, including its Focus
+Mode path index (:func:`bowtie.paths.get_path_payload`); after that only
+small edit operations travel, in both directions::
+
+    {"type": "ops", "ops": [{"op": "node.update", "id": "b1", "data": {"status": "failed"}}]}
+
+Operations are ``node.add``, ``node.update`` (shallow-merges ``data``),
+``node.move``, ``node.remove`` (also drops the node's edges), ``edge.add``,
+``edge.remove`` and ``reset`` (a whole document, sent when a file is
+opened). They are applied to the shared :class:`DiagramState` as they
+arrive, and broadcast to the other connections in batches every
+``FLUSH_INTERVAL`` seconds. Within a batch, repeated updates to one node are
+merged and only a node's last move is kept, so dragging a node or typing in
+the editor costs one message per batch rather than one per event. Each
+batch is encoded once for all viewers.
+
+Node dicts are replaced, never mutated, on update, so graphs handed out by
+:meth:`DiagramState.graph` stay valid while edits continue. That graph is
+rebuilt at most once per revision, on read, with version
+``('sync', diagram_id, revision)``, so chains, risk models and the other
+graph caches follow the live diagram. Diagrams are seeded from their file
+(through the hub's ``loader``) and, until an editor changes them,
+:meth:`SyncHub.graph` returns None so readers keep using the file itself.
+
+Connections are only accepted from the editor's origins (``origins``, by
+default the Vite dev server) and with a token issued by the hub in the URL,
+``/sync/<diagram_id>?token=...``; the presentation issues one per browser
+session (:meth:`SyncHub.issue_token`), valid for ``TOKEN_TTL`` seconds.
+
+The presentation runs the server in-process on a background thread when
+``BOWTIE_SYNC_PORT`` is set (see :func:`start_background`); it can also be
+run on its own, printing the token to connect with::
+
+    python -m bowtie.sync --port 8765 --seed demo=data/demo_bowtie.json
+"""
+
+import asyncio
+import hmac
+import json
+import secrets
+import threading
+import time
+from collections.abc import Mapping
+from functools import partial
+from http import HTTPStatus
+from types import MappingProxyType
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .graph import BowtieGraph
+from .layout import get_layout
+from .paths import get_path_payload
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+FLUSH_INTERVAL = 0.05
+PATH_PREFIX = '/sync/'
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+# Origins the editor is served from (the Vite dev server)
+DEFAULT_ORIGINS = ('http://localhost:5173', 'http://127.0.0.1:5173')
+TOKEN_BYTES = 16
+# Seconds a token stays valid for new connections (open ones are not dropped)
+TOKEN_TTL = 12 * 60 * 60
+
+NODE_OPS = ('node.add', 'node.update', 'node.move', 'node.remove')
+EDGE_OPS = ('edge.add', 'edge.remove')
+# Ops whose later occurrence for the same node replaces (or merges into) an earlier one
+COALESCED_OPS = ('node.update', 'node.move')
+
+
+class SyncError(ValueError):
+    """A malformed sync message or operation"""
+
+
+def _edge_key(edge):
+    return edge.get('id') or f"{edge.get('source')}->{edge.get('target')}"
+
+
+def _op_node_id(op):
+    return op['node'].get('id') if op['op'] == 'node.add' else op.get('id')
+
+
+def _is_id(value):
+    return isinstance(value, str) and bool(value)
+
+
+def _is_position(value):
+    return isinstance(value, dict) and all(
+        isinstance(value.get(axis), (int, float)) and not isinstance(value.get(axis), bool) for axis in ('x', 'y')
+    )
+
+
+def _check_node(node, kind):
+    if not isinstance(node, dict) or not _is_id(node.get('id')):
+        raise SyncError(f'{kind} needs node objects with a string id')
+    if not isinstance(node.get('data', {}), dict):
+        raise SyncError(f'{kind}: node {node["id"]!r} has data that is not an object')
+    if 'position' in node and not _is_position(node['position']):
+        raise SyncError(f'{kind}: node {node["id"]!r} has a position without numeric x and y')
+
+
+def _check_edge(edge, kind):
+    if not isinstance(edge, dict) or not _is_id(edge.get('source')) or not _is_id(edge.get('target')):
+        raise SyncError(f'{kind} needs edge objects with a string source and target')
+    if 'id' in edge and not _is_id(edge['id']):
+        raise SyncError(f'{kind}: edge ids must be strings')
+
+
+def check_op(op):
+    """Raise :class:`SyncError` unless ``op`` is a well-formed operation
+
+    Every field an operation touches is type-checked here, so a batch that
+    passes can be applied without failing halfway.
+    """
+    if not isinstance(op, dict):
+        raise SyncError('operations must be objects')
+    kind = op.get('op')
+    if kind == 'reset':
+        nodes, edges = op.get('nodes'), op.get('edges', [])
+        if not isinstance(nodes, list) or not isinstance(edges, list):
+            raise SyncError('reset needs lists of node and edge objects')
+        for node in nodes:
+            _check_node(node, kind)
+        for edge in edges:
+            _check_edge(edge, kind)
+    elif kind == 'node.add':
+        _check_node(op.get('node'), kind)
+    elif kind == 'edge.add':
+        _check_edge(op.get('edge'), kind)
+    elif kind in NODE_OPS or kind in EDGE_OPS:
+        if not _is_id(op.get('id')):
+            raise SyncError(f'{kind} needs a string id')
+        if kind == 'node.update' and not isinstance(op.get('data'), dict):
+            raise SyncError('node.update needs a data object')
+        if kind == 'node.move' and not _is_position(op.get('position')):
+            raise SyncError('node.move needs a position with numeric x and y')
+    else:
+        raise SyncError(f'unknown operation {kind!r}')
+
+
+class DiagramState:
+    """The current nodes and edges of one synced diagram"""
+
+    def __init__(self, diagram_id, nodes=(), edges=()):
+        self.diagram_id = diagram_id
+        self.revision = 0
+        self.seed_version = None
+        self._lock = threading.RLock()
+        self._graph = None
+        self._graph_revision = None
+        self._reset(nodes, edges)
+
+    @classmethod
+    def from_graph(cls, diagram_id, graph):
+        """Seed a state from a loaded graph, sharing its (frozen) nodes and edges
+
+        Streamed and snapshot-loaded diagrams carry no positions; those nodes
+        get the server-side layout's (:func:`bowtie.layout.get_layout`), so
+        the editor can show the snapshot as is.
+        """
+        nodes = graph.nodes
+        if any('position' not in node for node in nodes):
+            positions = get_layout(graph)
+            nodes = [node if 'position' in node else _placed(node, positions.get(node.get('id'))) for node in nodes]
+        state = cls(diagram_id, nodes, graph.edges)
+        # Until the first edit the loaded graph (and everything cached on it) is the live one
+        state._graph, state._graph_revision = graph, 0
+        state.seed_version = graph.version
+        return state
+
+    def _reset(self, nodes, edges):
+        self._nodes = {node['id']: node for node in nodes if node.get('id')}
+        self._edges = {}
+        self._attached = {}
+        for edge in edges:
+            self._add_edge(edge)
+
+    def _add_edge(self, edge):
+        key = _edge_key(edge)
+        self._edges[key] = edge
+        for end in (edge.get('source'), edge.get('target')):
+            self._attached.setdefault(end, set()).add(key)
+
+    def _remove_edge(self, key):
+        edge = self._edges.pop(key, None)
+        if edge is None:
+            return False
+        for end in (edge.get('source'), edge.get('target')):
+            self._attached.get(end, set()).discard(key)
+        return True
+
+    def _apply(self, op):
+        kind = op['op']
+        if kind == 'reset':
+            self._reset(op['nodes'], op.get('edges', []))
+            return True
+        if kind == 'node.add':
+            self._nodes[op['node']['id']] = op['node']
+            return True
+        if kind == 'edge.add':
+            self._add_edge(op['edge'])
+            return True
+        if kind == 'edge.remove':
+            return self._remove_edge(op['id'])
+
+        node = self._nodes.get(op['id'])
+        if node is None:
+            # Edited concurrently after someone else removed it
+            return False
+        if kind == 'node.update':
+            data = node.get('data')
+            self._nodes[op['id']] = {**node, 'data': {**(data if isinstance(data, Mapping) else {}), **op['data']}}
+        elif kind == 'node.move':
+            self._nodes[op['id']] = {**node, 'position': op['position']}
+        else:
+            del self._nodes[op['id']]
+            for key in list(self._attached.pop(op['id'], ())):
+                self._remove_edge(key)
+        return True
+
+    def apply(self, ops):
+        """Apply ``ops`` in order; return the ones that changed something
+
+        The whole batch is checked first: if any operation is malformed,
+        :class:`SyncError` is raised and nothing is applied.
+        """
+        for op in ops:
+            check_op(op)
+        with self._lock:
+            applied = [op for op in ops if self._apply(op)]
+            if applied:
+                self.revision += 1
+            return applied
+
+    def document(self):
+        """Return ``{'nodes', 'edges', 'revision'}`` as plain lists"""
+        with self._lock:
+            return {
+                'nodes': list(self._nodes.values()),
+                'edges': list(self._edges.values()),
+                'revision': self.revision,
+            }
+
+    def snapshot(self):
+        """Return :meth:`document` plus the path index (``paths``) of the same revision"""
+        with self._lock:
+            document = self.document()
+            document['paths'] = get_path_payload(self.graph())
+            return document
+
+    def graph(self):
+        """Return a :class:`BowtieGraph` of the current revision (built once per revision)"""
+        with self._lock:
+            if self._graph_revision != self.revision:
+                self._graph = BowtieGraph(
+                    list(self._nodes.values()), list(self._edges.values()),
+                    version=('sync', self.diagram_id, self.revision),
+                )
+                self._graph_revision = self.revision
+            return self._graph
+
+
+def _placed(node, xy):
+    x, y = xy if xy is not None else (0.0, 0.0)
+    return {**node, 'position': {'x': round(x, 2), 'y': round(y, 2)}}
+
+
+class _Outbox:
+    """Operations waiting for the next broadcast, coalesced per node"""
+
+    def __init__(self):
+        self.ops = []
+        self._slots = {}
+
+    def add(self, op, origin):
+        kind = op['op']
+        if kind == 'reset':
+            # A new document supersedes everything queued before it
+            self.ops.clear()
+            self._slots.clear()
+        elif kind in COALESCED_OPS:
+            key = (kind, op['id'])
+            slot = self._slots.get(key)
+            if slot is not None:
+                queued_origin, queued = self.ops[slot]
+                if kind == 'node.update':
+                    op = {**queued, 'data': {**queued['data'], **op['data']}}
+                # Merged edits from two connections go back to both
+                self.ops[slot] = (origin if queued_origin is origin else None, op)
+                return
+            self._slots[key] = len(self.ops)
+        elif kind in NODE_OPS:
+            node_id = _op_node_id(op)
+            for coalesced in COALESCED_OPS:
+                self._slots.pop((coalesced, node_id), None)
+        self.ops.append((origin, op))
+
+    def drain(self):
+        ops, self.ops, self._slots = self.ops, [], {}
+        return ops
+
+
+class _Channel:
+    """Connections watching one diagram, plus its pending broadcast"""
+
+    def __init__(self, state):
+        self.state = state
+        self.connections = set()
+        self.outbox = _Outbox()
+        self.flush_handle = None
+
+
+def _plain(value):
+    # Nodes seeded from a loaded file are read-only mappings
+    if isinstance(value, MappingProxyType):
+        return dict(value)
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+
+def _encode(message):
+    return json.dumps(message, separators=(',', ':'), default=_plain)
+
+
+class SyncHub:
+    """Synced diagrams by id; the websocket side runs on one event loop"""
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL, loader=None):
+        self.flush_interval = flush_interval
+        # diagram_id -> graph on disk (or None if unknown); seeds channels an editor opens first
+        self.loader = loader
+        self._channels = {}
+        # token -> monotonic expiry time (None: never expires)
+        self._tokens = {}
+        self._lock = threading.Lock()
+
+    def issue_token(self, ttl=TOKEN_TTL):
+        """Return a new token that lets connections join this hub for ``ttl`` seconds (None: forever)
+
+        Expired tokens are dropped here, so the hub only holds the live ones.
+        """
+        token = secrets.token_urlsafe(TOKEN_BYTES)
+        now = time.monotonic()
+        with self._lock:
+            self._tokens = {t: expiry for t, expiry in self._tokens.items() if expiry is None or expiry > now}
+            self._tokens[token] = now + ttl if ttl is not None else None
+        return token
+
+    def accepts(self, token):
+        """Return whether ``token`` was issued by :meth:`issue_token` and has not expired"""
+        if not isinstance(token, str) or not token:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            tokens = [t for t, expiry in self._tokens.items() if expiry is None or expiry > now]
+        token = token.encode()
+        return any(hmac.compare_digest(token, issued.encode()) for issued in tokens)
+
+    def revoke_token(self, token):
+        """Stop accepting ``token`` for new connections"""
+        with self._lock:
+            self._tokens.pop(token, None)
+
+    def open(self, diagram_id, graph=None):
+        """Return the state of ``diagram_id``, creating it (seeded from ``graph``) if needed
+
+        Without ``graph`` a new state is seeded through :attr:`loader`, which
+        raises KeyError for diagrams it doesn't know. A state nobody has
+        edited or joined yet is reseeded when ``graph`` is a newer version.
+        """
+        with self._lock:
+            channel = self._channels.get(diagram_id)
+        if channel is not None and (graph is None or not self._stale(channel, graph)):
+            return channel.state
+        if graph is None and self.loader is not None:
+            graph = self.loader(diagram_id)
+            if graph is None:
+                raise KeyError(diagram_id)
+        state = DiagramState.from_graph(diagram_id, graph) if graph is not None else DiagramState(diagram_id)
+        with self._lock:
+            channel = self._channels.get(diagram_id)
+            if channel is None:
+                channel = self._channels[diagram_id] = _Channel(state)
+            elif graph is not None and self._stale(channel, graph):
+                channel.state = state
+            return channel.state
+
+    @staticmethod
+    def _stale(channel, graph):
+        state = channel.state
+        return not state.revision and not channel.connections and state.seed_version != graph.version
+
+    def state(self, diagram_id):
+        """Return the state of ``diagram_id``, or None if nobody has opened it"""
+        channel = self._channels.get(diagram_id)
+        return channel.state if channel is not None else None
+
+    def graph(self, diagram_id):
+        """Return the live graph of ``diagram_id``, or None until an editor has changed it
+
+        Callers fall back to the file on disk, which is what an unedited state holds anyway.
+        """
+        state = self.state(diagram_id)
+        return state.graph() if state is not None and state.revision else None
+
+    def viewers(self, diagram_id):
+        """Return how many connections are watching ``diagram_id``"""
+        channel = self._channels.get(diagram_id)
+        return len(channel.connections) if channel is not None else 0
+
+    def _channel(self, diagram_id):
+        self.open(diagram_id)
+        return self._channels[diagram_id]
+
+    # The methods below run on the server's event loop
+
+    def join(self, diagram_id, connection):
+        """Register ``connection`` and return the snapshot message to send it"""
+        channel = self._channel(diagram_id)
+        channel.connections.add(connection)
+        return _encode({'type': 'snapshot', 'diagram': diagram_id, **channel.state.snapshot()})
+
+    def leave(self, diagram_id, connection):
+        channel = self._channels.get(diagram_id)
+        if channel is not None:
+            channel.connections.discard(connection)
+
+    def receive(self, diagram_id, connection, ops):
+        """Apply ``ops`` from ``connection`` and queue them for the next broadcast"""
+        channel = self._channel(diagram_id)
+        for op in channel.state.apply(ops):
+            channel.outbox.add(op, connection)
+        if channel.outbox.ops and channel.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            channel.flush_handle = loop.call_later(self.flush_interval, self._flush, diagram_id)
+
+    def _flush(self, diagram_id):
+        from websockets.asyncio.server import broadcast
+
+        channel = self._channels[diagram_id]
+        channel.flush_handle = None
+        queued = channel.outbox.drain()
+        if not queued or not channel.connections:
+            return
+        revision = channel.state.revision
+        message = _encode({'type': 'delta', 'diagram': diagram_id, 'revision': revision,
+                           'ops': [op for _, op in queued]})
+        origins = {origin for origin, _ in queued if origin is not None}
+        broadcast(channel.connections - origins, message)
+        # Connections that sent part of the batch get everything but their own ops
+        for origin in origins & channel.connections:
+            ops = [op for sender, op in queued if sender is not origin]
+            if ops:
+                broadcast((origin,), _encode({'type': 'delta', 'diagram': diagram_id,
+                                              'revision': revision, 'ops': ops}))
+
+
+def _request_target(path):
+    """Split a request path into ``(diagram_id, token)``; the id is None if the path is not /sync/<id>"""
+    parts = urlsplit(path)
+    token = parse_qs(parts.query).get('token', [None])[0]
+    if not parts.path.startswith(PATH_PREFIX) or len(parts.path) == len(PATH_PREFIX):
+        return None, token
+    return unquote(parts.path[len(PATH_PREFIX):]), token
+
+
+def _check_request(hub, connection, request):
+    # Runs before the handshake completes: no valid token, no websocket
+    _, token = _request_target(request.path)
+    if not hub.accepts(token):
+        return connection.respond(HTTPStatus.FORBIDDEN, 'Missing or unknown sync token\n')
+    return None
+
+
+async def _handle(hub, connection):
+    diagram_id, _ = _request_target(connection.request.path)
+    if diagram_id is None:
+        await connection.close(4004, 'expected /sync/<diagram_id>')
+        return
+    try:
+        # Loading the seed can take a while; keep the event loop serving the other diagrams
+        await asyncio.to_thread(hub.open, diagram_id)
+    except KeyError:
+        await connection.close(4004, f'unknown diagram {diagram_id!r}')
+        return
+    await connection.send(hub.join(diagram_id, connection))
+    try:
+        async for raw in connection:
+            try:
+                message = json.loads(raw)
+                if not isinstance(message, dict) or message.get('type') != 'ops':
+                    raise SyncError("expected {'type': 'ops', 'ops': [...]}")
+                ops = message.get('ops')
+                if not isinstance(ops, list):
+                    raise SyncError('ops must be a list')
+                hub.receive(diagram_id, connection, ops)
+            except (ValueError, TypeError) as e:
+                await connection.send(_encode({'type': 'error', 'message': str(e)}))
+    finally:
+        hub.leave(diagram_id, connection)
+
+
+async def serve(hub, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None, origins=DEFAULT_ORIGINS):
+    """Serve ``hub`` until cancelled; ``ready`` (an Event) is set once listening
+
+    Only browsers on ``origins`` may connect, and only with a token from
+    :meth:`SyncHub.issue_token`.
+    """
+    from websockets.asyncio.server import serve as websocket_serve
+
+    async with websocket_serve(partial(_handle, hub), host, port, max_size=MAX_MESSAGE_BYTES,
+                               origins=list(origins), process_request=partial(_check_request, hub)):
+        if ready is not None:
+            ready.set()
+        await asyncio.get_running_loop().create_future()
+
+
+_hub = SyncHub()
+_server = None
+_server_lock = threading.Lock()
+
+
+def get_hub():
+    """Return this process's shared :class:`SyncHub`"""
+    return _hub
+
+
+def start_background(port=DEFAULT_PORT, host=DEFAULT_HOST, timeout=5.0, origins=DEFAULT_ORIGINS, loader=None):
+    """Run the sync server on a daemon thread (once per process) and return the hub
+
+    ``loader`` (see :attr:`SyncHub.loader`) seeds diagrams an editor opens
+    first. Raises OSError if the port can't be bound.
+    """
+    global _server
+    with _server_lock:
+        if loader is not None:
+            _hub.loader = loader
+        if _server is not None:
+            return _hub
+        ready = threading.Event()
+        failure = []
+
+        def run():
+            try:
+                asyncio.run(serve(_hub, host, port, ready, origins))
+            except Exception as e:
+                failure.append(e)
+                ready.set()
+
+        thread = threading.Thread(target=run, name=f'bowtie-sync-{port}', daemon=True)
+        thread.start()
+        if not ready.wait(timeout):
+            raise OSError(f'sync server did not start on {host}:{port}')
+        if failure:
+            raise OSError(f'could not start sync server on {host}:{port}: {failure[0]}')
+        _server = thread
+        return _hub
+
+
+def main(argv=None):
+    import argparse
+
+    from .loader import load_graph
+
+    parser = argparse.ArgumentParser(description='Serve live diagram sync for the bowtie editor')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--seed', action='append', default=[], metavar='ID=PATH',
+                        help='start diagram ID from the file at PATH (repeatable)')
+    parser.add_argument('--origin', action='append', default=None, metavar='URL',
+                        help=f'origin the editor is served from (repeatable; default: {", ".join(DEFAULT_ORIGINS)})')
+    args = parser.parse_args(argv)
+
+    for seed in args.seed:
+        diagram_id, _, path = seed.partition('=')
+        if not path:
+            parser.error(f'--seed expects ID=PATH, got {seed!r}')
+        _hub.open(diagram_id, load_graph(path))
+    token = _hub.issue_token(ttl=None)
+    print(f'Syncing on ws://{args.host}:{args.port}{PATH_PREFIX}<diagram_id>?token={token}')
+    try:
+        asyncio.run(serve(_hub, args.host, args.port, origins=args.origin or DEFAULT_ORIGINS))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+"""Structural validation of bowtie diagrams.
+
+:mod:`bowtie.schema` checks fields the way the editor does; this module
+checks that the fields form a usable bowtie. The check runs in O(V+E):
+
+* edges whose source or target is not a node (``dangling-edge``)
+* duplicate node ids (``duplicate-id``)
+* no top event, or more than one (``missing-top-event``, ``multiple-top-events``)
+* cycles, found by peeling the graph with Kahn's algorithm from both ends,
+  so only nodes actually on (or between) cycles remain (``cycle``)
+* barriers on no path into or out of a top event (``orphaned-barrier``)
+* barriers whose ``barrierType`` does not match the side of the top event
+  they sit on, or that have none (``wrong-side``, ``barrier-type``)
+* threats that never reach a top event and consequences never reached from
+  one (``disconnected-threat``, ``unreached-consequence``)
+
+Reports are memoized on the graph. :func:`validate_paths` checks many files
+on a process pool; run it from the command line with::
+
+    python -m bowtie.validate data/ other_diagram.json
+"""
+
+import os
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import NamedTuple
+
+from .graph import BARRIER_TYPES, BowtieGraph
+from .loader import BowtieCache
+from .schema import schema_errors
+from .snapshot import SNAPSHOT_SUFFIX
+from .workspace import DIAGRAM_SUFFIXES, MANIFEST_NAME
+
+ERROR = 'error'
+WARNING = 'warning'
+MAX_LISTED = 10
+
+
+class Issue(NamedTuple):
+    severity: str
+    code: str
+    message: str
+    node_ids: tuple = ()
+
+
+class ValidationReport(NamedTuple):
+    issues: tuple
+
+    @property
+    def errors(self):
+        return tuple(i for i in self.issues if i.severity == ERROR)
+
+    @property
+    def warnings(self):
+        return tuple(i for i in self.issues if i.severity == WARNING)
+
+    @property
+    def ok(self):
+        return not self.errors
+
+
+def _listed(ids):
+    ids = list(ids)
+    shown = ', '.join(map(str, ids[:MAX_LISTED]))
+    return shown + (f' and {len(ids) - MAX_LISTED} more' if len(ids) > MAX_LISTED else '')
+
+
+def _peel(nodes, forward, backward):
+    """Remove nodes of in-degree zero (w.r.t. ``backward``) until none are left to remove"""
+    remaining = set(nodes)
+    in_degree = {n: sum(1 for p in backward(n) if p in remaining) for n in remaining}
+    queue = deque(n for n, d in in_degree.items() if d == 0)
+    while queue:
+        current = queue.popleft()
+        remaining.discard(current)
+        for nxt in forward(current):
+            if nxt in remaining:
+                in_degree[nxt] -= 1
+                if in_degree[nxt] == 0:
+                    queue.append(nxt)
+    return remaining
+
+
+def _reach(starts, step, known):
+    seen = set(starts)
+    queue = deque(starts)
+    while queue:
+        for nxt in step(queue.popleft()):
+            if nxt in known and nxt not in seen:
+                seen.add(nxt)
+                queue.append(nxt)
+    return seen
+
+
+def _validate(graph):
+    issues = []
+
+    dangling = [
+        edge.get('id') or f"{edge.get('source')}->{edge.get('target')}"
+        for edge in graph.edges
+        if edge.get('source') not in graph or edge.get('target') not in graph
+    ]
+    if dangling:
+        issues.append(Issue(ERROR, 'dangling-edge',
+                            f'{len(dangling)} edges point at missing nodes: {_listed(dangling)}', tuple(dangling)))
+
+    if len(graph.nodes) != len(graph):
+        seen, duplicates = set(), {}
+        for node in graph.nodes:
+            node_id = node.get('id')
+            if node_id in seen:
+                duplicates[node_id] = None
+            seen.add(node_id)
+        issues.append(Issue(ERROR, 'duplicate-id',
+                            f'Duplicate node ids: {_listed(duplicates)}', tuple(duplicates)))
+
+    top_events = [n.get('id') for n in graph.nodes_of_type('topEvent')]
+    if not top_events:
+        issues.append(Issue(ERROR, 'missing-top-event', 'The diagram has no top event'))
+    elif len(top_events) > 1:
+        issues.append(Issue(WARNING, 'multiple-top-events',
+                            f'{len(top_events)} top events: {_listed(top_events)}', tuple(top_events)))
+
+    # Peel sources forwards, then sinks backwards: what survives is on a cycle
+    cyclic = _peel((n.get('id') for n in graph.nodes), graph.successors, graph.predecessors)
+    cyclic = _peel(cyclic, graph.predecessors, graph.successors)
+    if cyclic:
+        ordered = [n.get('id') for n in graph.nodes if n.get('id') in cyclic]
+        issues.append(Issue(ERROR, 'cycle', f'{len(ordered)} nodes are on cycles: {_listed(ordered)}', tuple(ordered)))
+
+    upstream = _reach(top_events, graph.predecessors, graph)
+    downstream = _reach(top_events, graph.successors, graph)
+
+    orphaned, wrong_side, untyped = [], [], []
+    for barrier in graph.nodes_of_type('barrier'):
+        barrier_id = barrier.get('id')
+        barrier_type = (barrier.get('data') or {}).get('barrierType')
+        before, after = barrier_id in upstream, barrier_id in downstream
+        if barrier_type not in BARRIER_TYPES:
+            untyped.append(barrier_id)
+        elif not before and not after:
+            orphaned.append(barrier_id)
+        elif (barrier_type == 'prevention' and not before) or (barrier_type == 'mitigation' and not after):
+            wrong_side.append(barrier_id)
+    if untyped:
+        issues.append(Issue(ERROR, 'barrier-type',
+                            f'Barriers without a valid barrierType: {_listed(untyped)}', tuple(untyped)))
+    if wrong_side:
+        issues.append(Issue(ERROR, 'wrong-side',
+                            f'Barriers on the wrong side of the top event for their barrierType: {_listed(wrong_side)}',
+                            tuple(wrong_side)))
+    if orphaned:
+        issues.append(Issue(WARNING, 'orphaned-barrier',
+                            f'Barriers not connected to a top event: {_listed(orphaned)}', tuple(orphaned)))
+
+    if top_events:
+        disconnected = [n.get('id') for n in graph.nodes_of_type('threat') if n.get('id') not in upstream]
+        if disconnected:
+            issues.append(Issue(WARNING, 'disconnected-threat',
+                                f'Threats that never reach a top event: {_listed(disconnected)}', tuple(disconnected)))
+        unreached = [n.get('id') for n in graph.nodes_of_type('consequence') if n.get('id') not in downstream]
+        if unreached:
+            issues.append(Issue(WARNING, 'unreached-consequence',
+                                f'Consequences no top event leads to: {_listed(unreached)}', tuple(unreached)))
+
+    return ValidationReport(tuple(issues))
+
+
+def validate_graph(graph):
+    """Return the memoized :class:`ValidationReport` for ``graph``"""
+    return graph.cached('validation', _validate)
+
+
+def validate_file(path):
+    """Return ``(path, report)`` for one diagram file, schema problems included
+
+    Documents too malformed to build a graph from get their schema errors
+    only; anything else that trips the structural check is reported as a
+    ``malformed`` error instead of failing the whole batch.
+    """
+    cache = BowtieCache(maxsize=1)
+    document = None
+    try:
+        if str(path).endswith(SNAPSHOT_SUFFIX):
+            schema, graph = [], cache.load_graph(path)
+        else:
+            document = cache.load(path)
+            schema, graph = schema_errors(document), None
+    except (OSError, ValueError) as e:
+        return str(path), ValidationReport((Issue(ERROR, 'unreadable', f'Could not read diagram: {e}'),))
+    issues = tuple(Issue(ERROR, 'schema', message) for message in schema)
+    if graph is None and not _buildable(document):
+        return str(path), ValidationReport(issues)
+    try:
+        if graph is None:
+            graph = BowtieGraph.from_document(document)
+        return str(path), ValidationReport(issues + validate_graph(graph).issues)
+    except (TypeError, AttributeError, KeyError) as e:
+        return str(path), ValidationReport(issues + (Issue(ERROR, 'malformed', f'Could not check diagram: {e!r}'),))
+
+
+def _buildable(document):
+    """True if ``document`` is an object whose nodes and edges are objects too"""
+    if not isinstance(document, Mapping):
+        return False
+    nodes, edges = document.get('nodes', []), document.get('edges', [])
+    return (
+        isinstance(nodes, (list, tuple)) and isinstance(edges, (list, tuple))
+        and all(isinstance(n, Mapping) for n in nodes) and all(isinstance(e, Mapping) for e in edges)
+    )
+
+
+def diagram_files(paths):
+    """Expand directories in ``paths`` to the diagram files they contain"""
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(
+                p for p in sorted(path.iterdir())
+                if p.is_file() and p.suffix in DIAGRAM_SUFFIXES and p.name != MANIFEST_NAME
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def validate_paths(paths, workers=None):
+    """Validate every diagram under ``paths`` (files or directories) on a process pool
+
+    Returns ``{path: ValidationReport}`` in file order.
+    """
+    files = diagram_files(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(files)))
+    if workers == 1:
+        return dict(validate_file(f) for f in files)
+    with ProcessPoolExecutor(workers, mp_context=get_context('spawn')) as pool:
+        return dict(pool.map(validate_file, files, chunksize=max(1, len(files) // (workers * 4))))
+
+
+def main(argv=None):
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description='Check bowtie diagrams for structural problems')
+    parser.add_argument('paths', nargs='+', help='diagram files or directories of diagrams')
+    parser.add_argument('--workers', type=int, default=None, help='processes to use (default: one per CPU)')
+    parser.add_argument('--quiet', action='store_true', help='only list diagrams with problems')
+    args = parser.parse_args(argv)
+
+    reports = validate_paths(args.paths, args.workers)
+    failed = 0
+    for path, report in reports.items():
+        if report.errors:
+            failed += 1
+        if not report.issues:
+            if not args.quiet:
+                print(f'{path}: ok')
+            continue
+        print(f'{path}: {len(report.errors)} errors, {len(report.warnings)} warnings')
+        for issue in report.issues:
+            print(f'  {issue.severity}: [{issue.code}] {issue.message}')
+    print(f'{len(reports)} diagrams checked, {failed} with errors')
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
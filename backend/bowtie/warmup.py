@@ -0,0 +1,103 @@
+"""Background warm-up of the data layer when the presentation starts.
+
+The presentation renders its first page straight away and hands the
+expensive, shareable work to a :class:`WarmUp` thread: loading the diagram,
+building the graph-level indexes the pages reuse (sub-bowties, chains,
+health rollup, search index, path index, risk model) and validating it. Every step goes
+through the same memoized getters as the pages, so a page that gets there
+first simply builds the index itself and the warm-up finds it cached.
+
+Sources are consumed lazily on the warm-up thread, so even listing a
+workspace's diagrams stays off the first rerun. Each step's timing (and
+error, if any) is recorded for the developer panel and for
+``python -m benchmarks.app_timing``.
+"""
+
+import importlib
+import threading
+import time
+from functools import partial
+from typing import NamedTuple
+
+# (step, module, function), in the order the pages first need them. Modules
+# are imported on the warm-up thread, keeping NumPy and friends off the
+# first rerun too.
+WARM_STEPS = (
+    ('partition', 'partition', 'partition'),
+    ('chains', 'chains', 'get_chains'),
+    ('validate', 'validate', 'validate_graph'),
+    ('health', 'health', 'get_health'),
+    ('search', 'search', 'get_search_index'),
+    ('paths', 'paths', 'get_path_index'),
+    ('risk', 'risk', 'get_risk_model'),
+)
+
+
+class WarmUpStep(NamedTuple):
+    diagram_id: str
+    name: str
+    seconds: float
+    error: str = None
+
+
+def _build(module, function, graph):
+    return getattr(importlib.import_module(f'.{module}', __package__), function)(graph)
+
+
+class WarmUp:
+    """Loads and indexes diagrams on a daemon thread; ``sources`` yields ``(diagram_id, load)`` pairs"""
+
+    def __init__(self, sources, steps=WARM_STEPS):
+        self.sources = sources
+        self.steps = steps
+        self.completed = []
+        self.reports = {}
+        self.elapsed = None
+        self._started = None
+        self._done = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the warm-up thread (once); returns self"""
+        if self._thread is None:
+            self._started = time.perf_counter()
+            self._thread = threading.Thread(target=self._run, name='bowtie-warmup', daemon=True)
+            self._thread.start()
+        return self
+
+    def _step(self, diagram_id, name, run):
+        start = time.perf_counter()
+        try:
+            result = run()
+        except Exception as e:
+            # One broken diagram shouldn't keep the others cold; pages report it when they load it
+            self.completed.append(WarmUpStep(diagram_id, name, time.perf_counter() - start, f'{type(e).__name__}: {e}'))
+            return None
+        self.completed.append(WarmUpStep(diagram_id, name, time.perf_counter() - start))
+        return result
+
+    def _run(self):
+        try:
+            for diagram_id, load in self._step(None, 'sources', lambda: list(self.sources)) or ():
+                graph = self._step(diagram_id, 'load', load)
+                if graph is None:
+                    continue
+                for name, module, function in self.steps:
+                    result = self._step(diagram_id, name, partial(_build, module, function, graph))
+                    if name == 'validate' and result is not None:
+                        self.reports[diagram_id] = result
+        finally:
+            self.elapsed = time.perf_counter() - self._started
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """Block until the warm-up has finished (or ``timeout`` seconds); return whether it has"""
+        return self._done.wait(timeout)
+
+    def errors(self):
+        """Return the steps that failed"""
+        return [step for step in self.completed if step.error]
@@ -0,0 +1,175 @@
+"""Workspaces: a directory of bowtie diagrams behind a lightweight manifest.
+
+Scanning a workspace only summarizes each diagram (node counts per type,
+hazard and top event labels) using the streaming reader or a snapshot's
+type column, so hundreds of files can be listed without building their
+graphs. Summaries are persisted to ``.bowtie-manifest.json`` in the
+directory and reused while a file's mtime and size are unchanged. Full
+graphs are loaded on selection through the workspace's own bounded LRU
+:class:`BowtieCache`, which also scopes every graph-level cache (chains,
+risk models, ...) to the diagrams currently held.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from .graph import NODE_TYPES
+from .loader import BowtieCache
+from .snapshot import SNAPSHOT_SUFFIX, open_snapshot
+from .stream import iter_items
+
+MANIFEST_NAME = '.bowtie-manifest.json'
+DIAGRAM_SUFFIXES = ('.json', SNAPSHOT_SUFFIX)
+WORKSPACE_CACHE_SIZE = 8
+SCAN_INTERVAL = 5.0
+
+
+class ManifestEntry(NamedTuple):
+    diagram_id: str
+    path: str
+    mtime_ns: int
+    size: int
+    counts: dict
+    hazard: str
+    top_events: tuple
+
+
+def _empty_counts():
+    counts = dict.fromkeys(NODE_TYPES, 0)
+    counts.update(preventionBarrier=0, mitigationBarrier=0, edges=0)
+    return counts
+
+
+def summarize(path):
+    """Return ``(counts, hazard label, top event labels)`` without building a graph"""
+    counts = _empty_counts()
+    hazard = None
+    top_events = []
+    path = str(path)
+
+    if path.endswith(SNAPSHOT_SUFFIX):
+        with open_snapshot(path) as snapshot:
+            counts.update(snapshot.type_counts())
+            counts['edges'] = snapshot.edge_count
+            for i, code in enumerate(snapshot.node_type):
+                node_type = NODE_TYPES[code]
+                if node_type == 'barrier' and snapshot.barrier_type[i]:
+                    counts[('preventionBarrier', 'mitigationBarrier')[snapshot.barrier_type[i] - 1]] += 1
+                elif node_type == 'hazard' and hazard is None:
+                    hazard = snapshot.string(snapshot.node_label[i])
+                elif node_type == 'topEvent':
+                    top_events.append(snapshot.string(snapshot.node_label[i]))
+        return counts, hazard, tuple(top_events)
+
+    with open(path, 'r') as f:
+        for key, item in iter_items(f):
+            if key == 'edges':
+                counts['edges'] += 1
+                continue
+            node_type = item.get('type')
+            data = item.get('data') or {}
+            counts[node_type] = counts.get(node_type, 0) + 1
+            if node_type == 'barrier' and data.get('barrierType') in ('prevention', 'mitigation'):
+                counts[data['barrierType'] + 'Barrier'] += 1
+            elif node_type == 'hazard' and hazard is None:
+                hazard = data.get('label')
+            elif node_type == 'topEvent':
+                top_events.append(data.get('label'))
+    return counts, hazard, tuple(top_events)
+
+
+class Workspace:
+    """Manifest-indexed directory of diagrams with lazily loaded graphs"""
+
+    def __init__(self, directory, cache_size=WORKSPACE_CACHE_SIZE):
+        self.directory = Path(directory).resolve()
+        self.cache = BowtieCache(maxsize=cache_size)
+        self._entries = {}
+        self._scanned_at = None
+        self._lock = threading.Lock()
+
+    def _read_manifest(self):
+        try:
+            with open(self.directory / MANIFEST_NAME, 'r') as f:
+                raw = json.load(f)
+            return {e['diagram_id']: ManifestEntry(**{**e, 'top_events': tuple(e['top_events'])}) for e in raw}
+        except (OSError, ValueError, TypeError, KeyError):
+            # Missing, unparsable or the wrong shape: summarize every file again
+            return {}
+
+    def _write_manifest(self):
+        payload = [e._asdict() for e in self._entries.values()]
+        tmp = self.directory / (MANIFEST_NAME + '.tmp')
+        try:
+            with open(tmp, 'w') as f:
+                json.dump(payload, f)
+            os.replace(tmp, self.directory / MANIFEST_NAME)
+        except OSError:
+            # A read-only workspace still works, it just re-summarizes on restart
+            pass
+
+    def scan(self, force=False):
+        """Refresh the manifest, summarizing only new or changed files"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._scanned_at is not None and now - self._scanned_at < SCAN_INTERVAL:
+                return list(self._entries.values())
+
+            known = self._entries or self._read_manifest()
+            entries = {}
+            changed = False
+            for path in sorted(self.directory.iterdir()):
+                if path.suffix not in DIAGRAM_SUFFIXES or path.name.startswith('.'):
+                    continue
+                stat = path.stat()
+                diagram_id = path.name
+                entry = known.get(diagram_id)
+                if entry is None or entry.mtime_ns != stat.st_mtime_ns or entry.size != stat.st_size:
+                    try:
+                        counts, hazard, top_events = summarize(path)
+                    except (OSError, ValueError, KeyError, IndexError):
+                        continue
+                    entry = ManifestEntry(diagram_id, str(path), stat.st_mtime_ns, stat.st_size,
+                                          counts, hazard, top_events)
+                    changed = True
+                entries[diagram_id] = entry
+
+            self._entries = entries
+            if changed or entries.keys() != known.keys():
+                self._write_manifest()
+            self._scanned_at = now
+            return list(entries.values())
+
+    def entries(self):
+        """Return the manifest entries, rescanning at most every ``SCAN_INTERVAL`` seconds"""
+        return self.scan()
+
+    def entry(self, diagram_id):
+        """Return the manifest entry for ``diagram_id``, or None"""
+        self.scan()
+        return self._entries.get(diagram_id)
+
+    def load_graph(self, diagram_id):
+        """Load the full graph for ``diagram_id`` into the workspace cache"""
+        entry = self.entry(diagram_id)
+        if entry is None:
+            raise KeyError(diagram_id)
+        return self.cache.load_graph(entry.path)
+
+
+_workspaces = {}
+_workspaces_lock = threading.Lock()
+
+
+def get_workspace(directory):
+    """Return the process-wide :class:`Workspace` for ``directory``"""
+    key = str(Path(directory).resolve())
+    with _workspaces_lock:
+        workspace = _workspaces.get(key)
+        if workspace is None:
+            workspace = _workspaces[key] = Workspace(key)
+        return workspace
@@ -0,0 +1,65 @@
+from bowtie.chains import get_chains
+from bowtie.graph import BowtieGraph
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def graph(prevention, mitigation, edges, reverse=False):
+    nodes = [node('T', 'threat'), node('E', 'topEvent'), node('C', 'consequence')]
+    nodes += [node(b, 'barrier', barrierType='prevention') for b in prevention]
+    nodes += [node(b, 'barrier', barrierType='mitigation') for b in mitigation]
+    if reverse:
+        nodes.reverse()
+    return BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]})
+
+
+def ids(chain):
+    return [b['id'] for b in chain.barriers]
+
+
+def test_straight_chains_in_flow_order():
+    chains = get_chains(graph('P2 P1'.split(), 'M1 M2'.split(),
+                              [('T', 'P2'), ('P2', 'P1'), ('P1', 'E'), ('E', 'M2'), ('M2', 'M1'), ('M1', 'C')]))
+    prevention, mitigation = chains.prevention('T'), chains.mitigation('C')
+    assert ids(prevention) == ['P2', 'P1']
+    assert ids(mitigation) == ['M2', 'M1']
+    assert not prevention.branched and prevention.complete and not prevention.bypassed
+    assert prevention.top_events == ('E',)
+    assert chains.sources_of('P1') == [('threat', 'T')]
+
+
+def test_branches_merge_and_rank_the_same_in_any_node_order():
+    edges = [('T', 'B'), ('T', 'A'), ('A', 'D'), ('B', 'D'), ('D', 'E'), ('T', 'X')]
+    for reverse in (False, True):
+        chain = get_chains(graph(['A', 'B', 'D', 'X'], [], edges, reverse=reverse)).prevention('T')
+        # Parallel branches tie on rank and are ordered by id; the dead end X is dropped
+        assert ids(chain) == ['A', 'B', 'D']
+        assert chain.branched and chain.complete
+
+
+def test_barrier_exiting_straight_to_the_top_event_is_a_fork():
+    chain = get_chains(graph(['A', 'B'], [], [('T', 'A'), ('A', 'B'), ('B', 'E'), ('A', 'E')])).prevention('T')
+    assert ids(chain) == ['A', 'B']
+    assert chain.branched
+
+
+def test_cycles_are_listed_last_and_reported():
+    chains = get_chains(graph(['A', 'B', 'Z'], [], [('T', 'Z'), ('Z', 'A'), ('A', 'B'), ('B', 'A'), ('B', 'E')]))
+    chain = chains.prevention('T')
+    assert ids(chain) == ['Z', 'A', 'B']
+    assert chains.cyclic_barriers == {'A', 'B'}
+    assert chain.complete
+
+
+def test_bypassed_and_incomplete_chains():
+    chains = get_chains(graph(['A'], ['M'], [('T', 'A'), ('A', 'E'), ('T', 'E'), ('M', 'C')]))
+    assert chains.prevention('T').bypassed
+    mitigation = chains.mitigation('C')
+    assert ids(mitigation) == ['M']
+    assert not mitigation.complete and mitigation.top_events == ()
@@ -0,0 +1,85 @@
+from itertools import combinations
+from pathlib import Path
+
+import pytest
+
+from bowtie.criticality import analyze
+from bowtie.graph import BowtieGraph
+from bowtie.loader import load_graph
+from bowtie.risk import FAILED_PROBABILITY, get_risk_model
+
+DEMO = Path(__file__).resolve().parent.parent / 'data' / 'demo_bowtie.json'
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def shared_barriers():
+    """Two threats sharing a barrier, a branched chain and two consequences sharing one"""
+    nodes = [node('T1', 'threat', likelihood=0.8), node('T2', 'threat', likelihood=0.6), node('E', 'topEvent'),
+             node('C1', 'consequence'), node('C2', 'consequence')]
+    nodes += [node(b, 'barrier', barrierType='prevention', failureProbability=p)
+              for b, p in (('A', 0.3), ('B', 0.2), ('S', 0.4), ('D', 0.5))]
+    nodes += [node(b, 'barrier', barrierType='mitigation', failureProbability=p)
+              for b, p in (('M1', 0.3), ('M2', 0.6), ('MS', 0.25))]
+    edges = [('T1', 'A'), ('T1', 'B'), ('A', 'S'), ('B', 'S'), ('S', 'E'), ('T2', 'D'), ('D', 'S'),
+             ('E', 'MS'), ('MS', 'M1'), ('M1', 'C1'), ('MS', 'M2'), ('M2', 'C2')]
+    return BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]})
+
+
+def brute_force(graph, default_probability, failed):
+    """Exposure with the barriers in ``failed`` forced to fail, from a full RiskModel evaluation"""
+    model = get_risk_model(graph)
+    probabilities = model.default_probabilities(default_probability)
+    for barrier_id in failed:
+        probabilities[model.index[barrier_id]] = FAILED_PROBABILITY
+    result = model.evaluate(probabilities)
+    top = float(result.top_event_likelihood[0])
+    return top, (float(result.consequence_likelihood[0].sum()) if model.consequence_ids else top)
+
+
+@pytest.mark.parametrize('graph, default_probability', [
+    (shared_barriers(), 0.0),
+    (load_graph(DEMO), 0.2),
+])
+def test_matches_brute_force(graph, default_probability):
+    ids = get_risk_model(graph).barrier_ids
+    report = analyze(graph, default_probability, top_pairs=len(ids) ** 2)
+    base_top, base_exposure = brute_force(graph, default_probability, ())
+    assert report.baseline_top_event == pytest.approx(base_top)
+    assert report.baseline_exposure == pytest.approx(base_exposure)
+
+    singles = {c.barrier_ids: c for c in report.singles}
+    assert len(singles) == len(ids)
+    for barrier_id in ids:
+        top, exposure = brute_force(graph, default_probability, (barrier_id,))
+        single = singles[(barrier_id,)]
+        assert single.top_event_likelihood == pytest.approx(top)
+        assert single.exposure == pytest.approx(exposure)
+        assert single.increase == pytest.approx(exposure - base_exposure, abs=1e-12)
+
+    pairs = {c.barrier_ids: c for c in report.pairs}
+    assert len(pairs) == len(ids) * (len(ids) - 1) // 2
+    for a, b in combinations(ids, 2):
+        top, exposure = brute_force(graph, default_probability, (a, b))
+        pair = pairs.get((a, b)) or pairs[(b, a)]
+        assert pair.top_event_likelihood == pytest.approx(top)
+        assert pair.exposure == pytest.approx(exposure)
+    increases = [c.increase for c in report.singles]
+    assert increases == sorted(increases, reverse=True)
+
+
+def test_without_consequences_exposure_is_the_top_event():
+    nodes = [node('T', 'threat'), node('E', 'topEvent'),
+             node('A', 'barrier', barrierType='prevention', failureProbability=0.5),
+             node('B', 'barrier', barrierType='prevention', failureProbability=0.5)]
+    graph = BowtieGraph.from_document({'nodes': nodes, 'edges': [edge('T', 'A'), edge('A', 'B'), edge('B', 'E')]})
+    report = analyze(graph, top_pairs=1)
+    assert report.baseline_exposure == pytest.approx(0.25)
+    assert report.pairs[0].exposure == pytest.approx(1.0)
+    assert report.pairs[0].interaction == pytest.approx(1.0 - 0.25 - 2 * 0.25)
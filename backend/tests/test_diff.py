@@ -0,0 +1,41 @@
+from bowtie.diff import diff_graphs
+from bowtie.graph import BowtieGraph
+
+
+def node(node_id, node_type, label, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': label, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def graph(nodes, edges=()):
+    return BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]})
+
+
+def test_duplicate_labels_pair_up_in_order():
+    old = graph([node(f'o{i}', 'barrier', 'Driver training', status='normal') for i in range(3)])
+    new = graph([node(f'n{i}', 'barrier', 'Driver  TRAINING', status='failed' if i == 1 else 'normal')
+                 for i in range(4)])
+    diff = diff_graphs(old, new)
+    assert [(o, n) for o, n, _ in diff.matched_by_label] == [('o0', 'n0'), ('o1', 'n1'), ('o2', 'n2')]
+    assert [n['id'] for n in diff.added] == ['n3']
+    assert diff.removed == []
+    assert diff.status_flips == [('n1', 'normal', 'failed')]
+
+
+def test_duplicate_labels_only_match_within_a_type():
+    old = graph([node('a', 'threat', 'Fatigue'), node('b', 'degradationFactor', 'Fatigue')])
+    new = graph([node('x', 'degradationFactor', 'Fatigue'), node('y', 'threat', 'Fatigue')])
+    diff = diff_graphs(old, new)
+    assert {(o, n) for o, n, _ in diff.matched_by_label} == {('a', 'y'), ('b', 'x')}
+    assert diff.changed == []
+
+
+def test_edges_follow_label_matches():
+    old = graph([node('t', 'threat', 'Rain'), node('e', 'topEvent', 'Crash')], [('t', 'e')])
+    new = graph([node('t2', 'threat', 'Rain'), node('e', 'topEvent', 'Crash')], [('t2', 'e')])
+    diff = diff_graphs(old, new)
+    assert diff.edges_added == [] and diff.edges_removed == []
+    assert diff.is_empty
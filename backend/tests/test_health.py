@@ -0,0 +1,79 @@
+import pytest
+
+from bowtie.graph import BowtieGraph
+from bowtie.health import COVERED_FACTOR_WEIGHT, UNCOVERED_FACTOR_WEIGHT, _trace, get_health
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def graph(extra_nodes, extra_edges):
+    nodes = [
+        node('T', 'threat'), node('E', 'topEvent'), node('C', 'consequence'),
+        node('P1', 'barrier', barrierType='prevention'),
+        node('P2', 'barrier', barrierType='prevention', status='failed'),
+        node('M', 'barrier', barrierType='mitigation'),
+    ] + extra_nodes
+    edges = [('T', 'P1'), ('P1', 'P2'), ('P2', 'E'), ('E', 'M'), ('M', 'C')] + extra_edges
+    return BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]})
+
+
+def factors(health):
+    return {f.factor_id: (set(f.control_ids), f.covered) for f in health.factors}
+
+
+def test_covered_and_uncovered_factors():
+    rollup = get_health(graph(
+        [node('F', 'degradationFactor'), node('G', 'degradationFactor'), node('K', 'degradationControl')],
+        [('F', 'K'), ('K', 'P1'), ('G', 'P1'), ('G', 'M')],
+    ))
+    p1 = rollup.barrier('P1')
+    assert factors(p1) == {'F': ({'K'}, True), 'G': (set(), False)}
+    assert p1.health == pytest.approx(COVERED_FACTOR_WEIGHT * UNCOVERED_FACTOR_WEIGHT)
+    assert rollup.barrier('P2').health == 0.0
+    assert rollup.uncovered_factors() == {'G': ('P1', 'M')}
+    assert rollup.degrades == {'F': ('P1',), 'G': ('P1', 'M')}
+
+    chain = rollup.chain('T')
+    assert chain.effective_barriers == pytest.approx(p1.health)
+    assert chain.weakest_barrier_id == 'P2'
+    assert chain.uncovered_factors == 1
+    assert rollup.chain('C').effective_barriers == pytest.approx(UNCOVERED_FACTOR_WEIGHT)
+    assert rollup.weakest_chains()[0].source_id == 'T'
+    assert rollup.summary()['failed'] == 1
+
+
+def test_a_route_around_the_control_leaves_the_factor_uncovered():
+    rollup = get_health(graph(
+        [node('F', 'degradationFactor'), node('K', 'degradationControl')],
+        [('F', 'K'), ('K', 'P1'), ('F', 'P1')],
+    ))
+    assert factors(rollup.barrier('P1')) == {'F': ({'K'}, False)}
+
+
+def test_shared_upstream_matches_a_trace_per_barrier():
+    # One factor reaches every barrier, through a chain of controls for some of them
+    extra_nodes = [node('F', 'degradationFactor'), node('F2', 'degradationFactor')]
+    extra_nodes += [node(f'K{i}', 'degradationControl') for i in range(3)]
+    extra_edges = [('F', 'K0'), ('K0', 'K1'), ('K1', 'K2'), ('F2', 'K1'), ('K2', 'P1'), ('K1', 'M'), ('F', 'M'),
+                   ('F2', 'P2'), ('F', 'F2')]
+    g = graph(extra_nodes, extra_edges)
+    factor_ids = frozenset(('F', 'F2'))
+    control_ids = frozenset(('K0', 'K1', 'K2'))
+    rollup = get_health(g)
+    for barrier_id in ('P1', 'P2', 'M'):
+        expected = {f: (set(c), covered) for f, (c, covered) in _trace(g, barrier_id, factor_ids, control_ids).items()}
+        assert factors(rollup.barrier(barrier_id)) == expected
+
+
+def test_degradation_cycles_fall_back_to_tracing():
+    rollup = get_health(graph(
+        [node('F', 'degradationFactor'), node('K1', 'degradationControl'), node('K2', 'degradationControl')],
+        [('F', 'K1'), ('K1', 'K2'), ('K2', 'K1'), ('K2', 'P1')],
+    ))
+    assert factors(rollup.barrier('P1')) == {'F': ({'K1'}, True)}
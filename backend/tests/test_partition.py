@@ -0,0 +1,71 @@
+import pytest
+
+from bowtie.graph import BowtieGraph
+from bowtie.partition import partition, partition_metrics, unassigned
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def combined():
+    nodes = []
+    edges = []
+    for i in (1, 2):
+        nodes += [
+            node(f'H{i}', 'hazard'), node(f'E{i}', 'topEvent'), node(f'T{i}', 'threat'), node(f'C{i}', 'consequence'),
+            node(f'P{i}', 'barrier', barrierType='prevention', failureProbability=0.5),
+            node(f'M{i}', 'barrier', barrierType='mitigation', failureProbability=0.5),
+            node(f'F{i}', 'degradationFactor'), node(f'K{i}', 'degradationControl'),
+        ]
+        edges += [(f'H{i}', f'E{i}'), (f'T{i}', f'P{i}'), (f'P{i}', f'E{i}'), (f'E{i}', f'M{i}'), (f'M{i}', f'C{i}')]
+    # F1 weakens a prevention barrier, F2 (through a control) a mitigation barrier
+    edges += [('F1', 'P1'), ('F2', 'K2'), ('K2', 'M2')]
+    # A threat shared by both bowties, and a node that belongs to neither
+    nodes += [node('TS', 'threat'), node('PS', 'barrier', barrierType='prevention'), node('X', 'threat')]
+    edges += [('TS', 'PS'), ('PS', 'E1'), ('PS', 'E2')]
+    # Unused control and factor; E1 -> E2 must not pull E2's side into E1's part
+    nodes += [node('K1', 'degradationControl')]
+    edges += [('E1', 'E2')]
+    return BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]})
+
+
+def ids(graph):
+    return {n['id'] for n in graph.nodes}
+
+
+def test_parts_per_top_event():
+    graph = combined()
+    first, second = partition(graph)
+    assert (first.top_event_id, second.top_event_id) == ('E1', 'E2')
+    assert ids(first.graph) == {'H1', 'E1', 'T1', 'P1', 'M1', 'C1', 'F1', 'TS', 'PS'}
+    assert ids(second.graph) == {'H2', 'E2', 'T2', 'P2', 'M2', 'C2', 'F2', 'K2', 'TS', 'PS'}
+    # Edges only join nodes of the same part
+    for part in (first, second):
+        assert all(e['source'] in part.graph and e['target'] in part.graph for e in part.graph.edges)
+    assert first.graph.version != second.graph.version
+    assert partition(graph) is partition(graph)
+
+
+def test_unassigned_nodes_are_reported():
+    assert set(unassigned(combined())) == {'X', 'K1'}
+
+
+def test_single_top_event_is_its_own_part():
+    graph = BowtieGraph.from_document({'nodes': [node('E', 'topEvent'), node('X', 'threat')], 'edges': []})
+    (part,) = partition(graph)
+    assert part.graph is graph
+    assert unassigned(graph) == ()
+
+
+def test_metrics_per_part():
+    metrics = {m.top_event_id: m for m in partition_metrics(combined(), 0.5)}
+    # T1 and TS each get through with 0.5; the top event is their noisy-OR
+    assert metrics['E1'].top_event_likelihood == pytest.approx(0.75)
+    assert metrics['E1'].consequence_likelihood == {'C1': pytest.approx(0.375)}
+    assert metrics['E2'].counts['degradationControl'] == 1
+    assert metrics['E1'].incomplete_chains == 0
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+from bowtie.graph import BowtieGraph
+from bowtie.loader import load_graph
+from bowtie.paths import get_path_index
+
+DEMO = Path(__file__).resolve().parent.parent / 'data' / 'demo_bowtie.json'
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def indexed_path(node_id, payload):
+    """What the editor's getIndexedPath does with the payload"""
+    own = payload['own'][node_id]
+    segments = list(own)
+    by_top = payload.get(payload['opposite'].get(node_id), {})
+    for segment in own:
+        for position in payload['segments'][segment]:
+            segments.extend(by_top.get(payload['ids'][position], ()))
+    return {node_id} | {payload['ids'][p] for s in segments for p in payload['segments'][s]}
+
+
+def check_payload(graph):
+    index = get_path_index(graph)
+    payload = index.to_payload()
+    for node_id in payload['own']:
+        assert indexed_path(node_id, payload) == set(index.path(node_id)), node_id
+
+
+def test_payload_reproduces_highlights():
+    check_payload(load_graph(DEMO))
+
+
+def test_payload_with_two_top_events():
+    nodes = [
+        node('T', 'threat'), node('E1', 'topEvent'), node('E2', 'topEvent'),
+        node('C1', 'consequence'), node('C2', 'consequence'),
+        node('P', 'barrier', barrierType='prevention'),
+        node('M1', 'barrier', barrierType='mitigation'), node('M2', 'barrier', barrierType='mitigation'),
+        node('F', 'degradationFactor'),
+    ]
+    edges = [('T', 'P'), ('P', 'E1'), ('P', 'E2'), ('E1', 'M1'), ('M1', 'C1'), ('E2', 'M2'), ('M2', 'C2'),
+             ('F', 'M2')]
+    graph = BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]})
+    check_payload(graph)
+    # The prevention barrier lights both top events' mitigation sides
+    assert {'M1', 'M2', 'C1', 'C2', 'F'} <= set(get_path_index(graph).path('P'))
+    assert 'T' in get_path_index(graph).path('M2')
@@ -0,0 +1,16 @@
+from bowtie.render import FragmentCache
+
+
+def test_fields_are_escaped():
+    cache = FragmentCache()
+    html = cache.render('<p title="{label}">{label}</p>', ('v', 'n'), {'label': '<img src=x onerror=alert(1)> & "q"'})
+    assert html == '<p title="&lt;img src=x onerror=alert(1)&gt; &amp; &quot;q&quot;">' \
+        '&lt;img src=x onerror=alert(1)&gt; &amp; &quot;q&quot;</p>'
+
+
+def test_rendered_once_per_key():
+    cache = FragmentCache(maxsize=1)
+    assert cache.render('{label}', 1, {'label': 'a'}) == 'a'
+    assert cache.render('{label}', 1, {'label': 'b'}) == 'a'
+    assert cache.render('{label}', 2, {'label': 'b'}) == 'b'
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'size': 1, 'maxsize': 1}
@@ -0,0 +1,66 @@
+import json
+
+from bowtie.report import REPORT_MANIFEST, generate_reports
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+DIAGRAM = {
+    'nodes': [
+        node('T', 'threat'), node('P', 'barrier', barrierType='prevention'), node('E', 'topEvent'),
+        node('M', 'barrier', barrierType='mitigation'), node('C', 'consequence'),
+    ],
+    'edges': [edge('T', 'P'), edge('P', 'E'), edge('E', 'M'), edge('M', 'C')],
+}
+
+
+def run(paths, output):
+    return {r.path: r for r in generate_reports(paths, output, workers=1)}
+
+
+def test_malformed_files_fail_alone(tmp_path):
+    source = tmp_path / 'diagrams'
+    source.mkdir()
+    good = source / 'good.json'
+    good.write_text(json.dumps(DIAGRAM))
+    for name, document in [('list.json', []), ('bad_node.json', {'nodes': [5], 'edges': []})]:
+        (source / name).write_text(json.dumps(document))
+    (source / 'broken.json').write_text('{"nodes": [')
+
+    output = tmp_path / 'reports'
+    results = run([source], output)
+    assert len(results) == 4
+    failed = {p for p, r in results.items() if r.error}
+    assert failed == {str(source / n) for n in ('list.json', 'bad_node.json', 'broken.json')}
+    assert (output / 'good.json.html').exists()
+
+    manifest = json.loads((output / REPORT_MANIFEST).read_text())
+    assert list(manifest) == [str(good.resolve())]
+
+    assert run([source], output)[str(good)].skipped
+
+
+def test_reports_keep_subdirectories_apart(tmp_path):
+    for sub in ('a', 'b'):
+        (tmp_path / sub).mkdir()
+        (tmp_path / sub / 'diagram.json').write_text(json.dumps(DIAGRAM))
+    output = tmp_path / 'reports'
+    results = run([tmp_path / 'a', tmp_path / 'b'], output)
+    assert not any(r.error for r in results.values())
+    assert (output / 'a' / 'diagram.json.html').exists()
+    assert (output / 'b' / 'diagram.json.html').exists()
+
+
+def test_unreadable_manifest_is_ignored(tmp_path):
+    (tmp_path / 'good.json').write_text(json.dumps(DIAGRAM))
+    output = tmp_path / 'reports'
+    output.mkdir()
+    (output / REPORT_MANIFEST).write_text('[]')
+    results = run([tmp_path / 'good.json'], output)
+    assert not any(r.error or r.skipped for r in results.values())
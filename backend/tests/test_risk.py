@@ -0,0 +1,49 @@
+import pytest
+
+from bowtie.graph import BowtieGraph
+from bowtie.risk import get_risk_model
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def bowtie(edges, probability=0.1):
+    nodes = [
+        node('T', 'threat'),
+        node('E', 'topEvent'),
+        node('C', 'consequence'),
+        node('P', 'barrier', barrierType='prevention', failureProbability=probability),
+        node('M', 'barrier', barrierType='mitigation', failureProbability=probability),
+    ]
+    return get_risk_model(BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]}))
+
+
+def test_guarded_paths():
+    result = bowtie([('T', 'P'), ('P', 'E'), ('E', 'M'), ('M', 'C')]).evaluate()
+    assert result.threat_likelihood[0, 0] == pytest.approx(0.1)
+    assert result.consequence_likelihood[0, 0] == pytest.approx(0.01)
+
+
+def test_direct_threat_edge_bypasses_prevention_barriers():
+    result = bowtie([('T', 'P'), ('P', 'E'), ('T', 'E'), ('E', 'M'), ('M', 'C')]).evaluate()
+    assert result.threat_likelihood[0, 0] == pytest.approx(1.0)
+    assert result.top_event_likelihood[0] == pytest.approx(1.0)
+    assert result.consequence_likelihood[0, 0] == pytest.approx(0.1)
+
+
+def test_direct_consequence_edge_bypasses_mitigation_barriers():
+    result = bowtie([('T', 'P'), ('P', 'E'), ('E', 'M'), ('M', 'C'), ('E', 'C')]).evaluate()
+    assert result.mitigation_failure[0, 0] == pytest.approx(1.0)
+    assert result.consequence_likelihood[0, 0] == pytest.approx(0.1)
+
+
+def test_row_failure_matches_bulk_evaluation_with_bypass():
+    model = bowtie([('T', 'P'), ('P', 'E'), ('T', 'E'), ('E', 'M'), ('M', 'C'), ('E', 'C')])
+    probabilities = model.default_probabilities()
+    assert model.kernel.prevention.row_failure(0, probabilities) == 1.0
+    assert model.kernel.mitigation.row_failure(0, probabilities) == 1.0
@@ -0,0 +1,42 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from bowtie.loader import load_graph
+from bowtie.search import INDEX_DIRECTORY, SearchIndex, _workspace_indexes, search_workspace
+from bowtie.workspace import Workspace
+
+DEMO = Path(__file__).resolve().parent.parent / 'data' / 'demo_bowtie.json'
+
+
+def test_workspace_search_uses_persisted_indexes(tmp_path):
+    shutil.copy(DEMO, tmp_path / 'demo.json')
+    workspace = Workspace(tmp_path)
+    expected = SearchIndex(load_graph(DEMO)).search('sensor', 10, diagram_id='demo.json')
+
+    assert search_workspace(workspace, 'sensor', 10) == expected
+    assert (tmp_path / INDEX_DIRECTORY / 'demo.json.json').exists()
+    _workspace_indexes.clear()
+    assert search_workspace(workspace, 'sensor', 10) == expected
+    # Neither search loaded the diagram into the workspace cache
+    assert workspace.cache.stats()['misses'] == 0
+
+
+def write_diagram(path, labels):
+    nodes = [{'id': f'n{i}', 'type': 'threat', 'position': {'x': 0, 'y': 0}, 'data': {'label': label}}
+             for i, label in enumerate(labels)]
+    path.write_text(json.dumps({'nodes': nodes, 'edges': []}))
+
+
+def test_workspace_scores_are_comparable_across_diagrams(tmp_path):
+    write_diagram(tmp_path / 'small.json', ['Pump failure'])
+    write_diagram(tmp_path / 'large.json', ['Pump failure'] + [f'Valve {i}' for i in range(50)])
+    hits = search_workspace(Workspace(tmp_path), 'pump', 10)
+    assert {hit.diagram_id for hit in hits} == {'small.json', 'large.json'}
+    assert hits[0].score == pytest.approx(hits[1].score)
+
+    # Alone, the larger diagram would rate the same term as rarer
+    alone = SearchIndex(load_graph(tmp_path / 'large.json')).search('pump')
+    assert alone[0].score > hits[0].score
@@ -0,0 +1,47 @@
+import math
+
+import numpy as np
+import pytest
+
+from bowtie.graph import BowtieGraph
+from bowtie.simulate import build_plan, simulate
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def degraded_graph():
+    nodes = [
+        node('T', 'threat'), node('E', 'topEvent'), node('C', 'consequence'),
+        node('P1', 'barrier', barrierType='prevention', failureProbability=0.2),
+        node('P2', 'barrier', barrierType='prevention', failureProbability=0.2),
+        node('M', 'barrier', barrierType='mitigation', failureProbability=0.5),
+        node('F', 'degradationFactor', likelihood=1.0, impact=0.5),
+        node('G', 'degradationFactor', likelihood=0.0),
+        node('K', 'degradationControl', effectiveness=0.5),
+    ]
+    edges = [('T', 'P1'), ('P1', 'P2'), ('P2', 'E'), ('E', 'M'), ('M', 'C'),
+             ('F', 'P1'), ('F', 'K'), ('K', 'P2'), ('G', 'M')]
+    return BowtieGraph.from_document({'nodes': nodes, 'edges': [edge(*e) for e in edges]})
+
+
+def test_plan_keeps_only_degraded_pairs():
+    graph = degraded_graph()
+    plan = build_plan(graph)
+    assert plan.pair_factor.size == 3
+    assert plan.degraded.size == 3
+    # F degrades P1 directly and P2 through a control that halves its impact
+    assert sorted(np.exp(plan.pair_log_survival)) == pytest.approx([0.5, 0.5, 0.75])
+
+
+def test_active_factor_raises_barrier_failure():
+    # F is always active: P1 fails with 1 - 0.8 * 0.5, P2 with 1 - 0.8 * 0.75
+    result = simulate(degraded_graph(), 40000, seed=1, workers=1, shard_size=10000)
+    expected = (1 - 0.8 * 0.5) * (1 - 0.8 * 0.75)
+    assert result.top_event.low <= expected <= result.top_event.high
+    assert math.isclose(result.top_event.mean, expected, rel_tol=0.05)
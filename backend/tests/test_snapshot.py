@@ -0,0 +1,71 @@
+import math
+
+import pytest
+
+from bowtie.graph import BowtieGraph
+from bowtie.loader import BowtieCache
+from bowtie.snapshot import export_snapshot, open_snapshot
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+DOCUMENT = {
+    'nodes': [
+        node('T', 'threat', likelihood=0.25, description='Wet road — ünïcode'),
+        node('P', 'barrier', barrierType='prevention', status='failed', failureProbability=0.1),
+        node('E', 'topEvent'),
+        node('M', 'barrier', barrierType='mitigation'),
+        node('C', 'consequence'),
+        node('H', 'hazard', label=''),
+    ],
+    'edges': [edge('T', 'P'), edge('P', 'E'), edge('E', 'M'), edge('M', 'C')],
+}
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    path = tmp_path / 'diagram.btsnap'
+    export_snapshot(DOCUMENT, path)
+    return path
+
+
+def test_round_trip(snapshot_path):
+    with open_snapshot(snapshot_path) as snapshot:
+        assert snapshot.type_counts()['barrier'] == 2
+        graph = snapshot.to_graph()
+    expected = BowtieGraph.from_document(DOCUMENT)
+    assert [n['id'] for n in graph.nodes] == [n['id'] for n in expected.nodes]
+    for original in DOCUMENT['nodes']:
+        loaded = graph.node(original['id'])
+        assert loaded['type'] == original['type']
+        assert dict(loaded['data']) == original['data']
+    assert [dict(e) for e in graph.edges] == DOCUMENT['edges']
+    assert graph.successors('E') == expected.successors('E')
+    assert math.isclose(graph.node('P')['data']['failureProbability'], 0.1)
+
+
+def test_cache_serves_snapshots(snapshot_path):
+    cache = BowtieCache()
+    graph = cache.load_graph(snapshot_path)
+    assert cache.load_graph(snapshot_path) is graph
+    assert len(cache.load(snapshot_path)['nodes']) == len(DOCUMENT['nodes'])
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda raw: b'',
+    lambda raw: raw[:20],
+    lambda raw: raw[:-9],
+    lambda raw: b'NOTSNAP!' + raw[8:],
+    lambda raw: raw[:-4] + b'\xff\xff\xff\xff',
+])
+def test_corrupt_snapshots_raise_value_error(snapshot_path, corrupt):
+    snapshot_path.write_bytes(corrupt(snapshot_path.read_bytes()))
+    with pytest.raises(ValueError):
+        with open_snapshot(snapshot_path) as snapshot:
+            snapshot.to_graph()
@@ -0,0 +1,76 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from bowtie.graph import BowtieGraph
+from bowtie.loader import BowtieCache
+from bowtie.risk import get_risk_model
+from bowtie.stream import DATA_FIELDS, iter_items, stream_graph
+
+DEMO = Path(__file__).resolve().parent.parent / 'data' / 'demo_bowtie.json'
+
+TRICKY = {
+    'title': {'nested': [1, {'nodes': ['not', 'these']}], 'text': 'braces } ] in a string'},
+    'nodes': [
+        {'id': 'T', 'type': 'threat', 'position': {'x': 1.5, 'y': -2}, 'expanded': True,
+         'data': {'label': 'Quote " backslash \\ brace }', 'description': 'Ünïcödé ✓  ', 'likelihood': 0.3}},
+        {'id': 'E', 'type': 'topEvent', 'data': {'label': 'Top', 'extra': {'deep': [1, 2]}}},
+        {'id': 'P', 'type': 'barrier', 'data': {'label': 'P', 'barrierType': 'prevention', 'failureProbability': 1e-3}},
+    ],
+    'meta': None,
+    'edges': [{'id': 'T-P', 'source': 'T', 'target': 'P', 'animated': False}, {'source': 'P', 'target': 'E'}],
+}
+
+
+def write(tmp_path, document, indent=None):
+    path = tmp_path / 'diagram.json'
+    path.write_text(json.dumps(document, indent=indent, ensure_ascii=False))
+    return path
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 1 << 16])
+@pytest.mark.parametrize('indent', [None, 2])
+def test_items_match_json_load(tmp_path, chunk_size, indent):
+    path = write(tmp_path, TRICKY, indent)
+    with open(path, 'r') as f:
+        items = list(iter_items(f, chunk_size=chunk_size))
+    assert [item for key, item in items if key == 'nodes'] == TRICKY['nodes']
+    assert [item for key, item in items if key == 'edges'] == TRICKY['edges']
+
+
+def equivalent(streamed, loaded):
+    assert [n['id'] for n in streamed.nodes] == [n['id'] for n in loaded.nodes]
+    for node in loaded.nodes:
+        kept = {k: v for k, v in (node.get('data') or {}).items() if k in DATA_FIELDS}
+        assert dict(streamed.node(node['id'])['data']) == kept
+        assert streamed.node_type(node['id']) == loaded.node_type(node['id'])
+        assert streamed.successors(node['id']) == loaded.successors(node['id'])
+        assert streamed.predecessors(node['id']) == loaded.predecessors(node['id'])
+    assert [dict(e) for e in streamed.edges] == [
+        {k: e[k] for k in ('id', 'source', 'target') if k in e} for e in loaded.edges
+    ]
+
+
+def test_stream_graph_matches_json_load(tmp_path):
+    path = write(tmp_path, TRICKY)
+    equivalent(stream_graph(path, chunk_size=5), BowtieGraph.from_document(TRICKY))
+
+
+def test_streamed_demo_scores_the_same():
+    with open(DEMO, 'r') as f:
+        loaded = BowtieGraph.from_document(json.load(f))
+    streamed = BowtieCache(streaming_threshold=0).load_graph(DEMO)
+    equivalent(streamed, loaded)
+    probabilities = get_risk_model(loaded).default_probabilities(0.2)
+    for got, expected in zip(get_risk_model(streamed).evaluate(probabilities),
+                             get_risk_model(loaded).evaluate(probabilities)):
+        assert got.ravel().tolist() == pytest.approx(expected.ravel().tolist())
+
+
+@pytest.mark.parametrize('text', ['[]', '{"nodes": [1, 2', '{"nodes": [] "edges": []}', ''])
+def test_malformed_input_raises_value_error(tmp_path, text):
+    path = tmp_path / 'bad.json'
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        stream_graph(path)
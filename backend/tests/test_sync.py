@@ -0,0 +1,79 @@
+import pytest
+
+from bowtie.graph import BowtieGraph
+from bowtie.sync import SyncError, SyncHub
+
+NODES = [
+    {'id': 'T', 'type': 'threat', 'position': {'x': 0, 'y': 0}, 'data': {'label': 'Threat'}},
+    {'id': 'E', 'type': 'topEvent', 'position': {'x': 1, 'y': 0}, 'data': {'label': 'Top event'}},
+]
+EDGES = [{'id': 'T-E', 'source': 'T', 'target': 'E'}]
+
+
+def test_unedited_diagram_falls_back_to_the_file():
+    hub = SyncHub(loader=lambda diagram_id: BowtieGraph(NODES, EDGES) if diagram_id == 'demo' else None)
+    hub.open('demo')
+    assert hub.graph('demo') is None
+
+    hub.state('demo').apply([{'op': 'node.update', 'id': 'T', 'data': {'label': 'Edited'}}])
+    assert hub.graph('demo').node('T')['data']['label'] == 'Edited'
+
+
+def test_unknown_diagram_is_not_created():
+    hub = SyncHub(loader=lambda diagram_id: None)
+    with pytest.raises(KeyError):
+        hub.open('missing')
+    assert hub.state('missing') is None
+
+
+def test_untouched_state_follows_a_changed_file():
+    hub = SyncHub()
+    first = hub.open('demo', BowtieGraph(NODES, EDGES))
+    changed = BowtieGraph(NODES[:1], [])
+    assert hub.open('demo', changed) is not first
+    assert len(hub.state('demo').document()['nodes']) == 1
+
+    hub.state('demo').apply([{'op': 'node.move', 'id': 'T', 'position': {'x': 5, 'y': 5}}])
+    edited = hub.state('demo')
+    assert hub.open('demo', BowtieGraph(NODES, EDGES)) is edited
+
+
+def test_snapshot_places_nodes_without_positions():
+    unplaced = [{key: value for key, value in node.items() if key != 'position'} for node in NODES]
+    hub = SyncHub()
+    hub.open('demo', BowtieGraph(unplaced, EDGES))
+    nodes = hub.state('demo').snapshot()['nodes']
+    assert all({'x', 'y'} <= set(node['position']) for node in nodes)
+    assert nodes[0]['position'] != nodes[1]['position']
+
+
+@pytest.mark.parametrize('op', [
+    {'op': 'node.update', 'id': 7, 'data': {'label': 'x'}},
+    {'op': 'node.add', 'node': {'id': 'N', 'data': None}},
+    {'op': 'node.add', 'node': {'id': 'N', 'position': {'x': 'left', 'y': 0}}},
+    {'op': 'edge.add', 'edge': {'source': ['T'], 'target': 'E'}},
+    {'op': 'edge.remove', 'id': {'T': 'E'}},
+    {'op': 'node.move', 'id': 'T', 'position': {'x': 1}},
+    {'op': 'reset', 'nodes': [{'id': 'T', 'data': []}], 'edges': []},
+])
+def test_malformed_batch_applies_nothing(op):
+    hub = SyncHub()
+    state = hub.open('demo', BowtieGraph(NODES, EDGES))
+    before = state.document()
+    batch = [{'op': 'edge.add', 'edge': {'id': 'E-T', 'source': 'E', 'target': 'T'}}, op]
+    with pytest.raises(SyncError):
+        state.apply(batch)
+    assert state.document() == before
+    assert state.revision == 0
+
+
+def test_tokens_expire():
+    hub = SyncHub()
+    live, expired = hub.issue_token(), hub.issue_token(ttl=-1)
+    assert hub.accepts(live)
+    assert not hub.accepts(expired)
+    assert not hub.accepts('not-a-token') and not hub.accepts('tökén') and not hub.accepts(None)
+    hub.issue_token()
+    assert expired not in hub._tokens
+    hub.revoke_token(live)
+    assert not hub.accepts(live)
@@ -0,0 +1,53 @@
+import json
+
+from bowtie.validate import validate_file, validate_paths
+
+
+def node(node_id, node_type, **data):
+    return {'id': node_id, 'type': node_type, 'position': {'x': 0, 'y': 0}, 'data': {'label': node_id, **data}}
+
+
+def edge(source, target):
+    return {'id': f'{source}-{target}', 'source': source, 'target': target}
+
+
+def write(tmp_path, name, document):
+    path = tmp_path / name
+    path.write_text(json.dumps(document))
+    return path
+
+
+def codes(report):
+    return [issue.code for issue in report.issues]
+
+
+def test_non_object_documents_are_schema_errors(tmp_path):
+    for name, document in [('list.json', []), ('string.json', 'x'), ('nodes.json', {'nodes': {}, 'edges': []})]:
+        _, report = validate_file(write(tmp_path, name, document))
+        assert codes(report) == ['schema']
+        assert not report.ok
+
+
+def test_null_data_is_reported_not_raised(tmp_path):
+    document = {
+        'nodes': [node('E', 'topEvent'), {'id': 'B', 'type': 'barrier', 'position': {'x': 0, 'y': 0}, 'data': None}],
+        'edges': [edge('B', 'E')],
+    }
+    _, report = validate_file(write(tmp_path, 'null.json', document))
+    assert 'schema' in codes(report)
+    assert 'barrier-type' in codes(report)
+
+
+def test_dangling_edge(tmp_path):
+    document = {'nodes': [node('T', 'threat'), node('E', 'topEvent')], 'edges': [edge('T', 'E'), edge('T', 'X')]}
+    _, report = validate_file(write(tmp_path, 'dangling.json', document))
+    dangling = [i for i in report.issues if i.code == 'dangling-edge']
+    assert dangling and dangling[0].node_ids == ('T-X',)
+
+
+def test_malformed_file_does_not_stop_the_batch(tmp_path):
+    write(tmp_path, 'a_bad.json', [])
+    good = write(tmp_path, 'b_good.json', {'nodes': [node('T', 'threat'), node('E', 'topEvent')], 'edges': [edge('T', 'E')]})
+    reports = validate_paths([tmp_path], workers=1)
+    assert len(reports) == 2
+    assert reports[str(good)].ok
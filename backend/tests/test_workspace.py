@@ -0,0 +1,24 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from bowtie.workspace import MANIFEST_NAME, Workspace
+
+DEMO = Path(__file__).resolve().parent.parent / 'data' / 'demo_bowtie.json'
+
+
+@pytest.mark.parametrize('manifest', [
+    '{"not": "a list"}',
+    '[{"diagram_id": "demo.json"}]',
+    '[{"diagram_id": "demo.json", "top_events": [], "unexpected": 1}]',
+    '["demo.json"]',
+    '[',
+])
+def test_malformed_manifest_is_rebuilt(tmp_path, manifest):
+    shutil.copy(DEMO, tmp_path / 'demo.json')
+    (tmp_path / MANIFEST_NAME).write_text(manifest)
+    entries = Workspace(tmp_path).entries()
+    assert [e.diagram_id for e in entries] == ['demo.json']
+    assert json.loads((tmp_path / MANIFEST_NAME).read_text())[0]['diagram_id'] == 'demo.json'
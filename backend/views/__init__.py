@@ -0,0 +1,36 @@
+"""Presentation pages, one module per sidebar entry.
+
+``app.py`` only imports the page being shown, so a cold start pays for the
+introduction's imports rather than the simulator's, the report's and the
+sync server's, and every rerun executes just that page's module code.
+"""
+
+import importlib
+
+# Sidebar label -> page module
+PAGES = {
+    "1️⃣ Introduction": "introduction",
+    "2️⃣ Why This App?": "why",
+    "3️⃣ The Story": "story",
+    "4️⃣ Interactive Demo": "demo",
+    "5️⃣ Scenario Simulator": "simulator",
+    "6️⃣ Compare Revisions": "compare",
+    "7️⃣ Barrier Health": "health",
+    "8️⃣ Barrier Criticality": "criticality",
+}
+
+
+def page_labels():
+    """Return the sidebar labels in order"""
+    return list(PAGES)
+
+
+def page_module(label):
+    """Import and return the module for a page label, matched on its number if the label changed"""
+    name = PAGES.get(label) or next((m for other, m in PAGES.items() if label and other[0] == label[0]), None)
+    return importlib.import_module(f".{name or 'introduction'}", __name__)
+
+
+def render(label):
+    """Render the page for a sidebar label"""
+    page_module(label).render()
@@ -0,0 +1,204 @@
+"""Shared state and helpers for the presentation pages: data loading, startup and formatting"""
+
+import os
+from functools import partial
+from pathlib import Path
+
+import streamlit as st
+
+from bowtie import profiling
+from bowtie.formatting import format_likelihood  # re-exported for the pages
+from bowtie.loader import load_bowtie, load_graph
+from bowtie.warmup import WarmUp
+from bowtie.workspace import get_workspace
+
+# Custom CSS - structural only, using Streamlit default colors
+STYLE = """
+<style>
+    /* Structural styles only - colors use Streamlit defaults */
+    .main-header {
+        font-size: 3rem;
+        font-weight: 800;
+        margin-bottom: 0.5rem;
+        text-align: center;
+    }
+    
+    .section-header {
+        font-size: 2rem;
+        font-weight: 700;
+        margin-top: 2rem;
+        margin-bottom: 1rem;
+        padding-bottom: 0.5rem;
+        border-bottom: 3px solid;
+    }
+    
+    .narrative-box {
+        padding: 2rem;
+        border-radius: 15px;
+        border-left: 5px solid;
+        margin: 1.5rem 0;
+        box-shadow: 0 4px 6px rgba(0, 0, 0, 0.1);
+    }
+    
+    .problem-box {
+        padding: 1.5rem;
+        border-radius: 10px;
+        border-left: 5px solid;
+        margin: 1rem 0;
+    }
+    
+    .solution-box {
+        padding: 1.5rem;
+        border-radius: 10px;
+        border-left: 5px solid;
+        margin: 1rem 0;
+    }
+    
+    .story-highlight {
+        padding: 1rem;
+        border-radius: 10px;
+        margin: 1rem 0;
+        font-weight: 600;
+    }
+    
+    .stTabs [data-baseweb="tab-list"] {
+        gap: 2rem;
+        padding: 0.5rem;
+        border-radius: 10px;
+    }
+    
+    .stTabs [data-baseweb="tab"] {
+        padding: 0.75rem 1.5rem;
+        font-weight: 600;
+    }
+    
+    .metric-card {
+        padding: 1.5rem;
+        border-radius: 10px;
+        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        text-align: center;
+    }
+</style>
+"""
+
+DEMO_PATH = Path(__file__).parent.parent / "data" / "demo_bowtie.json"
+# Directory of diagrams to present instead of the single demo file
+WORKSPACE_DIR = os.environ.get("BOWTIE_WORKSPACE")
+# Port of the live sync server the React editor streams its edits to; off unless set
+SYNC_PORT = int(os.environ.get("BOWTIE_SYNC_PORT") or 0)
+# Comma-separated origins the editor may connect to it from
+# (unset: bowtie.sync.DEFAULT_ORIGINS, the Vite dev server)
+SYNC_ORIGINS = tuple(filter(None, os.environ.get("BOWTIE_SYNC_ORIGINS", "").split(",")))
+# Workspace diagrams warmed up at startup (the first is the one shown by default)
+WARM_WORKSPACE_DIAGRAMS = 1
+
+def load_demo_data():
+    """Load the demo bowtie data (cached across reruns and sessions, read-only)"""
+    if DEMO_PATH.exists():
+        return load_bowtie(DEMO_PATH)
+    return None
+
+def load_demo_graph():
+    """Load the indexed demo bowtie graph (built once per file version)"""
+    if DEMO_PATH.exists():
+        return load_graph(DEMO_PATH)
+    return None
+
+def get_active_workspace():
+    """Return the workspace named by BOWTIE_WORKSPACE, or None in single-diagram mode"""
+    if WORKSPACE_DIR and Path(WORKSPACE_DIR).is_dir():
+        return get_workspace(WORKSPACE_DIR)
+    return None
+
+@st.cache_resource(show_spinner=False)
+def get_sync_hub():
+    """Start the live sync server once per process; None when it is off or the port is taken"""
+    if not SYNC_PORT:
+        return None
+    # Imported here: the sync server (and websockets) only load when syncing is on
+    from bowtie import sync
+    
+    try:
+        return sync.start_background(SYNC_PORT, origins=SYNC_ORIGINS or sync.DEFAULT_ORIGINS, loader=load_sync_seed)
+    except OSError:
+        return None
+
+def warmup_sources():
+    """Yield the diagrams to warm up at startup as (diagram id, loader) pairs"""
+    workspace = get_active_workspace()
+    if workspace:
+        for entry in workspace.entries()[:WARM_WORKSPACE_DIAGRAMS]:
+            yield entry.diagram_id, partial(workspace.load_graph, entry.diagram_id)
+    elif DEMO_PATH.exists():
+        yield "demo", load_demo_graph
+
+@st.cache_resource(show_spinner=False)
+def get_warmup():
+    """Startup phase: load and index the diagrams once per process, on a background thread"""
+    return WarmUp(warmup_sources()).start()
+
+def active_diagram_id():
+    """Return the id of the diagram being presented ("demo" outside a workspace), or None"""
+    workspace = get_active_workspace()
+    if workspace:
+        diagram_id = st.session_state.get('diagram')
+        return diagram_id if diagram_id and workspace.entry(diagram_id) else None
+    return "demo"
+
+def load_file_graph(diagram_id):
+    """Load a diagram as saved on disk, ignoring live edits"""
+    workspace = get_active_workspace()
+    if workspace:
+        return workspace.load_graph(diagram_id)
+    return load_demo_graph()
+
+def load_sync_seed(diagram_id):
+    """Load the diagram on disk a sync channel starts from; None for ids this app doesn't serve"""
+    workspace = get_active_workspace()
+    if workspace:
+        return workspace.load_graph(diagram_id) if workspace.entry(diagram_id) else None
+    return load_demo_graph() if diagram_id == "demo" else None
+
+def load_active_graph():
+    """Load the graph being presented: live editor edits if any, else the diagram on disk"""
+    with profiling.span("load"):
+        diagram_id = active_diagram_id()
+        if diagram_id is None:
+            return None
+        hub = get_sync_hub()
+        synced = hub.graph(diagram_id) if hub else None
+        if synced is not None:
+            return synced
+        return load_file_graph(diagram_id)
+
+def get_narrative_data(graph):
+    """Extract narrative information from an indexed bowtie graph"""
+    if not graph:
+        return None
+    
+    profiling.count("narrative")
+    return {
+        'hazard': graph.first('hazard'),
+        'top_event': graph.first('topEvent'),
+        'threats': graph.nodes_of_type('threat'),
+        'prevention_barriers': graph.barriers('prevention'),
+        'mitigation_barriers': graph.barriers('mitigation'),
+        'consequences': graph.nodes_of_type('consequence'),
+        'degradation_factors': graph.nodes_of_type('degradationFactor'),
+        'degradation_controls': graph.nodes_of_type('degradationControl'),
+        'nodes': graph.nodes,
+        'edges': graph.edges,
+        'graph': graph
+    }
+
+def node_label(node, default):
+    """Return a node's display label"""
+    return (node.get('data') or {}).get('label', default)
+
+def describe_factor(graph, factor):
+    """One line naming a degradation factor and the controls covering it"""
+    label = node_label(graph.node(factor.factor_id), factor.factor_id)
+    if not factor.covered:
+        return f"⚠️ {label} (uncovered)"
+    controls = ", ".join(node_label(graph.node(c), c) for c in factor.control_ids)
+    return f"{label}, controlled by {controls}"
@@ -0,0 +1,122 @@
+"""Compare Revisions page: structural diff of two versions of a diagram"""
+
+import json
+
+import streamlit as st
+
+from bowtie.diff import diff_graphs
+from bowtie.graph import BowtieGraph
+
+from .common import get_active_workspace, load_demo_graph, node_label
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def graph_from_upload(content):
+    """Parse an uploaded diagram once per distinct file content"""
+    return BowtieGraph.from_document(json.loads(content))
+
+def select_revision(side, key):
+    """Pick one side of a comparison: the demo, a workspace diagram or an upload"""
+    workspace = get_active_workspace()
+    choices = ["Demo diagram"]
+    if workspace:
+        choices += [entry.diagram_id for entry in workspace.entries()]
+    choices.append("Upload a file...")
+    choice = st.selectbox(f"{side} revision", choices, key=key)
+    if choice == "Demo diagram":
+        return load_demo_graph()
+    if choice == "Upload a file...":
+        upload = st.file_uploader(f"{side} diagram (JSON)", type=["json"], key=f"{key}_upload")
+        if upload is None:
+            return None
+        try:
+            return graph_from_upload(upload.getvalue())
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            # Bad encoding or JSON (ValueError) or JSON that isn't a diagram document
+            st.error(f"Could not parse {upload.name}: {type(e).__name__}: {e}")
+            return None
+    return workspace.load_graph(choice)
+
+def render():
+    st.markdown('<div class="section-header">🔀 Compare Revisions</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <p style="font-size: 1.1rem; line-height: 1.8;">
+    Compare two versions of a bowtie. Nodes are matched by id, then by label, so renamed nodes are 
+    recognized. The comparison lists added, removed and changed barriers, status flips, re-routed 
+    connections and how each threat's and consequence's barrier chain changed.
+    </p>
+    """, unsafe_allow_html=True)
+    
+    rev_col1, rev_col2 = st.columns(2)
+    with rev_col1:
+        old_graph = select_revision("Old", 'diff_old')
+    with rev_col2:
+        new_graph = select_revision("New", 'diff_new')
+    
+    if old_graph and new_graph:
+        diff = diff_graphs(old_graph, new_graph)
+        
+        if diff.is_empty:
+            st.success("The two revisions are identical.")
+        else:
+            metric_cols = st.columns(5)
+            metric_cols[0].metric("Added Nodes", len(diff.added))
+            metric_cols[1].metric("Removed Nodes", len(diff.removed))
+            metric_cols[2].metric("Changed Nodes", len(diff.changed))
+            metric_cols[3].metric("Status Flips", len(diff.status_flips))
+            metric_cols[4].metric("Edge Changes", len(diff.edges_added) + len(diff.edges_removed) + len(diff.edges_rerouted))
+            
+            if diff.chain_lengths:
+                st.markdown("#### ⛓️ Barrier Chain Lengths")
+                st.dataframe([
+                    {
+                        "Type": change.kind.title(),
+                        "Name": change.label,
+                        "Before": "—" if change.old_length is None else change.old_length,
+                        "After": "—" if change.new_length is None else change.new_length,
+                    }
+                    for change in diff.chain_lengths
+                ], width="stretch", hide_index=True)
+            
+            if diff.status_flips:
+                st.markdown("#### 🔁 Status Flips")
+                for node_id, old_status, new_status in diff.status_flips:
+                    st.markdown(f"- **{node_label(new_graph.node(node_id), node_id)}**: {old_status} → {new_status}")
+            
+            if diff.added or diff.removed:
+                st.markdown("#### ➕➖ Added and Removed Nodes")
+                st.dataframe(
+                    [{"Change": "Added", "Type": n.get('type'), "Id": n.get('id'), "Label": node_label(n, '')} for n in diff.added]
+                    + [{"Change": "Removed", "Type": n.get('type'), "Id": n.get('id'), "Label": node_label(n, '')} for n in diff.removed],
+                    width="stretch", hide_index=True
+                )
+            
+            if diff.changed:
+                st.markdown("#### ✏️ Changed Nodes")
+                st.dataframe([
+                    {
+                        "Id": change.node_id,
+                        "Type": change.node_type,
+                        "Field": field,
+                        "Before": str(before),
+                        "After": str(after),
+                    }
+                    for change in diff.changed
+                    for field, (before, after) in change.fields.items()
+                ], width="stretch", hide_index=True)
+            
+            if diff.matched_by_label:
+                with st.expander(f"{len(diff.matched_by_label)} nodes matched by label"):
+                    for old_id, new_id, similarity in diff.matched_by_label:
+                        st.markdown(f"- `{old_id}` → `{new_id}` ({similarity:.0%} label similarity)")
+            
+            if diff.edges_added or diff.edges_removed or diff.edges_rerouted:
+                st.markdown("#### 🔗 Connections")
+                for source, target in diff.edges_added:
+                    st.markdown(f"- ➕ `{source}` → `{target}`")
+                for source, target in diff.edges_removed:
+                    st.markdown(f"- ➖ `{source}` → `{target}`")
+                for edge_id, (old_source, old_target), (new_source, new_target) in diff.edges_rerouted:
+                    st.markdown(f"- 🔀 `{edge_id}`: `{old_source}` → `{old_target}` is now `{new_source}` → `{new_target}`")
+    else:
+        st.info("Choose both revisions to compare.")
@@ -0,0 +1,69 @@
+"""Barrier Criticality page: barriers and barrier pairs ranked by the exposure their failure adds"""
+
+import streamlit as st
+
+from bowtie.criticality import get_criticality
+
+from .common import format_likelihood, load_active_graph, node_label
+
+def render():
+    st.markdown('<div class="section-header">🎯 Barrier Criticality</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <p style="font-size: 1.1rem; line-height: 1.8;">
+    Which barriers matter most? Each barrier, and each pair of barriers, is forced to fail in turn and the 
+    <strong>exposure</strong> (the expected number of consequences) is recomputed. Barriers are ranked by how 
+    much their failure adds. For pairs, <strong>interaction</strong> is what failing both adds beyond the two 
+    single failures, e.g. two barriers guarding the same path.
+    </p>
+    """, unsafe_allow_html=True)
+    
+    criticality_graph = load_active_graph()
+    if criticality_graph:
+        crit_col1, crit_col2, crit_col3 = st.columns(3)
+        with crit_col1:
+            normal_probability = st.slider("Failure probability of normal barriers", 0.0, 1.0, 0.1, 0.01,
+                                           key='criticality_probability')
+        with crit_col2:
+            include_pairs = st.checkbox("Rank barrier pairs", value=True, key='criticality_pairs')
+        with crit_col3:
+            limit = st.number_input("Rows", 10, 1000, 25, 5, key='criticality_limit')
+        
+        with st.spinner("Ranking barriers..."):
+            report = get_criticality(criticality_graph, normal_probability, include_pairs, int(limit))
+        
+        metric_cols = st.columns(3)
+        metric_cols[0].metric("Top Event", format_likelihood(report.baseline_top_event))
+        metric_cols[1].metric("Exposure", f"{report.baseline_exposure:.3g}",
+                              help="Expected number of consequences with every barrier as it is")
+        metric_cols[2].metric("Barriers", len(report.singles))
+        
+        st.markdown("#### 🛡️ Most Critical Barriers")
+        st.dataframe([
+            {
+                "Barrier": node_label(criticality_graph.node(c.barrier_ids[0]), c.barrier_ids[0]),
+                "Side": ((criticality_graph.node(c.barrier_ids[0]).get('data') or {}).get('barrierType') or "—").title(),
+                "Exposure if failed": f"{c.exposure:.3g}",
+                "Increase": f"+{c.increase:.3g}",
+                "Top event if failed": format_likelihood(c.top_event_likelihood),
+            }
+            for c in report.singles[:int(limit)]
+        ], hide_index=True, width="stretch")
+        
+        if report.pairs:
+            st.markdown("#### 🔗 Most Critical Barrier Pairs")
+            st.dataframe([
+                {
+                    "Barriers": " + ".join(node_label(criticality_graph.node(b), b) for b in c.barrier_ids),
+                    "Exposure if both fail": f"{c.exposure:.3g}",
+                    "Increase": f"+{c.increase:.3g}",
+                    "Interaction": f"{c.interaction:+.3g}",
+                    "Top event if both fail": format_likelihood(c.top_event_likelihood),
+                }
+                for c in report.pairs
+            ], hide_index=True, width="stretch")
+        
+        st.caption(f"{len(report.singles):,} barriers and {report.pairs_evaluated:,} pairs ranked in "
+                   f"{report.elapsed:.2f}s on {report.workers} process(es).")
+    else:
+        st.error("Could not load demo data. Please ensure demo_bowtie.json exists in the data folder.")
@@ -0,0 +1,270 @@
+"""Interactive Demo page: the embedded React editor, live sync and the barrier what-if panel"""
+
+import json
+from urllib.parse import quote
+
+import streamlit as st
+
+from bowtie.incremental import WhatIfSession
+from bowtie.layout import laid_out_document
+from bowtie.risk import get_risk_model
+
+from .common import (
+    SYNC_PORT, active_diagram_id, format_likelihood, get_sync_hub, load_active_graph, load_file_graph, node_label,
+)
+
+def laid_out_json(graph):
+    """Serialize a graph with computed layout positions (once per graph version)"""
+    return graph.cached('layout_json', lambda g: json.dumps(laid_out_document(g), indent=2))
+
+def sync_token(hub):
+    """Return this browser session's token for the sync server, replacing it once it expires"""
+    if not hub.accepts(st.session_state.get('sync_token')):
+        st.session_state.sync_token = hub.issue_token()
+    return st.session_state.sync_token
+
+def sync_url(hub):
+    """Open the active diagram for live sync and return the editor's websocket URL"""
+    diagram_id = active_diagram_id()
+    if hub is None or diagram_id is None:
+        return None
+    file_graph = load_file_graph(diagram_id)
+    if file_graph is None:
+        return None
+    # Seeds the channel, or reseeds it if the file changed before anyone edited it
+    hub.open(diagram_id, file_graph)
+    return f"ws://localhost:{SYNC_PORT}/sync/{quote(diagram_id, safe='')}?token={sync_token(hub)}"
+
+@st.fragment(run_every=2)
+def sync_status(hub):
+    """Live edit revision and viewer count, refreshed on its own every few seconds"""
+    diagram_id = active_diagram_id()
+    state = hub.state(diagram_id) if diagram_id else None
+    if state is None:
+        return
+    st.caption(f"🔄 Live sync: revision {state.revision} · {hub.viewers(diagram_id)} connected")
+
+@st.fragment
+def react_embed():
+    """Editor iframe and controls; editing the URL reruns only this fragment"""
+    react_app_url = st.text_input(
+        "React App URL",
+        value="http://localhost:5173",
+        help="Enter the URL where your React Flow app is running (default: http://localhost:5173)"
+    )
+    hub = get_sync_hub()
+    editor_sync_url = sync_url(hub)
+    
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        if react_app_url:
+            try:
+                # The editor streams its edits back to the presentation over this channel
+                separator = "&" if "?" in react_app_url else "?"
+                st.components.v1.iframe(
+                    f"{react_app_url}{separator}sync={quote(editor_sync_url, safe='')}" if editor_sync_url else react_app_url,
+                    height=800,
+                    scrolling=True
+                )
+            except Exception as e:
+                st.warning(f"Could not load React app: {str(e)}")
+                st.info("""
+                **To run the demo:**
+                1. Make sure the React app is running (`npm run dev` in the frontend folder)
+                2. The app should be available at http://localhost:5173 (or your configured port)
+                3. Enter the correct URL above
+                """)
+    
+    with col2:
+        st.markdown("""
+        ### 🎛️ Controls
+        
+        **Status:**  
+        {status}
+        
+        **Features:**
+        - ✅ Focus Mode
+        - ✅ Expand/Collapse
+        - ✅ Barrier Toggle
+        - ✅ Path Highlighting
+        - ✅ Degradation Views
+        
+        **Tips:**
+        - Use mouse wheel to zoom
+        - Drag to pan
+        - Click nodes for details
+        """.format(status="🟢 Running" if react_app_url else "🔴 Not Connected"))
+        
+        if editor_sync_url:
+            sync_status(hub)
+        elif SYNC_PORT and hub is None:
+            st.caption(f"Live sync is unavailable: port {SYNC_PORT} is in use")
+        elif not SYNC_PORT:
+            st.caption("Live sync is off; set BOWTIE_SYNC_PORT to stream editor changes here")
+        
+        # Pre-laid-out copy of the diagram, so the editor can skip its own layout pass
+        layout_graph = load_active_graph()
+        if layout_graph:
+            st.download_button(
+                "⬇️ Download laid-out diagram",
+                data=laid_out_json(layout_graph),
+                file_name="bowtie_layout.json",
+                mime="application/json",
+                help="The diagram with server-computed bowtie positions, ready to open in the editor"
+            )
+
+@st.fragment
+def whatif_panel(demo_graph):
+    """Barrier what-if controls and metrics, rerun on their own as barriers are toggled"""
+    if demo_graph:
+        risk_model = get_risk_model(demo_graph)
+        st.markdown("""
+        Fail barriers below to see how the likelihood of reaching the top event and each consequence 
+        changes. Barriers left as *normal* fail with the chosen probability.
+        """)
+        
+        whatif_col1, whatif_col2 = st.columns([2, 1])
+        with whatif_col1:
+            failed_barriers = st.multiselect(
+                "Failed barriers",
+                risk_model.barrier_ids,
+                format_func=lambda b: node_label(demo_graph.node(b), b),
+                key='whatif_failed'
+            )
+        with whatif_col2:
+            normal_probability = st.slider(
+                "Failure probability of normal barriers",
+                0.0, 1.0, 0.1, 0.01,
+                key='whatif_probability'
+            )
+        
+        # Each session keeps only its barrier overrides on top of a baseline
+        # shared by every viewer; toggling a barrier only re-evaluates the
+        # chains that contain it
+        session = st.session_state.get('whatif_session')
+        if (session is None or session.graph is not demo_graph
+                or session.default_probability != normal_probability):
+            session = WhatIfSession(demo_graph, normal_probability)
+            st.session_state.whatif_session = session
+        session.apply_failed(failed_barriers)
+        
+        consequence_likelihoods = session.consequence_likelihoods()
+        metric_cols = st.columns(1 + len(consequence_likelihoods))
+        with metric_cols[0]:
+            st.metric("Top Event", format_likelihood(session.top_event_likelihood))
+        for i, (consequence_id, likelihood) in enumerate(consequence_likelihoods.items()):
+            with metric_cols[i + 1]:
+                st.metric(
+                    node_label(demo_graph.node(consequence_id), consequence_id),
+                    format_likelihood(likelihood)
+                )
+        st.caption(f"Re-evaluated {session.last_recomputed} of "
+                   f"{len(risk_model.threat_ids) + len(risk_model.consequence_ids)} chains for this change")
+
+def render():
+    st.markdown('<div class="section-header">🎮 Interactive Demo</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="narrative-box">
+        <h3 style="margin-top: 0;">Explore the Interactive Bowtie Diagram</h3>
+        <p style="font-size: 1.1rem; line-height: 1.8;">
+        This is where the magic happens! Interact with the bowtie diagram below to see how our features 
+        make risk scenarios more interpretable and story-like.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("### 🎯 How to Use")
+    
+    instruction_col1, instruction_col2 = st.columns(2)
+    
+    with instruction_col1:
+        st.markdown("""
+        #### Interactive Features:
+        
+        1. **🎯 Focus Mode**: Toggle focus mode in the toolbar
+           - Hover over any node to highlight its complete path
+           - Other paths will dim automatically
+        
+        2. **📖 Expand/Collapse**: Click on threats or consequences
+           - Expand to see related barriers
+           - Collapse to simplify the view
+        
+        3. **🎨 Barrier Status**: Click on barriers
+           - Toggle between normal and failed states
+           - See how barrier failure affects the risk path
+        
+        4. **🔍 Explore Details**: Hover over nodes
+           - See descriptions and details
+           - Understand relationships
+        """)
+    
+    with instruction_col2:
+        st.markdown("""
+        #### Try These:
+        
+        ✅ **Hover over "Intoxicated driving"**  
+           → See the complete prevention path
+        
+        ✅ **Toggle Focus Mode**  
+           → Watch other paths dim as you explore
+        
+        ✅ **Expand "Crash into a fixed object"**  
+           → View all mitigation barriers
+        
+        ✅ **Click a barrier** to toggle its status  
+           → See visual feedback for barrier failure
+        
+        ✅ **Follow degradation factors**  
+           → Understand how barriers can weaken
+        """)
+    
+    st.divider()
+    
+    # React App Embedding
+    st.markdown("### 🖥️ Interactive Diagram")
+    
+    react_embed()
+    
+    st.divider()
+    
+    # Barrier what-if analysis backed by the risk engine
+    st.markdown("### 🎲 Barrier Status What-If")
+    
+    whatif_panel(load_active_graph())
+    
+    st.divider()
+    
+    # Lessons Learned Section
+    st.markdown('<div class="section-header">📚 Lessons Learned</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="narrative-box">
+            <h4 style="margin-top: 0;">🚀 What Will We Improve to Make This Ready?</h4>
+            <ul style="line-height: 1.8;">
+                <li><strong>Performance optimization</strong> for large diagrams with 100+ nodes</li>
+                <li><strong>Export functionality</strong> to generate PDF reports with selected paths</li>
+                <li><strong>User authentication</strong> and multi-user collaboration features</li>
+                <li><strong>Data validation</strong> and error handling for edge cases</li>
+                <li><strong>Mobile responsiveness</strong> for tablet and phone viewing</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="narrative-box">
+            <h4 style="margin-top: 0;">💡 What Did We Learn About Communicating Risk?</h4>
+            <ul style="line-height: 1.8;">
+                <li><strong>Visual focus</strong> is critical - highlighting paths reduces cognitive load</li>
+                <li><strong>Narrative structure</strong> makes complex scenarios memorable and understandable</li>
+                <li><strong>Interactive exploration</strong> engages users more than static diagrams</li>
+                <li><strong>Progressive disclosure</strong> (expand/collapse) helps manage information density</li>
+                <li><strong>Context matters</strong> - showing relationships dynamically improves comprehension</li>
+            </ul>
+        </div>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,84 @@
+"""Barrier Health page: barriers and chains ranked by degradation"""
+
+import streamlit as st
+
+from bowtie.health import get_health
+
+from .common import describe_factor, load_active_graph, node_label
+
+def render():
+    st.markdown('<div class="section-header">🩺 Barrier Health</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <p style="font-size: 1.1rem; line-height: 1.8;">
+    Every barrier is traced to the degradation factors that weaken it and the controls that keep each 
+    factor in check. A factor with no control in between is <strong>uncovered</strong>. Health starts at 
+    100%, drops to 90% for each covered factor and to half for each uncovered one; failed barriers score 0%. 
+    Chain health adds up the barriers on a threat's or consequence's path.
+    </p>
+    """, unsafe_allow_html=True)
+    
+    health_graph = load_active_graph()
+    if health_graph:
+        health = get_health(health_graph)
+        summary = health.summary()
+        
+        metric_cols = st.columns(5)
+        metric_cols[0].metric("Barriers", summary['barriers'])
+        metric_cols[1].metric("Degraded", summary['degraded'])
+        metric_cols[2].metric("Failed", summary['failed'])
+        metric_cols[3].metric("Uncovered Factors", f"{summary['uncovered_factors']} of {summary['factors']}")
+        metric_cols[4].metric("Mean Health", f"{summary['mean_health']:.0%}")
+        
+        filter_col1, filter_col2, filter_col3 = st.columns(3)
+        with filter_col1:
+            side = st.selectbox("Side", ["All barriers", "Prevention", "Mitigation"], key='health_side')
+        with filter_col2:
+            degraded_only = st.checkbox("Only failed or degraded barriers", value=True, key='health_degraded')
+        with filter_col3:
+            limit = st.number_input("Rows", 10, 1000, 50, 10, key='health_limit')
+        
+        ranked = health.weakest_barriers(degraded_only=degraded_only)
+        if side != "All barriers":
+            ranked = [h for h in ranked if h.barrier_type == side.lower()]
+        
+        st.markdown("#### 🛡️ Weakest Barriers")
+        if ranked:
+            st.dataframe([
+                {
+                    "Barrier": node_label(health_graph.node(h.barrier_id), h.barrier_id),
+                    "Side": (h.barrier_type or "—").title(),
+                    "Health": f"{h.health:.0%}",
+                    "Status": "Failed" if h.failed else "Normal",
+                    "Degradation factors": "; ".join(describe_factor(health_graph, f) for f in h.factors) or "—",
+                }
+                for h in ranked[:int(limit)]
+            ], hide_index=True, width="stretch")
+            if len(ranked) > limit:
+                st.caption(f"Showing the weakest {int(limit)} of {len(ranked)} barriers.")
+        else:
+            st.success("No barrier is failed or degraded.")
+        
+        st.markdown("#### ⛓️ Weakest Chains")
+        st.dataframe([
+            {
+                "Chain": node_label(health_graph.node(c.source_id), c.source_id),
+                "Side": c.side.title(),
+                "Effective barriers": round(c.effective_barriers, 2),
+                "Barriers": len(c.barrier_ids),
+                "Weakest barrier": node_label(health_graph.node(c.weakest_barrier_id), c.weakest_barrier_id)
+                if c.weakest_barrier_id else "—",
+                "Uncovered factors": c.uncovered_factors,
+            }
+            for c in health.weakest_chains(int(limit))
+        ], hide_index=True, width="stretch")
+        
+        uncovered = health.uncovered_factors()
+        if uncovered:
+            st.markdown("#### ⚠️ Uncovered Degradation Factors")
+            for factor_id, barrier_ids in uncovered.items():
+                barriers = ", ".join(node_label(health_graph.node(b), b) for b in barrier_ids)
+                st.markdown(f"- **{node_label(health_graph.node(factor_id), factor_id)}** weakens {barriers} "
+                            f"with no control in place")
+    else:
+        st.error("Could not load demo data. Please ensure demo_bowtie.json exists in the data folder.")
@@ -0,0 +1,57 @@
+"""Introduction page: what a bowtie diagram is and what is wrong with static ones"""
+
+import streamlit as st
+
+def render():
+    st.markdown('<div class="main-header">🎯 Interactive Bowtie Risk Visualization</div>', unsafe_allow_html=True)
+    st.markdown('<div style="text-align: center; font-size: 1.2rem; margin-bottom: 3rem;">Making Risk Analysis More Interpretable and Story-Like</div>', unsafe_allow_html=True)
+    
+    st.markdown('<div class="section-header">What is a Bowtie Diagram?</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    **Bowtie diagrams** visualize how threats lead to hazards and consequences, with barriers preventing 
+    or mitigating risks. Their distinctive shape shows threats converging on a central event, with 
+    consequences diverging from it.
+    
+    ### 🎯 Key Components
+    
+    - **Left Side**: Threats → Prevention Barriers → Top Event
+    - **Right Side**: Top Event → Mitigation Barriers → Consequences
+    - **Degradation**: Factors that weaken barriers, and controls to prevent degradation
+    
+    **Used in**: Aviation, Oil & Gas, Healthcare, Transportation, Industrial Safety
+    """)
+    
+    st.markdown('<div class="section-header">⚠️ Current Problems</div>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("""
+        <div class="problem-box">
+            <h4>🔴 Static & Overwhelming</h4>
+            <p>Traditional diagrams are static PDFs/images with all information visible at once, making them hard to navigate</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("""
+        <div class="problem-box">
+            <h4>🔴 Lack of Context</h4>
+            <p>Missing narrative flow makes it difficult to understand relationships and scenarios</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown("""
+        <div class="problem-box">
+            <h4>🔴 Poor Interpretation</h4>
+            <p>Non-experts struggle to understand complex risk scenarios</p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.markdown("""
+        <div class="problem-box">
+            <h4>🔴 Passive Viewing</h4>
+            <p>No interaction or exploration discourages active learning</p>
+        </div>
+        """, unsafe_allow_html=True)
@@ -0,0 +1,200 @@
+"""Sidebar: page navigation, node search, diagram statistics, startup status and the developer panel"""
+
+import streamlit as st
+
+from bowtie import profiling
+from bowtie.loader import cache_stats
+from bowtie.render import fragment_stats
+
+from . import page_labels
+from .common import get_active_workspace, get_narrative_data, load_active_graph
+
+SEARCH_RESULTS = 8
+NODE_ICONS = {
+    'hazard': '⚠️',
+    'topEvent': '🎯',
+    'threat': '⚡',
+    'barrier': '🛡️',
+    'consequence': '💥',
+    'degradationFactor': '📉',
+    'degradationControl': '🔧',
+}
+
+def jump_to_hit(diagram_id, node_id):
+    """Open the Story page on the threat/consequence that shows a search hit"""
+    # Imported on first use, like the pages, to keep them out of the cold start
+    from bowtie.partition import partition
+    from bowtie.search import anchor
+    
+    if diagram_id:
+        st.session_state.diagram = diagram_id
+    st.session_state.nav_page = "3️⃣ The Story"
+    graph = load_active_graph()
+    target = anchor(graph, node_id) if graph else None
+    if target:
+        kind, source_id = target
+        # Combined diagrams: open the sub-bowtie (top event) the hit belongs to
+        parts = partition(graph)
+        part_index = next((i for i, part in enumerate(parts) if source_id in part.graph), 0)
+        st.session_state.story_top_event = part_index
+        entries = parts[part_index].graph.nodes_of_type(kind)
+        index = next((i for i, n in enumerate(entries) if n.get('id') == source_id), None)
+        if index is None:
+            # The diagram changed since the hit was indexed
+            st.session_state.search_jump_warning = f"Couldn't find that {kind} in the diagram any more."
+        else:
+            st.session_state['story_threat' if kind == 'threat' else 'story_consequence'] = index
+    # Picked up by sidebar_search, which then reruns the whole app
+    st.session_state.search_jump = True
+
+@st.fragment
+def sidebar_search():
+    """Node search box; typing reruns only this fragment, a chosen hit reruns the app"""
+    if st.session_state.pop('search_jump', False):
+        st.rerun(scope="app")
+    if 'search_jump_warning' in st.session_state:
+        st.warning(st.session_state.pop('search_jump_warning'))
+    
+    query = st.text_input("🔍 Search nodes", placeholder="e.g. seatbelt", key='search_query')
+    if query:
+        from bowtie.search import get_search_index, search_workspace
+        
+        workspace = get_active_workspace()
+        if workspace:
+            hits = search_workspace(workspace, query, limit=SEARCH_RESULTS)
+        else:
+            search_graph = load_active_graph()
+            hits = get_search_index(search_graph).search(query, SEARCH_RESULTS) if search_graph else []
+        if not hits:
+            st.caption("No matches")
+        for hit in hits:
+            location = f" · {hit.diagram_id}" if hit.diagram_id else ""
+            st.button(
+                f"{NODE_ICONS.get(hit.node_type, '•')} {hit.label}{location}",
+                help=hit.description or None,
+                key=f"hit-{hit.diagram_id}-{hit.node_id}",
+                on_click=jump_to_hit,
+                args=(hit.diagram_id, hit.node_id),
+                width="stretch"
+            )
+
+@st.fragment(run_every=1)
+def warmup_progress(warmup):
+    """Startup progress, refreshed on its own; reruns the app once the warm-up is done"""
+    if warmup.done:
+        st.rerun(scope="app")
+    st.caption(f"⏳ Warming up in the background · {len(warmup.completed)} steps done")
+
+def warmup_status(warmup):
+    """How the startup warm-up went: its time, data problems and failed steps"""
+    if not warmup.done:
+        warmup_progress(warmup)
+        return
+    st.caption(f"✅ Warmed up in {warmup.elapsed:.2f}s")
+    for diagram_id, report in warmup.reports.items():
+        if report.issues:
+            st.caption(f"⚠️ {diagram_id}: {len(report.errors)} errors, {len(report.warnings)} warnings")
+    for step in warmup.errors():
+        st.caption(f"⚠️ Warm-up {step.name} failed for {step.diagram_id}: {step.error}")
+
+def render_dev_panel(profiler, record, warmup):
+    """Show the finished rerun profile: stage timings, counters, startup steps and cProfile output"""
+    with st.expander(f"🛠️ Rerun profile · {record['total_ms']:.1f} ms", expanded=False):
+        st.dataframe(
+            [
+                {"span": "  " * span['depth'] + span['name'], "ms": span['duration_ms']}
+                for span in record['spans']
+            ],
+            hide_index=True,
+            width="stretch"
+        )
+        st.dataframe(
+            [{"counter": name, "value": value} for name, value in sorted(record['counters'].items())],
+            hide_index=True,
+            width="stretch"
+        )
+        if warmup.completed:
+            st.dataframe(
+                [
+                    {"warm-up": step.name, "diagram": step.diagram_id, "ms": step.seconds * 1000}
+                    for step in warmup.completed
+                ],
+                hide_index=True,
+                width="stretch"
+            )
+        st.checkbox("Capture cProfile on the next rerun", key='dev_cprofile')
+        profile_text = profiler.profile_text()
+        if profile_text:
+            st.code(profile_text, language=None)
+        if profiling.PROFILE_LOG:
+            st.caption(f"Logging reruns to {profiling.PROFILE_LOG}")
+
+def render(profiler, warmup):
+    """Draw the sidebar; return the chosen page and the slot for the developer panel"""
+    with st.sidebar:
+        st.markdown("## 🎯 Presentation Navigation")
+        st.markdown("---")
+        
+        page = st.radio(
+            "Select Section:",
+            page_labels(),
+            key="nav_page",
+            label_visibility="collapsed"
+        )
+        
+        # Store the full page value
+        st.session_state.current_page = page
+        
+        st.markdown("---")
+        sidebar_search()
+        
+        st.markdown("---")
+        workspace = get_active_workspace()
+        if workspace:
+            # Workspace mode: statistics come from the manifest, no graph is parsed here
+            st.markdown("### 🗂️ Diagram")
+            manifest = {entry.diagram_id: entry for entry in workspace.entries()}
+            diagram_id = st.selectbox(
+                "Diagram",
+                list(manifest),
+                format_func=lambda d: f"{d} — {manifest[d].hazard or 'No hazard'}",
+                key='diagram',
+                label_visibility="collapsed"
+            )
+            entry = manifest.get(diagram_id)
+            if entry:
+                st.markdown("### 📊 Diagram Statistics")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Threats", entry.counts['threat'])
+                    st.metric("Prevention Barriers", entry.counts['preventionBarrier'])
+                with col2:
+                    st.metric("Consequences", entry.counts['consequence'])
+                    st.metric("Mitigation Barriers", entry.counts['mitigationBarrier'])
+                stats = workspace.cache.stats()
+                st.caption(f"{len(manifest)} diagrams · graph cache {stats['size']}/{stats['maxsize']}, "
+                           f"{stats['hits']} hits / {stats['misses']} misses")
+        else:
+            st.markdown("### 📊 Demo Statistics")
+            # Read once the warm-up has loaded the diagram, so the first page isn't held up by it
+            demo_graph = load_active_graph() if warmup.done else None
+            if demo_graph:
+                narrative = get_narrative_data(demo_graph)
+                if narrative:
+                    col1, col2 = st.columns(2)
+                    with col1:
+                        st.metric("Threats", len(narrative['threats']))
+                        st.metric("Prevention Barriers", len(narrative['prevention_barriers']))
+                    with col2:
+                        st.metric("Consequences", len(narrative['consequences']))
+                        st.metric("Mitigation Barriers", len(narrative['mitigation_barriers']))
+                stats = cache_stats()
+                fragments = fragment_stats()
+                st.caption(f"Data cache: {stats['hits']} hits / {stats['misses']} misses · "
+                           f"HTML fragments: {fragments['hits']} hits / {fragments['misses']} misses")
+
+        warmup_status(warmup)
+        
+        # Filled in once the rerun has finished
+        dev_panel = st.container() if profiler else None
+    return page, dev_panel
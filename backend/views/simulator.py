@@ -0,0 +1,77 @@
+"""Scenario Simulator page: Monte Carlo runs with correlated barrier failures"""
+
+import os
+
+import streamlit as st
+
+from bowtie.simulate import SHARD_SIZE, simulate
+
+from .common import format_likelihood, load_active_graph, node_label
+
+def render():
+    st.markdown('<div class="section-header">🎲 Scenario Simulator</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="narrative-box">
+        <h3 style="margin-top: 0;">Sampling Threat → Consequence Runs</h3>
+        <p style="font-size: 1.1rem; line-height: 1.8;">
+        Each trial decides which degradation factors are active and which barriers fail. Barriers weakened 
+        by the same factor tend to fail together, and degradation controls reduce that effect. Averaging 
+        millions of trials gives the likelihood of the top event and each consequence, with confidence intervals.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    demo_graph = load_active_graph()
+    if demo_graph:
+        sim_col1, sim_col2, sim_col3, sim_col4 = st.columns(4)
+        with sim_col1:
+            trials = st.number_input("Trials", 10000, 50000000, 1000000, 100000)
+        with sim_col2:
+            seed = st.number_input("Seed", 0, 2**32 - 1, 0)
+        with sim_col3:
+            # More workers than shards would sit idle
+            max_workers = max(1, min(os.cpu_count() or 1, -(-int(trials) // SHARD_SIZE)))
+            workers = st.number_input("Worker processes", 1, max_workers, max_workers)
+        with sim_col4:
+            normal_probability = st.slider("Failure probability of normal barriers", 0.0, 1.0, 0.1, 0.01)
+        
+        settings = (demo_graph.version, int(trials), int(seed), normal_probability)
+        if st.button("▶️ Run simulation", type="primary"):
+            with st.spinner("Simulating..."):
+                st.session_state.simulation = (settings, simulate(
+                    demo_graph, int(trials), seed=int(seed), workers=int(workers),
+                    default_probability=normal_probability
+                ))
+        
+        # Keep showing the last run until the settings change
+        simulation = st.session_state.get('simulation')
+        if simulation and simulation[0] == settings:
+            result = simulation[1]
+            st.caption(f"{result.trials:,} trials in {result.elapsed:.2f}s on {result.workers} worker(s) "
+                       f"({result.trials / max(result.elapsed, 1e-9):,.0f} trials/s)")
+            
+            top = result.top_event
+            st.metric("Top Event", format_likelihood(top.mean),
+                      help=f"95% CI {format_likelihood(top.low)} – {format_likelihood(top.high)}")
+            
+            result_cols = st.columns(max(len(result.consequences), 1))
+            for i, (consequence_id, estimate) in enumerate(result.consequences.items()):
+                with result_cols[i]:
+                    st.metric(node_label(demo_graph.node(consequence_id), consequence_id),
+                              format_likelihood(estimate.mean),
+                              help=f"95% CI {format_likelihood(estimate.low)} – {format_likelihood(estimate.high)}")
+            
+            st.markdown("#### 📈 Convergence")
+            st.line_chart({
+                "Top event estimate": [mean for _, mean, _ in result.convergence],
+                "95% CI half-width": [half for _, _, half in result.convergence],
+            })
+            
+            with st.expander("Per-threat likelihood of reaching the top event"):
+                for threat_id, estimate in result.threats.items():
+                    st.markdown(f"**{node_label(demo_graph.node(threat_id), threat_id)}**: "
+                                f"{format_likelihood(estimate.mean)} "
+                                f"(95% CI {format_likelihood(estimate.low)} – {format_likelihood(estimate.high)})")
+    else:
+        st.error("Could not load demo data. Please ensure demo_bowtie.json exists in the data folder.")
@@ -0,0 +1,314 @@
+"""The Story page: the diagram told threat by threat and consequence by consequence"""
+
+import streamlit as st
+
+from bowtie import profiling
+from bowtie.chains import get_chains
+from bowtie.health import get_health
+from bowtie.partition import partition, partition_metrics, unassigned
+from bowtie.paths import DEGRADATION_TYPES, get_path_index
+from bowtie.render import render_html
+from bowtie.report import iter_report_html
+from bowtie.validate import validate_graph
+
+from .common import describe_factor, format_likelihood, get_narrative_data, load_active_graph, node_label
+
+def report_html(graph):
+    """Render the audit report for a graph (once per graph version, and only once asked for)"""
+    return graph.cached('report_html', lambda g: ''.join(iter_report_html(g, "Bowtie Risk Report")))
+
+# Story page cards, filled through the shared fragment cache (see card_key)
+HAZARD_CARD = """
+<div style="background: linear-gradient(135deg, #78350f 0%, #b45309 100%); padding: 1.5rem; border-radius: 10px; border-left: 5px solid #f59e0b; color: white;">
+    <h3 style="margin-top: 0; color: white;">{label}</h3>
+    <p style="margin-bottom: 0; color: white;">{description}</p>
+</div>
+"""
+TOP_EVENT_CARD = """
+<div style="background: linear-gradient(135deg, #7f1d1d 0%, #991b1b 100%); padding: 1.5rem; border-radius: 10px; border-left: 5px solid #ef4444; margin-bottom: 2rem; color: white;">
+    <h3 style="margin-top: 0; color: white;">{label}</h3>
+    <p style="margin-bottom: 0; font-size: 1.1rem; color: white;">
+    {description}
+    </p>
+</div>
+"""
+THREAT_CARD = """
+<div style="background: linear-gradient(135deg, #1e3a8a 0%, #2563eb 100%); padding: 1.5rem; border-radius: 10px; border-left: 5px solid #3b82f6; margin-bottom: 1.5rem; color: white;">
+    <h3 style="margin-top: 0; color: white;">{label}</h3>
+    <p style="margin-bottom: 0; color: white;">{description}</p>
+</div>
+"""
+CONSEQUENCE_CARD = """
+<div style="background: linear-gradient(135deg, #7f1d1d 0%, #991b1b 100%); padding: 1.5rem; border-radius: 10px; border-left: 5px solid #ef4444; margin-bottom: 1.5rem; color: white;">
+    <h3 style="margin-top: 0; color: white;">💥 {label}</h3>
+    <p style="margin-bottom: 1rem; color: white;">{description}</p>
+</div>
+"""
+
+def card_key(graph, node):
+    """Fragment cache key of a node's card: a new graph version re-renders it"""
+    return graph.version, node.get('id')
+
+def select_entry(kind, entries, key):
+    """Let the user pick one threat/consequence; only that one gets rendered"""
+    if not entries:
+        return None
+    index = st.selectbox(
+        f"{kind} ({len(entries)} total)",
+        range(len(entries)),
+        format_func=lambda i: f"{i+1}. {node_label(entries[i], f'{kind} {i+1}')}",
+        key=key
+    )
+    # The stored index can be stale after the diagram shrinks
+    return entries[min(index, len(entries) - 1)]
+
+def select_sub_bowtie(graph):
+    """Let the user pick a top event when the diagram combines several; return its sub-bowtie graph"""
+    parts = partition(graph)
+    if len(parts) == 1:
+        return graph
+    
+    with st.expander(f"🧩 This diagram combines {len(parts)} bowties"):
+        st.dataframe(
+            [
+                {
+                    "Top event": metrics.label,
+                    "Threats": metrics.counts['threat'],
+                    "Consequences": metrics.counts['consequence'],
+                    "Barriers": metrics.counts['barrier'],
+                    "Top event likelihood": format_likelihood(metrics.top_event_likelihood),
+                }
+                for metrics in partition_metrics(graph)
+            ],
+            hide_index=True,
+            width="stretch"
+        )
+        st.caption("Likelihoods assume a 10% failure probability for barriers that don't set their own.")
+        left_out = unassigned(graph)
+        if left_out:
+            st.caption(f"⚠️ {len(left_out)} node(s) reach no top event and appear in none of these bowties: "
+                       + ", ".join(node_label(graph.node(n), n) for n in left_out[:5])
+                       + ("..." if len(left_out) > 5 else ""))
+    index = st.selectbox(
+        f"Top event ({len(parts)} in this diagram)",
+        range(len(parts)),
+        format_func=lambda i: parts[i].label,
+        key='story_top_event'
+    )
+    return parts[min(index, len(parts) - 1)].graph
+
+def render_barrier_list(title, chain, graph):
+    """Show the first barriers of a resolved chain"""
+    barrier_chain = chain.barriers
+    if chain.branched:
+        st.caption("This chain branches; barriers are listed in flow order.")
+    if barrier_chain and not chain.complete:
+        st.caption("⚠️ This chain is not connected to the top event.")
+    
+    if barrier_chain:
+        st.markdown(f"#### 🛡️ {title}:")
+        # Barrier health and degradation come from the precomputed rollup
+        health = get_health(graph)
+        # Show only first 2 barriers as examples
+        for i, barrier in enumerate(barrier_chain[:2]):
+            barrier_data = barrier.get('data') or {}
+            st.markdown(f"**{i+1}. {barrier_data.get('label', 'Barrier')}** - {barrier_data.get('description', '')[:80]}...")
+            barrier_health = health.barrier(barrier.get('id'))
+            if barrier_health and barrier_health.factors:
+                st.caption(f"Health {barrier_health.health:.0%} · " + "; ".join(
+                    describe_factor(graph, factor) for factor in barrier_health.factors
+                ))
+        if len(barrier_chain) > 2:
+            st.markdown(f"*...and {len(barrier_chain) - 2} more barriers*")
+        
+        chain_health = health.chain(chain.source)
+        if chain_health and chain_health.effective_barriers < len(chain_health.barrier_ids):
+            uncovered = (f" · ⚠️ {chain_health.uncovered_factors} uncovered degradation factor(s)"
+                         if chain_health.uncovered_factors else "")
+            st.caption(f"Chain health: {chain_health.effective_barriers:.1f} effective barriers "
+                       f"of {len(chain_health.barrier_ids)}{uncovered}")
+
+def render_focus_path(graph, node_id):
+    """Summarize what Focus Mode highlights for a threat/consequence, from the shared path index"""
+    path = get_path_index(graph).path(node_id)
+    degradation = sum(graph.node_type(n) in DEGRADATION_TYPES for n in path)
+    st.caption(f"🔦 In the editor's Focus Mode this path highlights {len(path)} nodes, "
+               f"{degradation} of them degradation factors or controls.")
+
+def render_threat(narrative, threat):
+    """Render one threat card and its prevention chain"""
+    threat_data = threat.get('data') or {}
+    threat_label = threat_data.get('label', 'Threat')
+    
+    st.markdown(render_html(
+        THREAT_CARD,
+        card_key(narrative['graph'], threat),
+        label=threat_label,
+        description=threat_data.get('description', '')
+    ), unsafe_allow_html=True)
+    
+    # Resolve this threat's prevention chain (memoized per graph version)
+    chain = get_chains(narrative['graph']).prevention(threat.get('id'))
+    render_barrier_list("Prevention Barriers", chain, narrative['graph'])
+    render_focus_path(narrative['graph'], threat.get('id'))
+
+def render_consequence(narrative, consequence):
+    """Render one consequence card and its mitigation chain"""
+    consequence_data = consequence.get('data') or {}
+    
+    st.markdown(render_html(
+        CONSEQUENCE_CARD,
+        card_key(narrative['graph'], consequence),
+        label=consequence_data.get('label', 'Consequence'),
+        description=consequence_data.get('description', '')
+    ), unsafe_allow_html=True)
+    
+    # Resolve this consequence's mitigation chain (memoized per graph version)
+    chain = get_chains(narrative['graph']).mitigation(consequence.get('id'))
+    render_barrier_list("Mitigation Barriers", chain, narrative['graph'])
+    render_focus_path(narrative['graph'], consequence.get('id'))
+
+@st.fragment
+def story_threat(narrative):
+    """Threat picker and card; changing the pick reruns only this fragment"""
+    threat = select_entry("Threat", narrative['threats'], key='story_threat')
+    if threat:
+        render_threat(narrative, threat)
+
+@st.fragment
+def story_consequence(narrative):
+    """Consequence picker and card; changing the pick reruns only this fragment"""
+    consequence = select_entry("Consequence", narrative['consequences'], key='story_consequence')
+    if consequence:
+        render_consequence(narrative, consequence)
+
+def render():
+    st.markdown('<div class="section-header">📖 Our Demo Scenario: Commercial Vehicle Safety</div>', unsafe_allow_html=True)
+    
+    story_graph = load_active_graph()
+    with profiling.span("narrative"):
+        narrative = get_narrative_data(select_sub_bowtie(story_graph) if story_graph else None)
+    
+    if narrative:
+        # Structural problems (checked once per graph version) would make parts of the story misleading
+        report = validate_graph(story_graph)
+        if report.issues:
+            with st.expander(f"⚠️ This diagram has {len(report.errors)} errors and {len(report.warnings)} warnings"):
+                for issue in report.issues:
+                    st.markdown(f"- **{issue.severity.title()}** `{issue.code}`: {issue.message}")
+        
+        # Introduction
+        st.markdown("""
+        <div class="narrative-box">
+            <h2 style="margin-top: 0;">Our Demo Scenario</h2>
+            <p style="font-size: 1.1rem; line-height: 1.8;">
+            <strong>Commercial vehicle on highway at 70 mph</strong> - a scenario where loss of control 
+            could lead to serious consequences. Our diagram shows how multiple threats are prevented and 
+            how consequences are mitigated.
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        # The Hazard
+        if narrative['hazard']:
+            hazard_data = narrative['hazard'].get('data') or {}
+            st.markdown('<div class="section-header">⚠️ The Hazard</div>', unsafe_allow_html=True)
+            
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.markdown(render_html(
+                    HAZARD_CARD,
+                    card_key(narrative['graph'], narrative['hazard']),
+                    label=hazard_data.get('label', 'Hazard'),
+                    description=hazard_data.get('description', '')
+                ), unsafe_allow_html=True)
+            
+            with col2:
+                st.markdown("""
+                <div style="text-align: center; padding: 1rem; background: #f3f4f6; border-radius: 10px;">
+                    <div style="font-size: 2.5rem;">⚠️</div>
+                    <div style="font-weight: 600; margin-top: 0.5rem;">Hazard</div>
+                </div>
+                """, unsafe_allow_html=True)
+        
+        # The Top Event
+        if narrative['top_event']:
+            top_event_data = narrative['top_event'].get('data') or {}
+            st.markdown('<div class="section-header">🎯 The Top Event</div>', unsafe_allow_html=True)
+            
+            st.markdown(render_html(
+                TOP_EVENT_CARD,
+                card_key(narrative['graph'], narrative['top_event']),
+                label=top_event_data.get('label', 'Top Event'),
+                description=top_event_data.get('description', '')
+            ), unsafe_allow_html=True)
+            
+            st.markdown("""
+            <p style="font-size: 1.1rem; line-height: 1.8;">
+            This is the <strong>critical moment</strong> where control is lost. Everything on the left side 
+            (threats and prevention barriers) works to prevent reaching this point. Everything on the right 
+            side (mitigation barriers and consequences) addresses what happens if we reach this point.
+            </p>
+            """, unsafe_allow_html=True)
+        
+        # Threats Section - paginated, only the selected threat is resolved and rendered
+        st.markdown('<div class="section-header">⚡ The Threats</div>', unsafe_allow_html=True)
+        
+        st.markdown(f"""
+        <p style="font-size: 1.1rem; line-height: 1.8; margin-bottom: 1rem;">
+        Multiple threats could lead to loss of control. Each has prevention barriers. Pick any of the 
+        {len(narrative['threats'])} threats to follow its story:
+        </p>
+        """, unsafe_allow_html=True)
+        
+        story_threat(narrative)
+        
+        # Consequences Section - paginated the same way
+        st.markdown('<div class="section-header">💥 The Consequences</div>', unsafe_allow_html=True)
+        
+        st.markdown(f"""
+        <p style="font-size: 1.1rem; line-height: 1.8; margin-bottom: 1rem;">
+        If prevention fails, these consequences can occur. Each has mitigation barriers to reduce impact. 
+        Pick any of the {len(narrative['consequences'])} consequences:
+        </p>
+        """, unsafe_allow_html=True)
+        
+        story_consequence(narrative)
+        
+        # Summary
+        st.markdown('<div class="section-header">📋 Summary</div>', unsafe_allow_html=True)
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Threats", len(narrative['threats']))
+        with col2:
+            st.metric("Prevention Barriers", len(narrative['prevention_barriers']))
+        with col3:
+            st.metric("Consequences", len(narrative['consequences']))
+        with col4:
+            st.metric("Mitigation Barriers", len(narrative['mitigation_barriers']))
+        
+        st.markdown("""
+        <div class="narrative-box" style="margin-top: 2rem;">
+            <h3 style="margin-top: 0;">The Complete Picture</h3>
+            <p style="font-size: 1.1rem; line-height: 1.8;">
+            This demonstrates how threats converge on a critical event, how prevention barriers stop them, 
+            and how mitigation barriers reduce impact if the event occurs. Degradation factors show how 
+            barriers can weaken, with controls to prevent failure.
+            </p>
+            <p style="font-size: 1.1rem; line-height: 1.8; margin-top: 1rem;">
+            <strong>Now let's see this come to life in the interactive demo!</strong>
+            </p>
+        </div>
+        """, unsafe_allow_html=True)
+        
+        st.download_button(
+            "📄 Download full report (HTML)",
+            data=lambda: report_html(story_graph),
+            file_name="bowtie_report.html",
+            mime="text/html",
+            help="Every threat and consequence with its full barrier chain, degradation factors and metrics"
+        )
+    
+    else:
+        st.error("Could not load demo data. Please ensure demo_bowtie.json exists in the data folder.")
@@ -0,0 +1,71 @@
+"""Why This App page: the features and what each one solves"""
+
+import streamlit as st
+
+def render():
+    st.markdown('<div class="section-header">💡 Why We Built This Interactive Application</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="narrative-box">
+        <h2 style="margin-top: 0;">Our Mission</h2>
+        <p style="font-size: 1.1rem; line-height: 1.8;">
+        To transform static, overwhelming risk diagrams into <strong>interactive, interpretable, 
+        and story-like experiences</strong> that help both experts and non-experts understand 
+        complex risk scenarios.
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown('<div class="section-header">✨ Key Features</div>', unsafe_allow_html=True)
+    
+    feature_tabs = st.tabs([
+        "🎯 Focus Mode",
+        "📖 Narrative Flow",
+        "🎨 Interactive Exploration"
+    ])
+    
+    with feature_tabs[0]:
+        st.markdown("""
+        ### 🎯 Focus Mode
+        
+        <div class="solution-box">
+            <p><strong>Solves:</strong> Information overload - too much visible at once</p>
+            <p><strong>Solution:</strong> Hover over any node to highlight its complete path. Other paths dim automatically, reducing clutter.</p>
+        </div>
+        
+        **Example:** Hover over "Intoxicated driving" to see its prevention barriers, the top event, mitigation barriers, and consequences - all while other paths fade.
+        """, unsafe_allow_html=True)
+    
+    with feature_tabs[1]:
+        st.markdown("""
+        ### 📖 Narrative Flow
+        
+        <div class="solution-box">
+            <p><strong>Solves:</strong> Lack of context and storytelling</p>
+            <p><strong>Solution:</strong> Present scenarios as stories with beginning (threats), middle (barriers), and end (consequences). Expand nodes progressively to reveal details.</p>
+        </div>
+        
+        **Result:** Risk scenarios become memorable narratives that anyone can understand.
+        """, unsafe_allow_html=True)
+    
+    with feature_tabs[2]:
+        st.markdown("""
+        ### 🎨 Interactive Exploration
+        
+        <div class="solution-box">
+            <p><strong>Solves:</strong> Passive viewing and poor engagement</p>
+            <p><strong>Solution:</strong> Click to expand, toggle barrier status, animate paths, zoom and pan. Learn by exploring at your own pace.</p>
+        </div>
+        
+        **Features:** Expand/collapse nodes, toggle barrier failures, focus mode, path animation, degradation factor exploration.
+        """, unsafe_allow_html=True)
+    
+    st.markdown('<div class="section-header">🚀 The Result</div>', unsafe_allow_html=True)
+    
+    st.markdown("""
+    <div class="story-highlight" style="font-size: 1.2rem; text-align: center; padding: 2rem;">
+        Transform complex, static risk diagrams into <strong>interactive stories</strong> that are 
+        <strong>easy to understand</strong>, <strong>engaging to explore</strong>, and 
+        <strong>effective for communication</strong>.
+    </div>
+    """, unsafe_allow_html=True)
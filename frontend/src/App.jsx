@@ -24,6 +24,7 @@ import Toolbar from "./components/Toolbar";
 import { saveToJSON, validateBowtieSchema } from "./utils/dataModel";
 import {
   getAllConnectedNodes,
+  getIndexedPath,
   getNodePath,
   getDownstreamPathFromBarrier,
   calculateNodeRiskScore,
@@ -33,6 +34,12 @@ import {
 // import { applyBowtieLayout } from "./utils/bowtieLayout";
 import { NODE_DIMENSIONS } from "./components/NodeTypes";
 import { useExpandCollapse } from "./utils/useExpandCollapse";
+import {
+  toSyncData,
+  toSyncEdge,
+  toSyncNode,
+  useDiagramSync,
+} from "./utils/syncClient";
 
 const initialNodes = [];
 const initialEdges = [];
@@ -42,9 +49,44 @@ const edgeTypes = {
   animated: AnimatedEdge,
 };
 
+// Set default horizontal flow handle positions if not present
+const withHandlePositions = (node) => {
+  if (node.sourcePosition && node.targetPosition) {
+    return node;
+  }
+  let sourcePosition = "right";
+  let targetPosition = "left";
+
+  if (node.type === "hazard") {
+    sourcePosition = "bottom";
+    targetPosition = "top";
+  } else if (
+    ["degradationFactor", "degradationControl"].includes(node.type)
+  ) {
+    sourcePosition = "top";
+    targetPosition = "bottom";
+  }
+
+  return {
+    ...node,
+    sourcePosition,
+    targetPosition,
+  };
+};
+
 function App() {
   const [nodes, setNodes, onNodesChange] = useNodesState(initialNodes);
   const [edges, setEdges, onEdgesChange] = useEdgesState(initialEdges);
+  // Highlight paths precomputed by the backend; null until a sync snapshot provides them
+  const [pathIndex, setPathIndex] = useState(null);
+  // Live sync with the presentation backend (only when a sync URL is given)
+  const sendSync = useDiagramSync({
+    setNodes,
+    setEdges,
+    prepareNode: withHandlePositions,
+    getDocument: () => ({ nodes, edges }),
+    setPathIndex,
+  });
   const [selectedNode, setSelectedNode] = useState(null);
   const [hoveredNode, setHoveredNode] = useState(null);
   const [isEditorOpen, setIsEditorOpen] = useState(false);
@@ -101,8 +143,42 @@ function App() {
         labelBgStyle: { fill: "#fff", fillOpacity: 0.8 },
       };
       setEdges((eds) => addEdge(newEdge, eds));
+      sendSync({ op: "edge.add", edge: toSyncEdge(newEdge) });
+    },
+    [setEdges, sendSync]
+  );
+
+  // Forward removals made with the keyboard to the sync channel
+  const handleNodesChange = useCallback(
+    (changes) => {
+      changes.forEach((change) => {
+        if (change.type === "remove") {
+          sendSync({ op: "node.remove", id: change.id });
+        }
+      });
+      onNodesChange(changes);
+    },
+    [onNodesChange, sendSync]
+  );
+
+  const handleEdgesChange = useCallback(
+    (changes) => {
+      changes.forEach((change) => {
+        if (change.type === "remove") {
+          sendSync({ op: "edge.remove", id: change.id });
+        }
+      });
+      onEdgesChange(changes);
+    },
+    [onEdgesChange, sendSync]
+  );
+
+  // Stream drags as moves; the sync client keeps only the latest per batch
+  const onNodeDrag = useCallback(
+    (event, node) => {
+      sendSync({ op: "node.move", id: node.id, position: node.position });
     },
-    [setEdges]
+    [sendSync]
   );
 
   // Calculate risk scores for all nodes
@@ -191,13 +267,17 @@ function App() {
 
     // Get path from hovered node
     if (hoveredNode && !isAnimating) {
-      const path = getNodePath(hoveredNode.id, edges, nodes);
+      const path =
+        getIndexedPath(hoveredNode.id, pathIndex) ||
+        getNodePath(hoveredNode.id, edges, nodes);
       path.forEach((id) => ids.add(id));
     }
 
     // Get path from selected node
     if (selectedNode && (focusMode || isAnimating)) {
-      const path = getNodePath(selectedNode.id, edges, nodes);
+      const path =
+        getIndexedPath(selectedNode.id, pathIndex) ||
+        getNodePath(selectedNode.id, edges, nodes);
       path.forEach((id) => ids.add(id));
     }
 
@@ -366,6 +446,7 @@ function App() {
     focusMode,
     edges,
     nodes,
+    pathIndex,
     isAnimating,
     animatedNodeId,
   ]);
@@ -567,38 +648,15 @@ function App() {
           const data = JSON.parse(e.target?.result);
           if (validateBowtieSchema(data)) {
             // Load nodes and edges, ensuring horizontal flow positions
-            const loadedNodes = (data.nodes || []).map((node) => {
-              // Set default horizontal flow positions if not present
-              if (!node.sourcePosition || !node.targetPosition) {
-                let sourcePosition = "right";
-                let targetPosition = "left";
-
-                if (node.type === "hazard") {
-                  sourcePosition = "bottom";
-                  targetPosition = "top";
-                } else if (node.type === "topEvent") {
-                  sourcePosition = "right";
-                  targetPosition = "left";
-                } else if (
-                  ["degradationFactor", "degradationControl"].includes(
-                    node.type
-                  )
-                ) {
-                  sourcePosition = "top";
-                  targetPosition = "bottom";
-                }
-
-                return {
-                  ...node,
-                  sourcePosition,
-                  targetPosition,
-                };
-              }
-              return node;
-            });
+            const loadedNodes = (data.nodes || []).map(withHandlePositions);
 
             setNodes(loadedNodes);
             setEdges(data.edges || []);
+            sendSync({
+              op: "reset",
+              nodes: loadedNodes.map(toSyncNode),
+              edges: (data.edges || []).map(toSyncEdge),
+            });
 
             // Auto-fit view after nodes are positioned
             setTimeout(() => {
@@ -618,7 +676,7 @@ function App() {
       };
       reader.readAsText(file);
     },
-    [setNodes, setEdges]
+    [setNodes, setEdges, sendSync]
   );
 
   // Update node data
@@ -628,8 +686,13 @@ function App() {
         nds.map((node) => (node.id === updatedNode.id ? updatedNode : node))
       );
       setSelectedNode(updatedNode);
+      sendSync({
+        op: "node.update",
+        id: updatedNode.id,
+        data: toSyncData(updatedNode.data),
+      });
     },
-    [setNodes]
+    [setNodes, sendSync]
   );
 
   // Add new node
@@ -646,8 +709,9 @@ function App() {
         },
       };
       setNodes((nds) => [...nds, newNode]);
+      sendSync({ op: "node.add", node: toSyncNode(newNode) });
     },
-    [setNodes]
+    [setNodes, sendSync]
   );
 
   // Delete selected node
@@ -660,10 +724,11 @@ function App() {
             edge.source !== selectedNode.id && edge.target !== selectedNode.id
         )
       );
+      sendSync({ op: "node.remove", id: selectedNode.id });
       setSelectedNode(null);
       setIsEditorOpen(false);
     }
-  }, [selectedNode, setNodes, setEdges]);
+  }, [selectedNode, setNodes, setEdges, sendSync]);
 
   if (error) {
     return (
@@ -724,9 +789,11 @@ function App() {
       <ReactFlow
         nodes={preparedNodes}
         edges={preparedEdges}
-        onNodesChange={onNodesChange}
-        onEdgesChange={onEdgesChange}
+        onNodesChange={handleNodesChange}
+        onEdgesChange={handleEdgesChange}
         onConnect={onConnect}
+        onNodeDrag={onNodeDrag}
+        onNodeDragStop={onNodeDrag}
         onNodeClick={onNodeClick}
         onNodeMouseEnter={onNodeMouseEnter}
         onNodeMouseLeave={onNodeMouseLeave}
@@ -481,6 +481,37 @@ export const getNodePath = (nodeId, edges, nodes) => {
   return Array.from(path)
 }
 
+/**
+ * Highlight path of a node from the backend's precomputed path index
+ * (the `paths` of a sync snapshot, see backend/bowtie/paths.py)
+ * A node lights its own segments; a barrier also lights the opposite-side
+ * segments of every top event on them, looked up per top event
+ * Returns null when the index doesn't cover the node; callers fall back to getNodePath
+ */
+export const getIndexedPath = (nodeId, pathIndex) => {
+  const own = pathIndex?.own?.[nodeId]
+  if (!own) return null
+
+  const path = new Set([nodeId])
+  const lit = new Set()
+  const addSegment = (segment) => {
+    if (lit.has(segment)) return
+    lit.add(segment)
+    pathIndex.segments[segment].forEach((position) => path.add(pathIndex.ids[position]))
+  }
+  own.forEach(addSegment)
+
+  const byTop = pathIndex[pathIndex.opposite?.[nodeId]]
+  if (byTop) {
+    own.forEach((segment) => {
+      pathIndex.segments[segment].forEach((position) => {
+        (byTop[pathIndex.ids[position]] || []).forEach(addSegment)
+      })
+    })
+  }
+  return Array.from(path)
+}
+
 /**
  * Get downstream path from a failed barrier
  * For prevention barriers: barrier → top event → mitigation barriers → consequences
@@ -0,0 +1,217 @@
+// Live sync with the backend (see backend/bowtie/sync.py for the protocol)
+// Edits go out as small operations, batched every FLUSH_INTERVAL ms; edits made
+// in other editors come back the same way and are applied to local state.
+import { useCallback, useEffect, useRef } from 'react'
+
+const FLUSH_INTERVAL = 50
+const RECONNECT_DELAY = 1000
+const MAX_RECONNECT_DELAY = 15000
+// Ops where a later one for the same node replaces (or merges into) an earlier one
+const COALESCED_OPS = ['node.update', 'node.move']
+// View state kept in node.data that other editors and the backend don't need
+const LOCAL_DATA_FIELDS = ['expanded', 'riskScore', 'riskLevel', 'isHighlighted', 'isDimmed', 'isAnimated']
+
+/**
+ * Sync URL from the ?sync= query parameter (set by the Streamlit embed) or VITE_SYNC_URL
+ */
+export const getSyncUrl = () =>
+  new URLSearchParams(window.location.search).get('sync') || import.meta.env.VITE_SYNC_URL || null
+
+/**
+ * Whether an op can change the highlight paths of a snapshot's path index
+ */
+export const changesPaths = (op) =>
+  op.op !== 'node.move' && !(op.op === 'node.update' && !('barrierType' in op.data))
+
+export const toSyncData = (data = {}) => {
+  const synced = { ...data }
+  LOCAL_DATA_FIELDS.forEach((field) => delete synced[field])
+  return synced
+}
+
+export const toSyncNode = (node) => ({
+  id: node.id,
+  type: node.type,
+  position: node.position,
+  data: toSyncData(node.data),
+  ...(node.sourcePosition && { sourcePosition: node.sourcePosition }),
+  ...(node.targetPosition && { targetPosition: node.targetPosition }),
+})
+
+export const toSyncEdge = ({ id, source, target, sourceHandle, targetHandle, label }) => ({
+  id,
+  source,
+  target,
+  ...(sourceHandle && { sourceHandle }),
+  ...(targetHandle && { targetHandle }),
+  ...(label && { label }),
+})
+
+/**
+ * Open a sync connection; returns { send, close }
+ * Reconnects with backoff; each (re)connect starts with a snapshot from the server
+ */
+export const createSyncClient = (url, { onSnapshot, onDelta, onError }) => {
+  let socket = null
+  let queue = []
+  let slots = new Map()
+  let timer = null
+  let reconnectTimer = null
+  let delay = RECONNECT_DELAY
+  let closed = false
+
+  const flush = () => {
+    timer = null
+    if (!queue.length || !socket || socket.readyState !== WebSocket.OPEN) return
+    socket.send(JSON.stringify({ type: 'ops', ops: queue }))
+    queue = []
+    slots = new Map()
+  }
+
+  const send = (op) => {
+    if (op.op === 'reset') {
+      queue = []
+      slots = new Map()
+    } else if (COALESCED_OPS.includes(op.op)) {
+      const key = `${op.op}:${op.id}`
+      const slot = slots.get(key)
+      if (slot !== undefined) {
+        const queued = queue[slot]
+        queue[slot] = op.op === 'node.update' ? { ...queued, data: { ...queued.data, ...op.data } } : op
+        return
+      }
+      slots.set(key, queue.length)
+    } else if (op.op.startsWith('node.')) {
+      const id = op.node?.id ?? op.id
+      COALESCED_OPS.forEach((kind) => slots.delete(`${kind}:${id}`))
+    }
+    queue.push(op)
+    if (timer === null) timer = setTimeout(flush, FLUSH_INTERVAL)
+  }
+
+  const connect = () => {
+    socket = new WebSocket(url)
+    socket.onopen = () => {
+      delay = RECONNECT_DELAY
+    }
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data)
+      if (message.type === 'snapshot') {
+        onSnapshot?.(message)
+        // Edits queued while disconnected go out after the snapshot
+        if (queue.length && timer === null) timer = setTimeout(flush, FLUSH_INTERVAL)
+      } else if (message.type === 'delta') {
+        onDelta?.(message)
+      } else if (message.type === 'error') {
+        onError?.(message.message)
+      }
+    }
+    socket.onclose = () => {
+      if (closed) return
+      reconnectTimer = setTimeout(connect, delay)
+      delay = Math.min(delay * 2, MAX_RECONNECT_DELAY)
+    }
+  }
+
+  connect()
+
+  return {
+    send,
+    close: () => {
+      closed = true
+      clearTimeout(timer)
+      clearTimeout(reconnectTimer)
+      socket?.close()
+    },
+  }
+}
+
+/**
+ * Apply remote ops to a React Flow node list; prepare() is applied to added nodes
+ */
+export const applyNodeOps = (nodes, ops, prepare = (node) => node) => {
+  let next = nodes
+  ops.forEach((op) => {
+    if (op.op === 'reset') {
+      next = op.nodes.map(prepare)
+    } else if (op.op === 'node.add') {
+      // Adds are upserts, so a delta overlapping a snapshot is harmless
+      next = [...next.filter((n) => n.id !== op.node.id), prepare(op.node)]
+    } else if (op.op === 'node.update') {
+      next = next.map((n) => (n.id === op.id ? { ...n, data: { ...n.data, ...op.data } } : n))
+    } else if (op.op === 'node.move') {
+      next = next.map((n) => (n.id === op.id ? { ...n, position: op.position } : n))
+    } else if (op.op === 'node.remove') {
+      next = next.filter((n) => n.id !== op.id)
+    }
+  })
+  return next
+}
+
+/**
+ * Apply remote ops to a React Flow edge list
+ */
+export const applyEdgeOps = (edges, ops) => {
+  let next = edges
+  ops.forEach((op) => {
+    if (op.op === 'reset') {
+      next = op.edges || []
+    } else if (op.op === 'edge.add') {
+      next = [...next.filter((e) => e.id !== op.edge.id), op.edge]
+    } else if (op.op === 'edge.remove') {
+      next = next.filter((e) => e.id !== op.id)
+    } else if (op.op === 'node.remove') {
+      next = next.filter((e) => e.source !== op.id && e.target !== op.id)
+    }
+  })
+  return next
+}
+
+/**
+ * Keep nodes/edges in sync with the server at getSyncUrl(); returns a stable send(op)
+ * (a no-op when sync isn't configured)
+ * getDocument() supplies the local diagram to seed an empty server-side diagram
+ * setPathIndex() receives each snapshot's path index, and null once an edit outdates it
+ */
+export const useDiagramSync = ({ setNodes, setEdges, prepareNode, getDocument, setPathIndex = () => {} }) => {
+  const clientRef = useRef(null)
+  const callbacks = useRef({ setNodes, setEdges, prepareNode, getDocument, setPathIndex })
+  callbacks.current = { setNodes, setEdges, prepareNode, getDocument, setPathIndex }
+
+  useEffect(() => {
+    const url = getSyncUrl()
+    if (!url) return undefined
+    const client = createSyncClient(url, {
+      onSnapshot: ({ nodes, edges, paths }) => {
+        const { setNodes, setEdges, prepareNode, getDocument, setPathIndex } = callbacks.current
+        if (nodes.length) {
+          setNodes(nodes.map(prepareNode))
+          setEdges(edges)
+          setPathIndex(paths || null)
+          return
+        }
+        const local = getDocument()
+        if (local.nodes.length) {
+          client.send({ op: 'reset', nodes: local.nodes.map(toSyncNode), edges: local.edges.map(toSyncEdge) })
+        }
+      },
+      onDelta: ({ ops }) => {
+        const { setNodes, setEdges, prepareNode, setPathIndex } = callbacks.current
+        setNodes((nds) => applyNodeOps(nds, ops, prepareNode))
+        setEdges((eds) => applyEdgeOps(eds, ops))
+        if (ops.some(changesPaths)) setPathIndex(null)
+      },
+      onError: (message) => console.warn('Sync error:', message),
+    })
+    clientRef.current = client
+    return () => {
+      clientRef.current = null
+      client.close()
+    }
+  }, [])
+
+  return useCallback((op) => {
+    if (changesPaths(op)) callbacks.current.setPathIndex(null)
+    clientRef.current?.send(op)
+  }, [])
+}